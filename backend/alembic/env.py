@@ -0,0 +1,46 @@
+from logging.config import fileConfig
+from alembic import context
+from app.db.session import Base, engine, _trigram_available
+import app.models  # noqa: F401  register every table on Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Trigram indexes only exist on PostgreSQL with pg_trgm available
+    if type_ == "index" and name.endswith("_trgm"):
+        return _trigram_available(None, None, context.get_bind())
+    # Message search's tsvector column and its index are PostgreSQL-only and
+    # defined by migration 0007 alone; the Message model doesn't map them
+    if name in ("search_vector", "ix_messages_search_vector"):
+        return False
+    # PostgreSQL reflects the pair index's CASE expressions in its own
+    # spelling, which never compares equal to the model's
+    if type_ == "index" and name == "ix_connections_pair":
+        return False
+    return True
+
+def run_migrations_offline():
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
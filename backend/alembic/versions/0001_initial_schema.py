@@ -0,0 +1,156 @@
+"""initial schema
+
+The tables as created by Base.metadata.create_all before migrations were
+introduced. Databases bootstrapped that way should be stamped with this
+revision (`alembic stamp 0001`) and then upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("role", sa.String(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("graduation_year", sa.Integer(), nullable=True),
+        sa.Column("department", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("profile_picture_url", sa.String(), nullable=True),
+        sa.Column("skills", sa.String(), nullable=True),
+        sa.Column("interest", sa.String(), nullable=True),
+        sa.Column("points", sa.Integer(), nullable=True),
+        sa.Column("linkedin_url", sa.String(), nullable=True),
+    )
+    op.create_index("ix_profiles_id", "profiles", ["id"])
+    op.create_index("ix_profiles_full_name", "profiles", ["full_name"])
+
+    op.create_table(
+        "connections",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("requester_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("recipient_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_connections_id", "connections", ["id"])
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("posted_by_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("job_type", sa.String(), nullable=True),
+        sa.Column("apply_link", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_title", "jobs", ["title"])
+    op.create_index("ix_jobs_company", "jobs", ["company"])
+
+    op.create_table(
+        "events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("organizer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("event_type", sa.String(), nullable=True),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("max_attendees", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_events_id", "events", ["id"])
+    op.create_index("ix_events_title", "events", ["title"])
+
+    op.create_table(
+        "donation_campaigns",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_by_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("goal_amount", sa.Float(), nullable=False),
+        sa.Column("current_amount", sa.Float(), nullable=True),
+        sa.Column("end_date", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_donation_campaigns_id", "donation_campaigns", ["id"])
+    op.create_index("ix_donation_campaigns_title", "donation_campaigns", ["title"])
+
+    op.create_table(
+        "donations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("campaign_id", sa.Integer(), sa.ForeignKey("donation_campaigns.id"), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("transaction_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_donations_id", "donations", ["id"])
+
+    op.create_table(
+        "badges",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("icon_url", sa.String(), nullable=True),
+    )
+    op.create_index("ix_badges_id", "badges", ["id"])
+    op.create_index("ix_badges_name", "badges", ["name"], unique=True)
+
+    op.create_table(
+        "user_badges",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("badge_id", sa.Integer(), sa.ForeignKey("badges.id"), nullable=False),
+        sa.Column("awarded_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_user_badges_id", "user_badges", ["id"])
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("sender_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("recipient_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=True),
+        sa.Column("is_read", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_messages_id", "messages", ["id"])
+
+
+def downgrade():
+    for table in (
+        "messages", "user_badges", "badges", "donations", "donation_campaigns",
+        "events", "jobs", "connections", "profiles", "users",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,75 @@
+"""performance indexes for the hot query shapes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, extra kwargs)
+INDEXES = [
+    ("ix_messages_sender_recipient_timestamp", "messages", ["sender_id", "recipient_id", "timestamp"], {}),
+    ("ix_connections_requester_recipient", "connections", ["requester_id", "recipient_id"], {}),
+    ("ix_connections_recipient_status", "connections", ["recipient_id", "status"], {}),
+    ("ix_connections_recipient_pending", "connections", ["recipient_id"], {
+        "postgresql_where": sa.text("status = 'pending'"),
+        "sqlite_where": sa.text("status = 'pending'"),
+    }),
+    ("ix_profiles_points_desc", "profiles", [sa.text("points DESC")], {}),
+    ("ix_donations_user_id", "donations", ["user_id"], {}),
+    ("ix_events_start_time", "events", ["start_time"], {}),
+]
+
+TRIGRAM_INDEXES = [
+    ("ix_profiles_full_name_trgm", "profiles", "full_name"),
+    ("ix_profiles_department_trgm", "profiles", "department"),
+    ("ix_jobs_title_trgm", "jobs", "title"),
+    ("ix_jobs_location_trgm", "jobs", "location"),
+]
+
+
+def _is_postgresql():
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _trigram_available():
+    return op.get_bind().scalar(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ) is not None
+
+
+def upgrade():
+    if not _is_postgresql():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, **kwargs)
+        return
+
+    # Build without blocking writes on large, live tables
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+        if _trigram_available():
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for name, table, column in TRIGRAM_INDEXES:
+                op.create_index(
+                    name, table, [column],
+                    postgresql_using="gin",
+                    postgresql_ops={column: "gin_trgm_ops"},
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+
+def downgrade():
+    if _is_postgresql():
+        for name, table, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
+    for name, table, _, _ in INDEXES:
+        op.drop_index(name, table_name=table)
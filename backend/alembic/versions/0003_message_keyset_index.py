@@ -0,0 +1,37 @@
+"""keyset index for paginated chat history
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # History pages are keyed on message id, which supersedes the
+    # (sender_id, recipient_id, timestamp) index
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_messages_sender_recipient_id", "messages", ["sender_id", "recipient_id", "id"], if_not_exists=True)
+        op.drop_index("ix_messages_sender_recipient_timestamp", table_name="messages", if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_messages_sender_recipient_id", "messages", ["sender_id", "recipient_id", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_messages_sender_recipient_timestamp", table_name="messages",
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade():
+    op.create_index("ix_messages_sender_recipient_timestamp", "messages", ["sender_id", "recipient_id", "timestamp"])
+    op.drop_index("ix_messages_sender_recipient_id", table_name="messages")
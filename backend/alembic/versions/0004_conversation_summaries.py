@@ -0,0 +1,53 @@
+"""conversation summaries for the chat inbox
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "conversations",
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("peer_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("last_message_id", sa.Integer(), nullable=False),
+        sa.Column("last_message_at", sa.DateTime()),
+        sa.Column("last_sender_id", sa.Integer()),
+        sa.Column("last_message_preview", sa.String(200)),
+        sa.Column("unread_count", sa.Integer(), nullable=False),
+        sa.Column("last_read_message_id", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_conversations_owner_last_message", "conversations", ["owner_id", "last_message_id"])
+
+    # Backfill both participants' view of every existing conversation
+    op.execute("""
+        INSERT INTO conversations (owner_id, peer_id, last_message_id, unread_count, last_read_message_id)
+        SELECT owner_id, peer_id, max(id), sum(unread), 0
+        FROM (
+            SELECT sender_id AS owner_id, recipient_id AS peer_id, id, 0 AS unread FROM messages
+            UNION ALL
+            SELECT recipient_id, sender_id, id, CASE WHEN is_read THEN 0 ELSE 1 END
+            FROM messages WHERE sender_id <> recipient_id
+        ) AS sides
+        GROUP BY owner_id, peer_id
+    """)
+    op.execute("""
+        UPDATE conversations SET
+            last_message_at = (SELECT timestamp FROM messages WHERE id = conversations.last_message_id),
+            last_sender_id = (SELECT sender_id FROM messages WHERE id = conversations.last_message_id),
+            last_message_preview = (SELECT substr(content, 1, 200) FROM messages WHERE id = conversations.last_message_id)
+    """)
+
+
+def downgrade():
+    op.drop_index("ix_conversations_owner_last_message", table_name="conversations")
+    op.drop_table("conversations")
@@ -0,0 +1,32 @@
+"""client message ids for idempotent chat sends
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("messages", sa.Column("client_id", sa.String(64)))
+    # NULLs are distinct, so only messages that carry a client id are constrained
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_messages_sender_client_id", "messages", ["sender_id", "client_id"], unique=True)
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_messages_sender_client_id", "messages", ["sender_id", "client_id"],
+            unique=True, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    op.drop_index("ix_messages_sender_client_id", table_name="messages")
+    op.drop_column("messages", "client_id")
@@ -0,0 +1,62 @@
+"""chat rooms: rooms, memberships and room posts in messages
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "rooms",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_rooms_id", "rooms", ["id"])
+    op.create_table(
+        "room_members",
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("joined_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_room_members_user_id", "room_members", ["user_id"])
+
+    # Dropping NOT NULL and adding a nullable column are metadata-only on
+    # PostgreSQL; SQLite rebuilds the table
+    with op.batch_alter_table("messages") as batch:
+        batch.alter_column("recipient_id", existing_type=sa.Integer(), nullable=True)
+        batch.add_column(sa.Column("room_id", sa.Integer()))
+        batch.create_foreign_key("messages_room_id_fkey", "rooms", ["room_id"], ["id"])
+
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_messages_room_id", "messages", ["room_id", "id"])
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_messages_room_id", "messages", ["room_id", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    op.drop_index("ix_messages_room_id", table_name="messages")
+    op.execute("DELETE FROM messages WHERE room_id IS NOT NULL")
+    with op.batch_alter_table("messages") as batch:
+        batch.drop_constraint("messages_room_id_fkey", type_="foreignkey")
+        batch.drop_column("room_id")
+        batch.alter_column("recipient_id", existing_type=sa.Integer(), nullable=False)
+    op.drop_index("ix_room_members_user_id", table_name="room_members")
+    op.drop_table("room_members")
+    op.drop_index("ix_rooms_id", table_name="rooms")
+    op.drop_table("rooms")
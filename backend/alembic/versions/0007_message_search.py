@@ -0,0 +1,54 @@
+"""full-text search over chat messages (PostgreSQL)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 50_000
+
+
+def upgrade():
+    # SQLite deployments (tests) search through the in-process index in
+    # app.services.message_search instead
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # A nullable column without a default is metadata-only; the trigger
+    # keeps it current for every message stored from here on
+    op.add_column("messages", sa.Column("search_vector", sa.dialects.postgresql.TSVECTOR()))
+    op.execute(
+        "CREATE TRIGGER messages_search_vector_update BEFORE INSERT OR UPDATE OF content ON messages "
+        "FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.english', content)"
+    )
+
+    # Backfill existing rows in short transactions, then build the index
+    # without blocking writes
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = bind.scalar(sa.text("SELECT coalesce(max(id), 0) FROM messages"))
+        for start in range(0, last_id, BACKFILL_BATCH):
+            bind.execute(sa.text(
+                "UPDATE messages SET search_vector = to_tsvector('pg_catalog.english', content) "
+                "WHERE id > :start AND id <= :end AND search_vector IS NULL"
+            ), {"start": start, "end": start + BACKFILL_BATCH})
+        op.create_index(
+            "ix_messages_search_vector", "messages", ["search_vector"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_messages_search_vector", table_name="messages")
+    op.execute("DROP TRIGGER messages_search_vector_update ON messages")
+    op.drop_column("messages", "search_vector")
@@ -0,0 +1,60 @@
+"""profiles.updated_at for incremental directory index refreshes
+
+Directory search moved to an in-memory index, so the trigram indexes that
+served its ilike queries go too.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = [
+    ("ix_profiles_full_name_trgm", "full_name"),
+    ("ix_profiles_department_trgm", "department"),
+]
+
+
+def upgrade():
+    # now() is stable, so on PostgreSQL existing rows share the value computed
+    # once here and the column is added without a table rewrite. SQLite can't
+    # add a column with a non-constant default, so batch mode rebuilds it.
+    with op.batch_alter_table("profiles") as batch:
+        batch.add_column(sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()))
+
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_profiles_updated_at", "profiles", ["updated_at"])
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_profiles_updated_at", "profiles", ["updated_at"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        for name, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name="profiles", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_profiles_updated_at", table_name="profiles")
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and bind.scalar(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ) is not None:
+        with op.get_context().autocommit_block():
+            for name, column in TRIGRAM_INDEXES:
+                op.create_index(
+                    name, "profiles", [column],
+                    postgresql_using="gin",
+                    postgresql_ops={column: "gin_trgm_ops"},
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+    with op.batch_alter_table("profiles") as batch:
+        batch.drop_column("updated_at")
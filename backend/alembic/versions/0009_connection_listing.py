@@ -0,0 +1,49 @@
+"""keyset indexes for paginated connection listings
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Each side of a user's connections with one status, in id order, so a
+# page is a range scan. The recipient one supersedes both the
+# (recipient_id, status) index and the partial pending-inbox index.
+NEW_INDEXES = [
+    ("ix_connections_requester_status_id", ["requester_id", "status", "id"]),
+    ("ix_connections_recipient_status_id", ["recipient_id", "status", "id"]),
+]
+OLD_INDEXES = ["ix_connections_recipient_status", "ix_connections_recipient_pending"]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        for name, columns in NEW_INDEXES:
+            op.create_index(name, "connections", columns, if_not_exists=True)
+        for name in OLD_INDEXES:
+            op.drop_index(name, table_name="connections", if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, columns in NEW_INDEXES:
+            op.create_index(name, "connections", columns, postgresql_concurrently=True, if_not_exists=True)
+        for name in OLD_INDEXES:
+            op.drop_index(name, table_name="connections", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    op.create_index("ix_connections_recipient_status", "connections", ["recipient_id", "status"])
+    op.create_index(
+        "ix_connections_recipient_pending", "connections", ["recipient_id"],
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+    for name, _ in NEW_INDEXES:
+        op.drop_index(name, table_name="connections")
@@ -0,0 +1,44 @@
+"""one connection row per pair of users
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+LOW = "(CASE WHEN requester_id < recipient_id THEN requester_id ELSE recipient_id END)"
+HIGH = "(CASE WHEN requester_id < recipient_id THEN recipient_id ELSE requester_id END)"
+
+
+def upgrade():
+    # Requests crossing in both directions, or racing each other, left some
+    # pairs with several rows: keep the one that got furthest, then the oldest
+    op.execute(f"""DELETE FROM connections WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY {LOW}, {HIGH}
+                ORDER BY CASE status WHEN 'accepted' THEN 0 WHEN 'pending' THEN 1 ELSE 2 END, id
+            ) AS rank
+            FROM connections
+        ) ranked WHERE rank > 1)""")
+
+    pair = [sa.text(LOW), sa.text(HIGH)]
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_connections_pair", "connections", pair, unique=True)
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_connections_pair", "connections", pair,
+            unique=True, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    op.drop_index("ix_connections_pair", table_name="connections")
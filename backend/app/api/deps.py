@@ -1,17 +1,78 @@
+import time
 from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from app import models, schemas
-from app.core import security
+from app.core import metrics, security
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.db.session import get_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
-def get_current_user(
-    db: Session = Depends(get_db),
+# token -> user id, never cached past the token's own expiry
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+# user id -> column values of the users row
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+def _cache_metric(field: str):
+    def collect():
+        return {(name,): cache.stats()[field] for name, cache in (("principal", principal_cache), ("user", user_cache))}
+    return collect
+
+metrics.register("auth_cache_size", "Entries in the authentication caches.", _cache_metric("size"), ("cache",))
+metrics.register("auth_cache_hits_total", "Authentication cache lookups answered from the cache.", _cache_metric("hits"), ("cache",), kind="counter")
+metrics.register("auth_cache_misses_total", "Authentication cache lookups that went to the token or database.", _cache_metric("misses"), ("cache",), kind="counter")
+
+def invalidate_user(user_id: int):
+    """
+    Drop a cached users row, e.g. after it was updated or deactivated.
+    """
+    user_cache.pop(user_id)
+
+@event.listens_for(models.user.User, "after_update")
+@event.listens_for(models.user.User, "after_delete")
+def _invalidate_user_on_write(mapper, connection, target):
+    invalidate_user(target.id)
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_users_on_bulk_write(orm_execute_state):
+    # update(User)/delete(User) run through a session skip the mapper events
+    # above, and the rows they touch aren't known, so every cached user goes
+    writes = orm_execute_state.is_update or orm_execute_state.is_delete
+    if writes and orm_execute_state.bind_mapper is inspect(models.user.User):
+        user_cache.clear()
+
+def _user_columns(user: models.user.User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(models.user.User).column_attrs}
+
+async def _attach_cached_user(db: AsyncSession, columns: dict) -> models.user.User:
+    # Rebuild the row as a detached instance and merge it without a SELECT,
+    # so the instance still belongs to this request's session.
+    user = models.user.User(**columns)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+def _decode_principal(token: str, credentials_exception: HTTPException) -> int:
+    user_id = principal_cache.get(token)
+    if user_id is not None:
+        return user_id
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id = int(payload.get("sub"))
+    except (JWTError, ValueError, TypeError):
+        raise credentials_exception
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        principal_cache.set(token, user_id, ttl=expires_at - time.time())
+    return user_id
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> models.user.User:
     credentials_exception = HTTPException(
@@ -19,16 +80,26 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    user_id = _decode_principal(token, credentials_exception)
+
+    columns = user_cache.get(user_id)
+    if columns is not None:
+        user = await _attach_cached_user(db, columns)
+    else:
+        user = await db.scalar(select(models.user.User).where(models.user.User.id == user_id))
+        if user is None:
             raise credentials_exception
-        token_data = schemas.token.TokenData(email=user_id) # Using user_id as email placeholder or create new TokenData field
-    except (JWTError, ValueError):
-        raise credentials_exception
-    
-    user = db.query(models.user.User).filter(models.user.User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+        user_cache.set(user_id, _user_columns(user))
+        # End this read: a long request (a bulk import) would otherwise hold
+        # the connection idle in a transaction until it responds
+        await db.commit()
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     return user
+
+async def get_current_active_admin(
+    current_user: models.user.User = Depends(get_current_user),
+) -> models.user.User:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+    return current_user
@@ -0,0 +1,69 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.api import deps
+from app.core import profiling
+from app.core.config import settings
+from app.db import session
+from app.db.session import get_sync_db
+from app.services.bulk_import import UserImporter, iter_records
+
+router = APIRouter()
+
+@router.post("/users/import", response_model=schemas.user.UserImportResult)
+def import_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$"),
+    db: Session = Depends(get_sync_db),
+    current_user: models.user.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Bulk-create users and profiles from a CSV or JSONL upload.
+    Each row carries the register fields (email, password, full_name, role)
+    plus optional profile fields. Invalid or duplicate rows are reported
+    per row and do not abort the import. Runs in the threadpool on a sync
+    session since it is a long-running batch job. Passwords share the
+    login hashing pool: when logins fill it the import stops with a 503,
+    keeping the batches already written; rerunning it reports those rows
+    as existing.
+    """
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            format = "csv"
+        elif filename.endswith((".jsonl", ".ndjson")):
+            format = "jsonl"
+        else:
+            raise HTTPException(status_code=400, detail="Could not detect file format, pass format=csv or format=jsonl")
+
+    importer = UserImporter(db, batch_size=settings.BULK_IMPORT_BATCH_SIZE)
+    return importer.run(iter_records(file.file, format))
+
+@router.get("/db/pool")
+def read_pool_status(
+    current_user: models.user.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Connection pool usage for the primary and each read replica.
+    """
+    return session.pool_status()
+
+@router.get("/sql-stats")
+def read_sql_stats(
+    current_user: models.user.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Per-route query counts, DB time and suspected N+1 statement shapes.
+    """
+    return profiling.route_stats()
+
+@router.delete("/sql-stats")
+def reset_sql_stats(
+    current_user: models.user.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Start a fresh measurement window.
+    """
+    profiling.reset_route_stats()
+    return {"status": "ok"}
@@ -1,79 +1,690 @@
-from typing import Any, List
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Set
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import func, insert, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
 from app.api import deps
-from app.db.session import get_db, SessionLocal
-from app.models.chat import Message
-from app.core import security
+from app.db.session import get_db, get_read_db, AsyncSessionLocal, async_engine
+from app.models.chat import Conversation, Message, Room, RoomMember
+from app.core import metrics, security
+from app.core.cache import TTLCache
+from app.core.pagination import decode_cursor, decode_offset, encode_cursor
 from jose import jwt, JWTError
 from app.core.config import settings
+from app.services import conversations, message_search
+from app.services.chat_backplane import Backplane, create_backplane
+from app.services.chat_protocol import LegacyCodec, ProtocolError, get_codec, message_event, room_message_event
+from app.services.message_writer import MessageWriter
+
+logger = logging.getLogger("app.chat")
 
 router = APIRouter()
 
+class ClientConnection:
+    """
+    One WebSocket and its bounded outbound queue. A writer task drains the
+    queue, so a slow client only ever delays its own messages. When the
+    queue is full the manager's policy either drops the oldest queued
+    message or disconnects the client.
+    """
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager", codec):
+        self.websocket = websocket
+        self.manager = manager
+        # Renders events in the wire format this socket negotiated
+        self.codec = codec
+        self.queue: deque = deque()
+        # monotonic time of the last frame received from the client
+        self.last_seen = time.monotonic()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._writer = asyncio.create_task(self._drain())
+        self.closed = False
+
+    def send(self, event: dict):
+        if self.closed:
+            return
+        if len(self.queue) >= self.manager.queue_size:
+            if self.manager.queue_policy == "disconnect":
+                self.manager.slow_consumer_disconnects += 1
+                self.evict()
+                return
+            self.queue.popleft()
+            self.manager.dropped_messages += 1
+        self.queue.append(event)
+        self._ready.set()
+
+    async def replay(self, events: List[dict]):
+        """
+        Queue a backlog (a resume) without dropping any of it: waits for the
+        writer to make room instead of applying the full-queue policy.
+        """
+        for event in events:
+            while not self.closed and len(self.queue) >= self.manager.queue_size:
+                self._space.clear()
+                await self._space.wait()
+            self.send(event)
+
+    def evict(self, code: int = 1013):
+        # Defaults to 1013: try again later
+        self.close()
+        asyncio.create_task(self._close_socket(code))
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        self._space.set()
+        self._writer.cancel()
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def _drain(self):
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self.queue:
+                    frame = self.codec.encode(self.queue.popleft())
+                    self._space.set()
+                    if frame is None:
+                        continue
+                    if self.codec.binary:
+                        await self.websocket.send_bytes(frame)
+                    else:
+                        await self.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket went away; the receive loop cleans up
+            self.closed = True
+            self.queue.clear()
+            self._space.set()
+
+# Returns the ids of the rooms a user belongs to
+RoomLoader = Callable[[int], Awaitable[Iterable[int]]]
+
 class ConnectionManager:
-    def __init__(self):
-        # Map user_id to list of active websockets (allows multiple devices)
-        self.active_connections: dict[int, List[WebSocket]] = {}
+    QUEUE_POLICIES = ("drop_oldest", "disconnect")
+
+    def __init__(self, backplane: Backplane, queue_size: int, queue_policy: str,
+                 heartbeat_interval: float = 0, idle_timeout: float = 0,
+                 room_loader: Optional[RoomLoader] = None):
+        if queue_policy not in self.QUEUE_POLICIES:
+            raise ValueError(f"Unknown CHAT_SEND_QUEUE_POLICY {queue_policy!r}")
+        # Map user_id to list of active connections (allows multiple devices)
+        self.active_connections: dict[int, List[ClientConnection]] = {}
+        # Reaches sockets held by other worker processes
+        self.backplane = backplane
+        self.queue_size = queue_size
+        self.queue_policy = queue_policy
+        self.dropped_messages = 0
+        self.slow_consumer_disconnects = 0
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.idle_disconnects = 0
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # Rooms with members connected to this worker -> those members, and
+        # the reverse. A room post is delivered by walking only its online
+        # members, so the cost doesn't grow with the room's size.
+        self.room_members: dict[int, Set[int]] = {}
+        self.user_rooms: dict[int, Set[int]] = {}
+        self.room_loader = room_loader
+        # Topics carrying something other than chat -> what handles them
+        self.topic_handlers: dict[str, Callable[[str], Awaitable[None]]] = {}
+
+    async def start(self):
+        await self.backplane.start(self._deliver_published)
+        if self.heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        await self.backplane.stop()
+
+    async def _heartbeat(self):
+        """
+        One sweep per interval over every socket, rather than a timer per
+        socket: pings the quiet ones and closes those idle past the timeout.
+        """
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for connections in list(self.active_connections.values()):
+                for connection in connections:
+                    if connection.closed or not connection.codec.heartbeat:
+                        continue
+                    idle = now - connection.last_seen
+                    if self.idle_timeout and idle >= self.idle_timeout:
+                        self.idle_disconnects += 1
+                        # 1001: going away
+                        connection.evict(1001)
+                    elif idle >= self.heartbeat_interval:
+                        connection.send({"type": "ping"})
 
-    async def connect(self, websocket: WebSocket, user_id: int):
+    async def connect(self, websocket: WebSocket, user_id: int, codec=None) -> ClientConnection:
         await websocket.accept()
+        connection = ClientConnection(websocket, self, codec or LegacyCodec())
         if user_id not in self.active_connections:
             self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
+            await self.backplane.subscribe(f"user_{user_id}")
+            if self.room_loader is not None:
+                for room_id in await self.room_loader(user_id):
+                    await self._join_room(user_id, room_id)
+        self.active_connections[user_id].append(connection)
+        return connection
 
-    def disconnect(self, websocket: WebSocket, user_id: int):
+    async def disconnect(self, websocket: WebSocket, user_id: int):
         if user_id in self.active_connections:
-            if websocket in self.active_connections[user_id]:
-                self.active_connections[user_id].remove(websocket)
+            for connection in self.active_connections[user_id]:
+                if connection.websocket is websocket:
+                    connection.close()
+                    self.active_connections[user_id].remove(connection)
+                    break
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
+                await self.backplane.unsubscribe(f"user_{user_id}")
+                for room_id in self.user_rooms.pop(user_id, ()):
+                    await self._leave_room(user_id, room_id)
 
-    async def send_personal_message(self, message: str, user_id: int):
-        if user_id in self.active_connections:
-            for connection in self.active_connections[user_id]:
-                await connection.send_text(message)
+    async def _join_room(self, user_id: int, room_id: int):
+        self.user_rooms.setdefault(user_id, set()).add(room_id)
+        members = self.room_members.setdefault(room_id, set())
+        members.add(user_id)
+        if len(members) == 1:
+            await self.backplane.subscribe(f"room_{room_id}")
+
+    async def _leave_room(self, user_id: int, room_id: int):
+        self.user_rooms.get(user_id, set()).discard(room_id)
+        members = self.room_members.get(room_id)
+        if members is None:
+            return
+        members.discard(user_id)
+        if not members:
+            del self.room_members[room_id]
+            await self.backplane.unsubscribe(f"room_{room_id}")
+
+    async def _track_membership(self, user_id: int, event: dict):
+        # Membership changes reach every worker as events to the user, so
+        # each keeps its room index current for the users it holds
+        if user_id not in self.active_connections:
+            return
+        if event["type"] == "room_joined":
+            await self._join_room(user_id, event["room_id"])
+        elif event["type"] == "room_left":
+            await self._leave_room(user_id, event["room_id"])
+
+    async def listen(self, topic: str, handler: Callable[[str], Awaitable[None]]):
+        """Hand what other workers publish to `topic` to `handler` rather than to sockets."""
+        self.topic_handlers[topic] = handler
+        await self.backplane.subscribe(topic)
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self.active_connections.values())
+
+    def queue_depths(self) -> List[int]:
+        return [len(c.queue) for connections in self.active_connections.values() for c in connections]
+
+    def deliver_local(self, user_id: int, event: dict):
+        # Only enqueues: each device's writer task sends concurrently
+        for connection in self.active_connections.get(user_id, ()):
+            connection.send(event)
+
+    def deliver_room_local(self, room_id: int, event: dict):
+        for user_id in self.room_members.get(room_id, ()):
+            self.deliver_local(user_id, event)
+
+    async def _deliver_published(self, topic: str, payload: str):
+        handler = self.topic_handlers.get(topic)
+        if handler is not None:
+            await handler(payload)
+            return
+        kind, key = topic.split("_", 1)
+        event = json.loads(payload)
+        if kind == "room":
+            self.deliver_room_local(int(key), event)
+        else:
+            await self._track_membership(int(key), event)
+            self.deliver_local(int(key), event)
+
+    async def send_event(self, event: dict, user_id: int):
+        await self.send_events(event, [user_id])
+
+    async def send_events(self, event: dict, user_ids: Iterable[int]):
+        """The same event to many users, published in one round trip."""
+        user_ids = list(user_ids)
+        for user_id in user_ids:
+            await self._track_membership(user_id, event)
+            self.deliver_local(user_id, event)
+        payload = json.dumps(event)
+        try:
+            await self.backplane.publish_many([(f"user_{user_id}", payload) for user_id in user_ids])
+        except Exception:
+            # The message is already stored; only live delivery is lost
+            logger.exception("Failed to publish chat event to %d user(s)", len(user_ids))
+
+    async def send_room_event(self, event: dict, room_id: int):
+        self.deliver_room_local(room_id, event)
+        try:
+            await self.backplane.publish(f"room_{room_id}", json.dumps(event))
+        except Exception:
+            logger.exception("Failed to publish chat event for room %s", room_id)
+
+async def _member_room_ids(user_id: int) -> List[int]:
+    async with AsyncSessionLocal() as db:
+        return list((await db.scalars(select(RoomMember.room_id).where(RoomMember.user_id == user_id))).all())
+
+manager = ConnectionManager(
+    create_backplane(settings.CHAT_BACKPLANE, async_engine),
+    queue_size=settings.CHAT_SEND_QUEUE_SIZE,
+    queue_policy=settings.CHAT_SEND_QUEUE_POLICY,
+    heartbeat_interval=settings.CHAT_HEARTBEAT_INTERVAL,
+    idle_timeout=settings.CHAT_IDLE_TIMEOUT,
+    room_loader=_member_room_ids,
+)
+
+metrics.register("chat_websocket_connections", "Open chat WebSocket connections.", manager.connection_count)
+metrics.register("chat_connected_users", "Users with at least one open chat WebSocket.", lambda: len(manager.active_connections))
+metrics.register("chat_send_queue_depth", "Messages queued for delivery across all sockets.", lambda: sum(manager.queue_depths()))
+metrics.register("chat_send_queue_max_depth", "Deepest outbound queue of any single socket.", lambda: max(manager.queue_depths(), default=0))
+metrics.register("chat_dropped_messages_total", "Messages dropped from full outbound queues.", lambda: manager.dropped_messages, kind="counter")
+metrics.register("chat_slow_consumer_disconnects_total", "Sockets closed because their outbound queue was full.", lambda: manager.slow_consumer_disconnects, kind="counter")
+metrics.register("chat_active_rooms", "Rooms with members connected to this worker.", lambda: len(manager.room_members))
+metrics.register("chat_idle_disconnects_total", "Sockets closed after going silent past the idle timeout.", lambda: manager.idle_disconnects, kind="counter")
+
+message_writer = MessageWriter(
+    async_engine,
+    batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+    interval=settings.CHAT_WRITE_INTERVAL_MS / 1000,
+    max_queue=settings.CHAT_WRITE_MAX_QUEUE,
+)
+
+# Recipients already seen to exist; users are never deleted in the app
+known_users = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=3600)
+
+metrics.register("chat_write_queue_depth", "Chat messages waiting to be stored.", message_writer.queue_depth)
+metrics.register("chat_write_batches_total", "Batches of chat messages stored.", lambda: message_writer.batches, kind="counter")
+metrics.register("chat_written_messages_total", "Chat messages stored by the batched writer.", lambda: message_writer.messages, kind="counter")
+
+def _cursor_id(cursor: str) -> int:
+    message_id = decode_cursor(cursor, "id")["id"]
+    if not isinstance(message_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return message_id
+
+def _history_page_query(user_id: int, other_id: int, limit: int, before: Optional[int], after: Optional[int]):
+    """
+    One page of a conversation plus one lookahead row. Each direction is a
+    separate range scan on (sender_id, recipient_id, id), so the cost is
+    O(limit) however long the history is.
+    """
+    order = Message.id.asc() if after is not None else Message.id.desc()
+
+    def direction(sender_id: int, recipient_id: int):
+        stmt = select(Message.id).where(Message.sender_id == sender_id, Message.recipient_id == recipient_id)
+        if before is not None:
+            stmt = stmt.where(Message.id < before)
+        if after is not None:
+            stmt = stmt.where(Message.id > after)
+        return select(stmt.order_by(order).limit(limit + 1).subquery().c.id)
+
+    # union (not union all) so a conversation with yourself isn't doubled
+    ids = union(direction(user_id, other_id), direction(other_id, user_id)).subquery()
+    return select(Message).join(ids, Message.id == ids.c.id).order_by(order).limit(limit + 1)
+
+@router.get("/history/{user_id}", response_model=schemas.chat.MessagePage)
+async def get_chat_history(
+    user_id: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get chat history between current user and another user, newest first,
+    one page at a time.
+    """
+    if before is not None and after is not None:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    before_id = _cursor_id(before) if before is not None else None
+    after_id = _cursor_id(after) if after is not None else None
+
+    messages = list((await db.scalars(
+        _history_page_query(current_user.id, user_id, limit, before_id, after_id)
+    )).all())
+    return _keyset_page(schemas.chat.MessagePage, messages, limit, before, after)
+
+def _keyset_page(page_class, messages: List[Message], limit: int, before: Optional[str], after: Optional[str]):
+    """Turn a page query's rows (with lookahead) into a newest-first page with cursors."""
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if after is not None:
+        messages.reverse()
+
+    page = page_class(items=messages)
+    if messages:
+        # Paging forwards we came from an older page, so older rows exist
+        if has_more or after is not None:
+            page.next_cursor = encode_cursor(id=messages[-1].id)
+        page.prev_cursor = encode_cursor(id=messages[0].id)
+    else:
+        # Caught up (or past the start): poll again from the same position
+        page.prev_cursor = after or before
+    return page
+
+def _room_page_query(room_id: int, limit: int, before: Optional[int], after: Optional[int]):
+    """One page of a room plus one lookahead row: a range scan on (room_id, id)."""
+    order = Message.id.asc() if after is not None else Message.id.desc()
+    stmt = select(Message).where(Message.room_id == room_id)
+    if before is not None:
+        stmt = stmt.where(Message.id < before)
+    if after is not None:
+        stmt = stmt.where(Message.id > after)
+    return stmt.order_by(order).limit(limit + 1)
+
+async def _room_membership(db: AsyncSession, room_id: int, user_id: int):
+    row = (await db.execute(
+        select(Room, RoomMember.role)
+        .join(RoomMember, RoomMember.room_id == Room.id)
+        .where(Room.id == room_id, RoomMember.user_id == user_id)
+    )).first()
+    if row is None:
+        # Rooms you aren't in don't exist as far as you can tell
+        raise HTTPException(status_code=404, detail="Room not found")
+    return row
+
+async def _add_room_members(db: AsyncSession, room_id: int, user_ids: Set[int]) -> List[int]:
+    """Insert memberships for the given users that exist and aren't members yet."""
+    if not user_ids:
+        return []
+    existing = set((await db.scalars(
+        select(models.user.User.id).where(models.user.User.id.in_(user_ids))
+    )).all())
+    if existing != user_ids:
+        raise HTTPException(status_code=404, detail="User not found")
+    members = set((await db.scalars(
+        select(RoomMember.user_id).where(RoomMember.room_id == room_id, RoomMember.user_id.in_(user_ids))
+    )).all())
+    added = sorted(user_ids - members)
+    if added:
+        # One executemany, not an ORM object per member
+        await db.execute(insert(RoomMember), [
+            {"room_id": room_id, "user_id": user_id, "role": "member", "joined_at": datetime.utcnow()}
+            for user_id in added
+        ])
+    return added
+
+async def _room_summary(db: AsyncSession, room: Room) -> schemas.chat.Room:
+    member_count = await db.scalar(select(func.count()).select_from(RoomMember).where(RoomMember.room_id == room.id))
+    return schemas.chat.Room(
+        id=room.id, name=room.name, created_by=room.created_by, created_at=room.created_at,
+        member_count=member_count,
+    )
+
+@router.post("/rooms", response_model=schemas.chat.Room)
+async def create_room(
+    room_in: schemas.chat.RoomCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create a group conversation owned by the current user.
+    """
+    room = Room(name=room_in.name, created_by=current_user.id)
+    db.add(room)
+    await db.flush()
+    db.add(RoomMember(room_id=room.id, user_id=current_user.id, role="owner"))
+    added = await _add_room_members(db, room.id, set(room_in.member_ids) - {current_user.id})
+    await db.commit()
+    await db.refresh(room)
+
+    await manager.send_events({"type": "room_joined", "room_id": room.id}, [current_user.id] + added)
+    return await _room_summary(db, room)
+
+@router.get("/rooms", response_model=List[schemas.chat.Room])
+async def read_rooms(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    The rooms the current user belongs to, newest first.
+    """
+    mine = select(RoomMember.room_id).where(RoomMember.user_id == current_user.id)
+    rows = (await db.execute(
+        select(Room, func.count(RoomMember.user_id))
+        .join(RoomMember, RoomMember.room_id == Room.id)
+        .where(Room.id.in_(mine))
+        .group_by(Room.id)
+        .order_by(Room.id.desc())
+    )).all()
+    return [
+        schemas.chat.Room(
+            id=room.id, name=room.name, created_by=room.created_by, created_at=room.created_at,
+            member_count=member_count,
+        )
+        for room, member_count in rows
+    ]
+
+@router.post("/rooms/{room_id}/members", response_model=schemas.chat.Room)
+async def add_room_members(
+    room_id: int,
+    members_in: schemas.chat.RoomMembersAdd,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Add members to a room. Only the room's owner can add members.
+    """
+    room, role = await _room_membership(db, room_id, current_user.id)
+    if role != "owner":
+        raise HTTPException(status_code=403, detail="Only the room owner can add members")
+    added = await _add_room_members(db, room_id, set(members_in.user_ids))
+    await db.commit()
+
+    await manager.send_events({"type": "room_joined", "room_id": room_id}, added)
+    return await _room_summary(db, room)
+
+@router.delete("/rooms/{room_id}/members/{user_id}")
+async def remove_room_member(
+    room_id: int,
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Leave a room, or (as its owner) remove someone from it.
+    """
+    _, role = await _room_membership(db, room_id, current_user.id)
+    if user_id != current_user.id and role != "owner":
+        raise HTTPException(status_code=403, detail="Only the room owner can remove members")
+    member = await db.get(RoomMember, (room_id, user_id))
+    if member is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    await db.delete(member)
+    await db.commit()
+
+    await manager.send_event({"type": "room_left", "room_id": room_id}, user_id)
+    return {"status": "ok"}
+
+@router.post("/rooms/{room_id}/messages", response_model=schemas.chat.RoomMessage)
+async def send_room_message(
+    room_id: int,
+    message_in: schemas.chat.RoomMessageCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Post to a room via HTTP. The post is stored once and delivered to the
+    members that are online.
+    """
+    await _room_membership(db, room_id, current_user.id)
+    message = Message(sender_id=current_user.id, room_id=room_id, content=message_in.content)
+    db.add(message)
+    await db.commit()
+    await db.refresh(message)
+    message_search.record_messages([{
+        "id": message.id,
+        "sender_id": message.sender_id,
+        "room_id": room_id,
+        "content": message.content,
+        "timestamp": message.timestamp,
+    }])
+
+    await manager.send_room_event(
+        room_message_event(message.id, room_id, message.sender_id, message.content, message.timestamp), room_id
+    )
+    return message
+
+@router.get("/rooms/{room_id}/history", response_model=schemas.chat.RoomMessagePage)
+async def get_room_history(
+    room_id: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    A room's messages, newest first, paged like /history.
+    """
+    if before is not None and after is not None:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    await _room_membership(db, room_id, current_user.id)
+    before_id = _cursor_id(before) if before is not None else None
+    after_id = _cursor_id(after) if after is not None else None
+
+    messages = list((await db.scalars(_room_page_query(room_id, limit, before_id, after_id))).all())
+    return _keyset_page(schemas.chat.RoomMessagePage, messages, limit, before, after)
+
+@router.get("/search", response_model=schemas.chat.MessageSearchPage)
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Search the current user's direct messages and room posts, best match
+    first. Only the newest CHAT_SEARCH_CANDIDATES matches are ranked;
+    `truncated` says when there were more.
+    """
+    offset = decode_offset(cursor) if cursor is not None else 0
+    hits, truncated = await message_search.search(
+        await db.connection(), current_user.id, q, limit, offset, settings.CHAT_SEARCH_CANDIDATES
+    )
+    page = schemas.chat.MessageSearchPage(items=hits[:limit], truncated=truncated)
+    if len(hits) > limit:
+        page.next_cursor = encode_cursor(offset=offset + limit)
+    return page
 
-manager = ConnectionManager()
+@router.get("/conversations", response_model=schemas.chat.ConversationPage)
+async def read_conversations(
+    before: Optional[str] = None,
+    limit: int = Query(30, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    The current user's conversations, most recently active first, with the
+    last message and unread count.
+    """
+    stmt = (
+        select(Conversation, models.user.User.full_name)
+        .join(models.user.User, models.user.User.id == Conversation.peer_id)
+        .where(Conversation.owner_id == current_user.id)
+        .order_by(Conversation.last_message_id.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        stmt = stmt.where(Conversation.last_message_id < _cursor_id(before))
+    rows = (await db.execute(stmt)).all()
+
+    page = schemas.chat.ConversationPage(items=[
+        schemas.chat.ConversationSummary(
+            user_id=conversation.peer_id,
+            full_name=full_name,
+            last_message_id=conversation.last_message_id,
+            last_message_at=conversation.last_message_at,
+            last_sender_id=conversation.last_sender_id,
+            last_message_preview=conversation.last_message_preview,
+            unread_count=conversation.unread_count,
+        )
+        for conversation, full_name in rows[:limit]
+    ])
+    if len(rows) > limit:
+        page.next_cursor = encode_cursor(id=page.items[-1].last_message_id)
+    return page
 
-@router.get("/history/{user_id}", response_model=List[schemas.chat.Message])
-def get_chat_history(
+@router.post("/conversations/{user_id}/read", response_model=schemas.chat.MarkReadResult)
+async def mark_conversation_read(
     user_id: int,
-    db: Session = Depends(get_db),
+    read_in: Optional[schemas.chat.MarkRead] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Get chat history between current user and another user.
+    Mark every message from `user_id` up to `up_to_id` (default: all of
+    them) as read in one range update.
     """
-    messages = db.query(Message).filter(
-        or_(
-            (Message.sender_id == current_user.id) & (Message.recipient_id == user_id),
-            (Message.sender_id == user_id) & (Message.recipient_id == current_user.id)
+    up_to_id = read_in.up_to_id if read_in else None
+    if up_to_id is None:
+        up_to_id = await db.scalar(
+            select(Conversation.last_message_id)
+            .where(Conversation.owner_id == current_user.id, Conversation.peer_id == user_id)
         )
-    ).order_by(Message.timestamp).all()
-    return messages
+        if up_to_id is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+    marked, unread = await conversations.mark_read(await db.connection(), current_user.id, user_id, up_to_id)
+    await db.commit()
+    return {"marked": marked, "unread_count": unread}
 
 @router.post("/send", response_model=schemas.chat.Message)
 async def send_message(
     message_in: schemas.chat.MessageCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Send a message via HTTP (fallback/alternative to WebSocket).
     """
+    if not await _user_exists(message_in.recipient_id):
+        raise HTTPException(status_code=404, detail="User not found")
     message = Message(
         sender_id=current_user.id,
         recipient_id=message_in.recipient_id,
         content=message_in.content
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.flush()
+    stored = {
+        "id": message.id,
+        "sender_id": message.sender_id,
+        "recipient_id": message.recipient_id,
+        "content": message.content,
+        "timestamp": message.timestamp,
+    }
+    await conversations.record_messages(await db.connection(), [stored])
+    await db.commit()
+    await db.refresh(message)
+    message_search.record_messages([stored])
     
     # Try to notify recipient if connected via WS
-    await manager.send_personal_message(f"From {current_user.id}: {message.content}", message_in.recipient_id)
+    await manager.send_event(
+        message_event(message.id, message.sender_id, message.recipient_id, message.content, message.timestamp),
+        message_in.recipient_id,
+    )
     
     return message
 
@@ -81,11 +692,20 @@ async def send_message(
 async def websocket_endpoint(
     websocket: WebSocket, 
     client_id: int,
-    token: str = Query(...)
+    token: str = Query(...),
+    protocol: str = Query("text"),
+    last_seq: Optional[int] = Query(None),
 ):
     """
     WebSocket endpoint for real-time chat.
     Requires token in query parameter for authentication.
+
+    `protocol` picks the framing: "text" (the original "recipient_id:content"
+    format), "json" or "msgpack"; see app.services.chat_protocol. Structured
+    clients reconnecting with `last_seq` get only the messages they missed.
+
+    The socket holds no database session: messages are stored by the
+    batched writer and a resume borrows a connection only while it reads.
     """
     # Authenticate via token
     try:
@@ -97,40 +717,142 @@ async def websocket_endpoint(
     except (JWTError, ValueError):
         await websocket.close(code=1008)
         return
+    try:
+        codec = get_codec(protocol)
+    except (ProtocolError, ImportError):
+        # 1003: unsupported data
+        await websocket.close(code=1003)
+        return
+
+    connection = await manager.connect(websocket, user_id, codec)
+
+    # Deliveries wait for the message's batch to commit; chaining them keeps
+    # this socket's messages in order without blocking the receive loop.
+    previous: Optional[asyncio.Task] = None
 
-    await manager.connect(websocket, user_id)
-    
-    # Use a new DB session for WebSocket actions
-    db = SessionLocal()
-    
     try:
+        if last_seq is not None:
+            await _resume(connection, user_id, last_seq)
         while True:
-            data = await websocket.receive_text()
-            # Expected format: "recipient_id:message_content"
+            data = await (websocket.receive_bytes() if codec.binary else websocket.receive_text())
+            connection.last_seen = time.monotonic()
             try:
-                recipient_id_str, content = data.split(":", 1)
-                recipient_id = int(recipient_id_str)
-                
-                # Save to DB
-                message = Message(
-                    sender_id=user_id,
-                    recipient_id=recipient_id,
-                    content=content
+                frame = codec.decode(data)
+            except ProtocolError as e:
+                connection.send({"type": "error", "detail": str(e)})
+                continue
+
+            if frame["type"] == "pong":
+                continue
+            if frame["type"] == "ping":
+                connection.send({"type": "pong"})
+                continue
+            if frame["type"] == "resume":
+                await _resume(connection, user_id, frame["last_seq"])
+                continue
+
+            client_message_id = frame.get("client_id")
+            if frame["type"] == "room_send":
+                # Membership comes from the in-memory room index, not a query
+                if frame["room_id"] not in manager.user_rooms.get(user_id, ()):
+                    connection.send(_with_client_id({"type": "error", "detail": "Room not found"}, client_message_id))
+                    continue
+                stored = await message_writer.enqueue(
+                    user_id, None, frame["content"], client_message_id, room_id=frame["room_id"]
                 )
-                db.add(message)
-                db.commit()
-                db.refresh(message)
-                
-                # Send to recipient
-                await manager.send_personal_message(f"From {user_id}: {content}", recipient_id)
-                
-                # Send confirmation to sender (optional, or rely on them seeing it in UI)
-                # await manager.send_personal_message(f"You sent: {content}", user_id)
-                
-            except ValueError:
-                await manager.send_personal_message("Invalid message format. Use recipient_id:content", user_id)
-                
+            else:
+                if not await _user_exists(frame["recipient_id"]):
+                    connection.send(_with_client_id({"type": "error", "detail": "User not found"}, client_message_id))
+                    continue
+                stored = await message_writer.enqueue(user_id, frame["recipient_id"], frame["content"], client_message_id)
+            previous = asyncio.create_task(
+                _deliver_when_stored(connection, stored, previous, user_id, frame, client_message_id)
+            )
+
     except WebSocketDisconnect:
-        manager.disconnect(websocket, user_id)
+        pass
     finally:
-        db.close()
+        # Always deregister so the connection gauge can't drift on errors
+        await manager.disconnect(websocket, user_id)
+
+async def _deliver_when_stored(connection: ClientConnection, stored: asyncio.Future, previous: Optional[asyncio.Task],
+                               user_id: int, frame: dict, client_message_id: Optional[str]):
+    if previous is not None:
+        await asyncio.gather(previous, return_exceptions=True)
+    try:
+        result = await stored
+    except Exception:
+        connection.send(_with_client_id({"type": "error", "detail": "Failed to store message"}, client_message_id))
+        return
+    # A resend of a stored message is only acked again, not re-delivered
+    if result.created and frame["type"] == "room_send":
+        await manager.send_room_event(
+            room_message_event(result.id, frame["room_id"], user_id, frame["content"], result.timestamp, client_message_id),
+            frame["room_id"],
+        )
+    elif result.created:
+        await manager.send_event(
+            message_event(result.id, user_id, frame["recipient_id"], frame["content"], result.timestamp, client_message_id),
+            frame["recipient_id"],
+        )
+    # Ack only the sending socket, once the message is durable
+    connection.send(_with_client_id({"type": "ack", "seq": result.id}, client_message_id))
+
+async def _user_exists(user_id: int) -> bool:
+    """Checked before a message is queued, so no batch carries a row the database will refuse."""
+    if user_id in manager.active_connections or known_users.get(user_id):
+        return True
+    async with AsyncSessionLocal() as db:
+        exists = await db.scalar(select(models.user.User.id).where(models.user.User.id == user_id)) is not None
+    if exists:
+        known_users.set(user_id, True)
+    return exists
+
+def _with_client_id(event: dict, client_message_id: Optional[str]) -> dict:
+    if client_message_id is not None:
+        event["client_id"] = client_message_id
+    return event
+
+async def _resume(connection: ClientConnection, user_id: int, last_seq: int):
+    """
+    Replay the messages to and from `user_id`, and the posts in their
+    rooms, with seq > last_seq, oldest first. Only conversations and rooms
+    active since last_seq are read, each with a keyset range scan, so the
+    cost follows the gap, not the history.
+    """
+    limit = settings.CHAT_RESUME_LIMIT
+    async with AsyncSessionLocal() as db:
+        peers = (await db.scalars(
+            select(Conversation.peer_id)
+            .where(Conversation.owner_id == user_id, Conversation.last_message_id > last_seq)
+        )).all()
+        # One probe of ix_messages_room_id per room finds those posted in since
+        rooms = (await db.scalars(
+            select(RoomMember.room_id)
+            .where(
+                RoomMember.user_id == user_id,
+                select(Message.id).where(Message.room_id == RoomMember.room_id, Message.id > last_seq).exists(),
+            )
+        )).all()
+        missed: List[Message] = []
+        for peer_id in peers:
+            missed.extend((await db.scalars(_history_page_query(user_id, peer_id, limit, None, last_seq))).all())
+        for room_id in rooms:
+            missed.extend((await db.scalars(_room_page_query(room_id, limit, None, last_seq))).all())
+    missed.sort(key=lambda message: message.id)
+    truncated = len(missed) > limit
+    missed = missed[:limit]
+    await connection.replay([
+        room_message_event(message.id, message.room_id, message.sender_id, message.content, message.timestamp,
+                           message.client_id)
+        if message.room_id is not None else
+        message_event(message.id, message.sender_id, message.recipient_id, message.content, message.timestamp,
+                      message.client_id)
+        for message in missed
+    ])
+    # When truncated, fetch the rest through /history or resume again from last_seq
+    connection.send({
+        "type": "resumed",
+        "last_seq": missed[-1].id if missed else last_seq,
+        "truncated": truncated,
+    })
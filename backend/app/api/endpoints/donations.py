@@ -1,6 +1,7 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
 from app.api import deps
 from app.db.session import get_db
@@ -11,9 +12,9 @@ import uuid
 router = APIRouter()
 
 @router.post("/campaigns", response_model=schemas.donation.Campaign)
-def create_campaign(
+async def create_campaign(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     campaign_in: schemas.donation.CampaignCreate,
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
@@ -32,33 +33,33 @@ def create_campaign(
         end_date=campaign_in.end_date
     )
     db.add(campaign)
-    db.commit()
-    db.refresh(campaign)
+    await db.commit()
+    await db.refresh(campaign)
     return campaign
 
 @router.get("/campaigns", response_model=List[schemas.donation.Campaign])
-def read_campaigns(
-    db: Session = Depends(get_db),
+async def read_campaigns(
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
     """
     Retrieve active campaigns.
     """
-    campaigns = db.query(DonationCampaign).offset(skip).limit(limit).all()
+    campaigns = (await db.scalars(select(DonationCampaign).offset(skip).limit(limit))).all()
     return campaigns
 
 @router.post("/donate", response_model=schemas.donation.Donation)
-def make_donation(
+async def make_donation(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     donation_in: schemas.donation.DonationCreate,
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Make a donation to a campaign.
     """
-    campaign = db.query(DonationCampaign).filter(DonationCampaign.id == donation_in.campaign_id).first()
+    campaign = await db.scalar(select(DonationCampaign).where(DonationCampaign.id == donation_in.campaign_id))
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
@@ -77,17 +78,17 @@ def make_donation(
     
     db.add(donation)
     db.add(campaign)
-    db.commit()
-    db.refresh(donation)
+    await db.commit()
+    await db.refresh(donation)
     return donation
 
 @router.get("/my", response_model=List[schemas.donation.Donation])
-def read_my_donations(
-    db: Session = Depends(get_db),
+async def read_my_donations(
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     List current user's donations.
     """
-    donations = db.query(Donation).filter(Donation.user_id == current_user.id).all()
+    donations = (await db.scalars(select(Donation).where(Donation.user_id == current_user.id))).all()
     return donations
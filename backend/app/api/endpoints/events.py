@@ -1,18 +1,19 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
 from app.api import deps
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.event import Event
 from app.core import moderation
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.event.Event)
-def create_event(
+async def create_event(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     event_in: schemas.event.EventCreate,
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
@@ -35,31 +36,31 @@ def create_event(
         max_attendees=event_in.max_attendees
     )
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    await db.commit()
+    await db.refresh(event)
     return event
 
 @router.get("/", response_model=List[schemas.event.Event])
-def read_events(
-    db: Session = Depends(get_db),
+async def read_events(
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
     """
     Retrieve events.
     """
-    events = db.query(Event).offset(skip).limit(limit).all()
+    events = (await db.scalars(select(Event).offset(skip).limit(limit))).all()
     return events
 
 @router.get("/{id}", response_model=schemas.event.Event)
-def read_event(
+async def read_event(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get event by ID.
     """
-    event = db.query(Event).filter(Event.id == id).first()
+    event = await db.scalar(select(Event).where(Event.id == id))
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
@@ -1,9 +1,11 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app import models, schemas
 from app.api import deps
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.gamification import Badge, UserBadge
 from app.models.profile import Profile
 from app.models.user import User
@@ -11,15 +13,15 @@ from app.models.user import User
 router = APIRouter()
 
 @router.get("/leaderboard", response_model=List[schemas.gamification.LeaderboardEntry])
-def get_leaderboard(
-    db: Session = Depends(get_db),
+async def get_leaderboard(
+    db: AsyncSession = Depends(get_read_db),
     limit: int = 10,
 ) -> Any:
     """
     Get top users by points.
     """
     # Join Profile and User to get names
-    results = db.query(Profile).join(User).order_by(Profile.points.desc()).limit(limit).all()
+    results = (await db.scalars(select(Profile).join(User).order_by(Profile.points.desc()).limit(limit))).all()
     
     leaderboard = []
     for profile in results:
@@ -31,30 +33,32 @@ def get_leaderboard(
     return leaderboard
 
 @router.get("/badges", response_model=List[schemas.gamification.Badge])
-def get_badges(
-    db: Session = Depends(get_db),
+async def get_badges(
+    db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     List all available badges.
     """
-    badges = db.query(Badge).all()
+    badges = (await db.scalars(select(Badge))).all()
     return badges
 
 @router.get("/my-badges", response_model=List[schemas.gamification.UserBadge])
-def get_my_badges(
-    db: Session = Depends(get_db),
+async def get_my_badges(
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get badges earned by current user.
     """
-    user_badges = db.query(UserBadge).filter(UserBadge.user_id == current_user.id).all()
+    user_badges = (await db.scalars(
+        select(UserBadge).options(selectinload(UserBadge.badge)).where(UserBadge.user_id == current_user.id)
+    )).all()
     return user_badges
 
 @router.post("/badges", response_model=schemas.gamification.Badge)
-def create_badge(
+async def create_badge(
     badge_in: schemas.gamification.BadgeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user), # Should be admin
 ) -> Any:
     """
@@ -66,29 +70,29 @@ def create_badge(
         icon_url=badge_in.icon_url
     )
     db.add(badge)
-    db.commit()
-    db.refresh(badge)
+    await db.commit()
+    await db.refresh(badge)
     return badge
 
 @router.post("/award-points", response_model=schemas.gamification.LeaderboardEntry)
-def award_points(
+async def award_points(
     points_in: schemas.gamification.PointsUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Award points to yourself (Demo/Test purpose).
     In real app, this would be triggered by events.
     """
-    profile = current_user.profile
+    profile = await db.scalar(select(Profile).where(Profile.user_id == current_user.id))
     if not profile:
-         profile = models.profile.Profile(user_id=current_user.id)
+         profile = models.profile.Profile(user_id=current_user.id, points=0)
          db.add(profile)
     
     profile.points += points_in.points
     db.add(profile)
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
     
     return {
         "user_id": current_user.id,
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from typing import Any
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import async_engine
+
+router = APIRouter()
+
+class ReadinessCheck:
+    """
+    Caches the result of the database probe for HEALTH_CHECK_CACHE_SECONDS
+    so frequent readiness polling does not turn into a query per poll.
+    """
+    def __init__(self):
+        self.checked_at = 0.0
+        self.ready = False
+        self.detail = "not checked"
+        self._lock = asyncio.Lock()
+
+    async def _select_one(self):
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _probe(self):
+        try:
+            # The timeout covers checkout and connecting too, so an
+            # exhausted pool or unreachable host can't hang the probe
+            await asyncio.wait_for(self._select_one(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+            self.ready, self.detail = True, "ok"
+        except Exception as e:
+            self.ready, self.detail = False, f"database unavailable: {type(e).__name__}"
+        self.checked_at = time.monotonic()
+
+    async def get(self):
+        if time.monotonic() - self.checked_at > settings.HEALTH_CHECK_CACHE_SECONDS:
+            async with self._lock:
+                # Another request may have refreshed it while we waited
+                if time.monotonic() - self.checked_at > settings.HEALTH_CHECK_CACHE_SECONDS:
+                    await self._probe()
+        return self.ready, self.detail
+
+readiness = ReadinessCheck()
+
+@router.get("/live")
+async def liveness() -> Any:
+    """
+    The process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness_probe() -> Any:
+    """
+    The process can serve traffic: the database is reachable.
+    """
+    ready, detail = await readiness.get()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ok" if ready else "unavailable", "database": detail},
+    )
@@ -1,9 +1,10 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
 from app.api import deps
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.job import Job
 from app.models.user import User
 from app.core import moderation
@@ -11,9 +12,9 @@ from app.core import moderation
 router = APIRouter()
 
 @router.post("/", response_model=schemas.job.Job)
-def create_job(
+async def create_job(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     job_in: schemas.job.JobCreate,
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
@@ -36,13 +37,13 @@ def create_job(
         apply_link=job_in.apply_link
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     return job
 
 @router.get("/", response_model=List[schemas.job.Job])
-def read_jobs(
-    db: Session = Depends(get_db),
+async def read_jobs(
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     q: Optional[str] = None,
@@ -53,28 +54,28 @@ def read_jobs(
     """
     Retrieve jobs.
     """
-    query = db.query(Job)
+    query = select(Job)
     
     if q:
-        query = query.filter(Job.title.ilike(f"%{q}%"))
+        query = query.where(Job.title.ilike(f"%{q}%"))
     if location:
-        query = query.filter(Job.location.ilike(f"%{location}%"))
+        query = query.where(Job.location.ilike(f"%{location}%"))
     if job_type:
-        query = query.filter(Job.job_type == job_type)
+        query = query.where(Job.job_type == job_type)
         
-    jobs = query.offset(skip).limit(limit).all()
+    jobs = (await db.scalars(query.offset(skip).limit(limit))).all()
     return jobs
 
 @router.get("/{id}", response_model=schemas.job.Job)
-def read_job(
+async def read_job(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get job by ID.
     """
-    job = db.query(Job).filter(Job.id == id).first()
+    job = await db.scalar(select(Job).where(Job.id == id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.core import metrics
+from app.db import session
+
+router = APIRouter()
+
+def _pool_metric(field: str):
+    def collect():
+        return {(pool["name"],): pool[field] for pool in session.pool_status()}
+    return collect
+
+metrics.register("db_pool_size", "Configured connection pool size.", _pool_metric("size"), ("pool",))
+metrics.register("db_pool_checked_out", "Connections currently checked out of the pool.", _pool_metric("checked_out"), ("pool",))
+metrics.register("db_pool_overflow", "Connections beyond the pool size; negative while the pool is not yet full.", _pool_metric("overflow"), ("pool",))
+metrics.register("db_pool_acquired_total", "Connections handed out by the pool.", _pool_metric("acquired"), ("pool",), kind="counter")
+metrics.register("db_pool_timeouts_total", "Connection checkouts that timed out.", _pool_metric("timeouts"), ("pool",), kind="counter")
+metrics.register("db_pool_wait_seconds_total", "Time spent waiting for a pooled connection.", _pool_metric("wait_seconds_total"), ("pool",), kind="counter")
+
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """
+    Prometheus text exposition of request, WebSocket and pool metrics.
+    Rendered on the event loop, the only writer of the request series.
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
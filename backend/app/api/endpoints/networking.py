@@ -1,42 +1,233 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, or_, select, tuple_, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app import models, schemas
 from app.api import deps
-from app.db.session import get_db
+from app.api.endpoints.chat import manager as chat_manager
+from app.core import metrics
+from app.core.config import settings
+from app.core.pagination import decode_cursor, decode_offset, encode_cursor
+from app.db.session import get_db, get_read_db, async_engine
 from app.models.connection import Connection, ConnectionStatus
 from app.models.user import User
 from app.models.profile import Profile
+from app.services.directory_search import DirectoryIndex
+from app.services.mentor_matching import MentorIndex
+from app.services.people_you_may_know import PeopleYouMayKnow
+from app.services.connection_graph import ConnectionGraph
+from app.services.typeahead import Typeahead
+
+logger = logging.getLogger("app.networking")
 
 router = APIRouter()
 
-@router.get("/search", response_model=List[schemas.profile.Profile])
-def search_profiles(
-    q: Optional[str] = None,
+directory_index = DirectoryIndex(
+    async_engine, refresh_interval=settings.DIRECTORY_INDEX_REFRESH_SECONDS, typeahead=Typeahead(),
+)
+
+metrics.register("directory_index_profiles", "Profiles in this worker's directory search index.", directory_index.profile_count)
+metrics.register("typeahead_suggestions", "Distinct suggestions in this worker's typeahead index.", directory_index.typeahead.suggestion_count)
+
+mentor_index = MentorIndex(async_engine, refresh_interval=settings.MENTOR_INDEX_REFRESH_SECONDS)
+
+metrics.register("mentor_index_profiles", "Profiles in this worker's mentor matching index.", mentor_index.profile_count)
+
+# Its connection graph also answers degrees of separation and mutual
+# counts, without a query
+people_you_may_know = PeopleYouMayKnow(rebuild_interval=settings.PYMK_REBUILD_SECONDS, top_k=settings.PYMK_TOP_K,
+                                       snapshot_dir=settings.PYMK_SNAPSHOT_DIR)
+# Connections accepted on one worker reach the others' graphs over the
+# chat backplane; one lost there arrives with the next snapshot instead
+ACCEPTED_TOPIC = "accepted_connections"
+
+async def share_accepted(pairs: List[Tuple[int, int]]):
+    """Apply connections accepted here, and pass them to the other workers."""
+    if not pairs:
+        return
+    people_you_may_know.connect_many(pairs)
+    try:
+        await chat_manager.backplane.publish(ACCEPTED_TOPIC, json.dumps(pairs))
+    except Exception:
+        logger.exception("Failed to publish %d accepted connection(s)", len(pairs))
+
+async def apply_shared_accepted(payload: str):
+    people_you_may_know.connect_many([(a, b) for a, b in json.loads(payload)])
+
+def _connection_graph() -> ConnectionGraph:
+    """The graph, once its first snapshot has loaded: before that it knows no one."""
+    if not people_you_may_know.built:
+        raise HTTPException(status_code=503, detail="Connection graph is still loading", headers={"Retry-After": "5"})
+    return people_you_may_know.graph
+
+
+# Connection responses embed both users, so load them with the row
+CONNECTION_USERS = (selectinload(Connection.requester), selectinload(Connection.recipient))
+# (column holding the current user, column holding the other person)
+CONNECTION_SIDES = ((Connection.requester_id, Connection.recipient_id), (Connection.recipient_id, Connection.requester_id))
+RECEIVED_SIDES = ((Connection.recipient_id, Connection.requester_id),)
+
+@router.get("/search", response_model=schemas.profile.ProfileSearchPage)
+async def search_profiles(
+    q: Optional[str] = Query(None, max_length=200),
     department: Optional[str] = None,
     year: Optional[int] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Search for alumni/students by name, department, or graduation year.
+    Search alumni/students by name, department, skills, location or bio,
+    best match first, with counts by graduation year and department.
+    Words match as prefixes, with a typo or two in longer ones.
+    `department` keeps departments containing it, ignoring case, and
+    `year` filters on an exact value, e.g. a facet's.
     """
-    query = db.query(Profile)
-    
-    if q:
-        query = query.filter(Profile.full_name.ilike(f"%{q}%"))
-    if department:
-        query = query.filter(Profile.department.ilike(f"%{department}%"))
-    if year:
-        query = query.filter(Profile.graduation_year == year)
-        
-    return query.all()
+    offset = decode_offset(cursor) if cursor is not None else 0
+    await directory_index.ready()
+    results = directory_index.search(q, department, year, limit, offset)
+    profiles = (await db.scalars(select(Profile).where(Profile.id.in_(results.profile_ids)))).all()
+    by_id = {profile.id: profile for profile in profiles}
+    page = schemas.profile.ProfileSearchPage(
+        items=[by_id[profile_id] for profile_id in results.profile_ids[:limit] if profile_id in by_id],
+        total=results.total,
+        facets=schemas.profile.ProfileFacets(
+            graduation_year=[{"value": value, "count": count} for value, count in results.graduation_years],
+            department=[{"value": value, "count": count} for value, count in results.departments],
+        ),
+    )
+    if len(results.profile_ids) > limit:
+        page.next_cursor = encode_cursor(offset=offset + limit)
+    return page
+
+@router.get("/suggestions", response_model=List[schemas.networking.PersonSuggestion])
+async def suggest_connections(
+    limit: int = Query(10, ge=1, le=settings.PYMK_TOP_K),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    People you may know: friends of your connections, most mutual
+    connections first, favouring your department and graduation year.
+    """
+    _connection_graph()
+    candidates = people_you_may_know.suggest(current_user.id)
+    if not candidates:
+        return []
+    user_ids = [user_id for user_id, _ in candidates]
+    # Nor anyone with a request pending or declined either way
+    requests = (await db.execute(select(Connection.requester_id, Connection.recipient_id).where(or_(
+        (Connection.requester_id == current_user.id) & Connection.recipient_id.in_(user_ids),
+        (Connection.recipient_id == current_user.id) & Connection.requester_id.in_(user_ids),
+    )))).all()
+    requested = {requester if recipient == current_user.id else recipient for requester, recipient in requests}
+    profiles = {
+        profile.user_id: profile
+        for profile in (await db.scalars(select(Profile).where(Profile.user_id.in_(user_ids)))).all()
+    }
+    return [
+        schemas.networking.PersonSuggestion(
+            user_id=user_id,
+            full_name=profiles[user_id].full_name,
+            department=profiles[user_id].department,
+            graduation_year=profiles[user_id].graduation_year,
+            profile_picture_url=profiles[user_id].profile_picture_url,
+            mutual_connections=mutual,
+        )
+        for user_id, mutual in candidates
+        if user_id in profiles and user_id not in requested
+    ][:limit]
+
+@router.get("/mentors", response_model=List[schemas.networking.MentorMatch])
+async def match_mentors(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Alumni to ask for mentoring: most skills and interests in common
+    first, favouring your department and graduation year.
+    """
+    return await _mentor_matches(db, current_user.id, "alumni", limit)
+
+@router.get("/mentees", response_model=List[schemas.networking.MentorMatch])
+async def match_mentees(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Students you could mentor, ranked the same way.
+    """
+    return await _mentor_matches(db, current_user.id, "student", limit)
+
+async def _mentor_matches(db: AsyncSession, user_id: int, role: str, limit: int):
+    await mentor_index.ready()
+    matches = mentor_index.match(user_id, role, limit)
+    if not matches:
+        return []
+    profiles = {
+        profile.user_id: profile
+        for profile in (await db.scalars(
+            select(Profile).where(Profile.user_id.in_([match.user_id for match in matches]))
+        )).all()
+    }
+    return [
+        schemas.networking.MentorMatch(
+            user_id=match.user_id,
+            full_name=profiles[match.user_id].full_name,
+            department=profiles[match.user_id].department,
+            graduation_year=profiles[match.user_id].graduation_year,
+            profile_picture_url=profiles[match.user_id].profile_picture_url,
+            score=round(match.score, 3),
+            shared_skills=match.shared,
+        )
+        for match in matches
+        if match.user_id in profiles
+    ]
+
+@router.get("/path/{user_id}", response_model=schemas.networking.ConnectionPath)
+async def connection_path(
+    user_id: int,
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    How you're connected to someone: a shortest chain of connections
+    from you to them, up to CONNECTION_PATH_MAX_DEPTH hops. 503 until
+    this worker has loaded the connection graph.
+    """
+    path = _connection_graph().path(current_user.id, user_id, settings.CONNECTION_PATH_MAX_DEPTH)
+    if path is None:
+        return schemas.networking.ConnectionPath()
+    return schemas.networking.ConnectionPath(degree=len(path) - 1, user_ids=path)
+
+@router.get("/mutual", response_model=List[schemas.networking.MutualCount])
+async def mutual_connection_counts(
+    user_id: List[int] = Query(..., max_length=settings.MUTUAL_COUNTS_MAX_USERS),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    How many connections you share with each of `user_id` (repeat it,
+    ?user_id=1&user_id=2), in the order given. 503 until this worker has
+    loaded the connection graph.
+    """
+    counts = _connection_graph().mutual_counts(current_user.id, np.array(user_id))
+    return [
+        schemas.networking.MutualCount(user_id=other, mutual_connections=count)
+        for other, count in zip(user_id, counts.tolist())
+    ]
 
 @router.post("/connect/{user_id}", response_model=schemas.networking.Connection)
-def send_connection_request(
+async def send_connection_request(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
@@ -44,40 +235,39 @@ def send_connection_request(
     """
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot connect with yourself")
+    if await db.scalar(select(User.id).where(User.id == user_id)) is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
     # Check if connection already exists (in either direction)
-    existing = db.query(Connection).filter(
+    existing = await db.scalar(select(Connection).where(
         or_(
             (Connection.requester_id == current_user.id) & (Connection.recipient_id == user_id),
             (Connection.requester_id == user_id) & (Connection.recipient_id == current_user.id)
         )
-    ).first()
+    ).limit(1))
     
     if existing:
         raise HTTPException(status_code=400, detail="Connection request already exists or you are already connected")
     
-    connection = Connection(
-        requester_id=current_user.id,
-        recipient_id=user_id,
-        status=ConnectionStatus.PENDING
-    )
-    db.add(connection)
-    db.commit()
-    db.refresh(connection)
-    return connection
+    created = await _send_requests(db, current_user.id, [user_id])
+    if not created:
+        # Sent from the other side in the meantime
+        raise HTTPException(status_code=400, detail="Connection request already exists or you are already connected")
+    await db.commit()
+    return await db.scalar(select(Connection).options(*CONNECTION_USERS).where(Connection.id == created[user_id]))
 
 @router.put("/connect/{request_id}", response_model=schemas.networking.Connection)
-def respond_connection_request(
+async def respond_connection_request(
     request_id: int,
     connection_in: schemas.networking.ConnectionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Accept or Decline a connection request.
-    Only the recipient can accept/decline.
+    Only the recipient can accept/decline, and only while it's pending.
     """
-    connection = db.query(Connection).filter(Connection.id == request_id).first()
+    connection = await db.scalar(select(Connection).options(*CONNECTION_USERS).where(Connection.id == request_id))
     if not connection:
         raise HTTPException(status_code=404, detail="Connection request not found")
         
@@ -87,38 +277,224 @@ def respond_connection_request(
     if connection_in.status not in [ConnectionStatus.ACCEPTED, ConnectionStatus.DECLINED]:
          raise HTTPException(status_code=400, detail="Invalid status")
 
+    # Conditional, so two answers racing each other can't both win
+    answered = await db.scalar(
+        update(Connection)
+        .where(Connection.id == request_id, Connection.status == ConnectionStatus.PENDING)
+        .values(status=connection_in.status)
+        .returning(Connection.id)
+    )
+    await db.commit()
+    if answered is None:
+        raise HTTPException(status_code=400, detail="Connection request already answered")
     connection.status = connection_in.status
-    db.commit()
-    db.refresh(connection)
+    if connection.status == ConnectionStatus.ACCEPTED:
+        await share_accepted([(connection.requester_id, connection.recipient_id)])
     return connection
 
-@router.get("/requests/received", response_model=List[schemas.networking.Connection])
-def list_received_requests(
-    db: Session = Depends(get_db),
+@router.post("/connect", response_model=schemas.networking.ConnectionBatchResult)
+async def send_connection_requests(
+    batch_in: schemas.networking.ConnectionBatchCreate,
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    List pending connection requests received by current user.
+    Send connection requests to many users at once, e.g. everyone met at an
+    event. Each user gets a result; one that fails doesn't stop the rest.
     """
-    requests = db.query(Connection).filter(
-        Connection.recipient_id == current_user.id,
-        Connection.status == ConnectionStatus.PENDING
-    ).all()
-    return requests
+    user_ids = _batch_ids(batch_in.user_ids)
+    found = set((await db.scalars(select(User.id).where(User.id.in_(user_ids)))).all())
+    # Existing requests either way, for the whole batch in one lookup
+    pairs = (await db.execute(select(Connection.requester_id, Connection.recipient_id).where(or_(
+        (Connection.requester_id == current_user.id) & Connection.recipient_id.in_(user_ids),
+        (Connection.recipient_id == current_user.id) & Connection.requester_id.in_(user_ids),
+    )))).all()
+    connected = {requester if recipient == current_user.id else recipient for requester, recipient in pairs}
+
+    errors = {}
+    for user_id in user_ids:
+        if user_id == current_user.id:
+            errors[user_id] = "Cannot connect with yourself"
+        elif user_id not in found:
+            errors[user_id] = "User not found"
+        elif user_id in connected:
+            errors[user_id] = "Connection request already exists or you are already connected"
+    created = await _send_requests(db, current_user.id, [user_id for user_id in user_ids if user_id not in errors])
+    await db.commit()
+    for user_id in user_ids:
+        if user_id not in errors and user_id not in created:
+            errors[user_id] = "Connection request already exists or you are already connected"
+    return _batch_result(user_ids, created, errors)
 
-@router.get("/connections", response_model=List[schemas.networking.Connection])
-def list_connections(
-    db: Session = Depends(get_db),
+@router.put("/connect", response_model=schemas.networking.ConnectionBatchResult)
+async def respond_connection_requests(
+    batch_in: schemas.networking.ConnectionBatchUpdate,
+    db: AsyncSession = Depends(get_db),
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    List all accepted connections.
+    Accept or decline many pending requests at once. Each request gets a
+    result; only the recipient can answer, and only while it's pending.
     """
-    connections = db.query(Connection).filter(
-        or_(
-            Connection.requester_id == current_user.id,
-            Connection.recipient_id == current_user.id
-        ),
-        Connection.status == ConnectionStatus.ACCEPTED
-    ).all()
-    return connections
+    if batch_in.status not in [ConnectionStatus.ACCEPTED, ConnectionStatus.DECLINED]:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    request_ids = _batch_ids(batch_in.request_ids)
+    found = {row.id: row for row in (await db.execute(
+        select(Connection.id, Connection.requester_id, Connection.recipient_id, Connection.status)
+        .where(Connection.id.in_(request_ids))
+    )).all()}
+
+    errors = {}
+    for request_id in request_ids:
+        row = found.get(request_id)
+        if row is None:
+            errors[request_id] = "Connection request not found"
+        elif row.recipient_id != current_user.id:
+            errors[request_id] = "Not authorized to respond to this request"
+        elif row.status != ConnectionStatus.PENDING:
+            errors[request_id] = "Connection request already answered"
+    pending = [request_id for request_id in request_ids if request_id not in errors]
+    answered = set()
+    if pending:
+        answered = set((await db.scalars(
+            update(Connection)
+            .where(Connection.id.in_(pending), Connection.status == ConnectionStatus.PENDING)
+            .values(status=batch_in.status)
+            .returning(Connection.id)
+        )).all())
+    await db.commit()
+    for request_id in pending:
+        if request_id not in answered:
+            errors[request_id] = "Connection request already answered"
+    if batch_in.status == ConnectionStatus.ACCEPTED:
+        await share_accepted([(found[request_id].requester_id, current_user.id) for request_id in answered])
+    return _batch_result(request_ids, {request_id: request_id for request_id in answered}, errors)
+
+def _batch_ids(ids: List[int]) -> List[int]:
+    """Distinct ids in the order given, at most CONNECTION_BATCH_MAX."""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > settings.CONNECTION_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {settings.CONNECTION_BATCH_MAX} per batch")
+    return ids
+
+def _batch_result(ids: List[int], connection_ids: Dict[int, int], errors: Dict[int, str]):
+    return schemas.networking.ConnectionBatchResult(
+        succeeded=len(ids) - len(errors),
+        failed=len(errors),
+        items=[
+            schemas.networking.ConnectionBatchItem(id=item_id, connection_id=connection_ids.get(item_id), error=errors.get(item_id))
+            for item_id in ids
+        ],
+    )
+
+async def _send_requests(db: AsyncSession, requester_id: int, user_ids: List[int]) -> Dict[int, int]:
+    """
+    Pending requests to `user_ids` in one statement; returns the new
+    connection id per recipient. Pairs that already have a row either way
+    are skipped, by ix_connections_pair, however they got there.
+    """
+    if not user_ids:
+        return {}
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    created_at = datetime.utcnow()
+    result = await db.execute(
+        insert(Connection).on_conflict_do_nothing().returning(Connection.recipient_id, Connection.id),
+        [
+            {"requester_id": requester_id, "recipient_id": user_id, "status": ConnectionStatus.PENDING, "created_at": created_at}
+            for user_id in user_ids
+        ],
+    )
+    return dict(result.all())
+
+def _connection_page_query(user_id: int, sides, status: str, sort: str, limit: int, after: Optional[dict]):
+    """
+    One page of the user's connections with `status`, plus a lookahead
+    row, each joined to the other person's profile, and the total. `sides`
+    pairs the column holding the user with the one holding the other
+    person; each side pages separately, newest first as a range scan on
+    (user, status, id), as chat history does.
+    """
+    name = func.coalesce(Profile.full_name, User.full_name, "")
+
+    def side(own, other):
+        stmt = (
+            select(
+                Connection.id, Connection.status, Connection.created_at, other.label("user_id"),
+                name.label("full_name"), Profile.department, Profile.graduation_year, Profile.profile_picture_url,
+            )
+            .join(User, User.id == other)
+            .outerjoin(Profile, Profile.user_id == other)
+            .where(own == user_id, Connection.status == status)
+        )
+        if sort == "recent":
+            if after is not None:
+                stmt = stmt.where(Connection.id < after["id"])
+            stmt = stmt.order_by(Connection.id.desc())
+        else:
+            if after is not None:
+                stmt = stmt.where(tuple_(name, Connection.id) > tuple_(after["name"], after["id"]))
+            stmt = stmt.order_by(name, Connection.id)
+        return select(stmt.limit(limit + 1).subquery())
+
+    pages = union_all(*(side(own, other) for own, other in sides)).subquery()
+    order = (pages.c.id.desc(),) if sort == "recent" else (pages.c.full_name, pages.c.id)
+    return select(pages, _connection_count(user_id, sides, status).label("total")).order_by(*order).limit(limit + 1)
+
+def _connection_count(user_id: int, sides, status: str):
+    """Index-only counts of each side, added up."""
+    return sum(
+        select(func.count()).select_from(Connection).where(own == user_id, Connection.status == status).scalar_subquery()
+        for own, _ in sides
+    )
+
+def _page_cursor(cursor: str, sort: str) -> dict:
+    after = decode_cursor(cursor, "id") if sort == "recent" else decode_cursor(cursor, "name", "id")
+    if not isinstance(after["id"], int) or not isinstance(after.get("name", ""), str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return after
+
+async def _connection_page(db: AsyncSession, user_id: int, sides, status: str, sort: str, limit: int,
+                           cursor: Optional[str]) -> schemas.networking.ConnectionPage:
+    after = _page_cursor(cursor, sort) if cursor is not None else None
+    rows = (await db.execute(_connection_page_query(user_id, sides, status, sort, limit, after))).all()
+    # The count rides along with the rows, so an empty page asks separately
+    total = rows[0].total if rows else await db.scalar(select(_connection_count(user_id, sides, status)))
+    page = schemas.networking.ConnectionPage(
+        items=[schemas.networking.ConnectionSummary(**row._mapping) for row in rows[:limit]], total=total,
+    )
+    if len(rows) > limit:
+        last = page.items[-1]
+        page.next_cursor = encode_cursor(id=last.id) if sort == "recent" else encode_cursor(name=last.full_name, id=last.id)
+    return page
+
+@router.get("/requests/received", response_model=schemas.networking.ConnectionPage)
+async def list_received_requests(
+    sort: str = Query("recent", pattern="^(recent|name)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Pending connection requests received by the current user, newest first
+    or by name, with who sent each.
+    """
+    return await _connection_page(
+        db, current_user.id, RECEIVED_SIDES, ConnectionStatus.PENDING, sort, limit, cursor,
+    )
+
+@router.get("/connections", response_model=schemas.networking.ConnectionPage)
+async def list_connections(
+    sort: str = Query("recent", pattern="^(recent|name)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Accepted connections, newest first or by name, with the other
+    person's profile summary.
+    """
+    return await _connection_page(
+        db, current_user.id, CONNECTION_SIDES, ConnectionStatus.ACCEPTED, sort, limit, cursor,
+    )
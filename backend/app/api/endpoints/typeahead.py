@@ -0,0 +1,27 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app import models, schemas
+from app.api import deps
+from app.api.endpoints.networking import directory_index
+from app.services.typeahead import KINDS
+
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.typeahead.Suggestion])
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Optional[List[str]] = Query(None),
+    limit: int = Query(8, ge=1, le=20),
+    current_user: models.user.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Completions for a search box as it's typed: names, departments,
+    skills, companies and job titles with a word starting with `q`, most
+    common first. Repeat `kind` to restrict them.
+    """
+    kinds = kind or KINDS
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(sorted(unknown))}")
+    await directory_index.ready()
+    return [suggestion._asdict() for suggestion in directory_index.typeahead.complete(q, kinds, limit)]
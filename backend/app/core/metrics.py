@@ -0,0 +1,127 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+from app.core.profiling import route_template
+
+# Latency buckets in seconds (upper bounds); +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+class RequestMetrics:
+    """
+    Request count and latency histogram per (method, route, status).
+
+    Only touched from the event loop thread, so observe() takes no lock:
+    one dict lookup, one bisect and a few integer adds.
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # key -> [bucket counts..., +Inf count, sum of seconds]
+        self._series: Dict[Tuple[str, str, str], list] = {}
+
+    def observe(self, method: str, route: str, status: str, seconds: float):
+        key = (method, route, status)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, seconds)] += 1
+        series[-1] += seconds
+
+    def render(self) -> List[str]:
+        names = ("method", "route", "status")
+        lines = [
+            "# HELP http_requests_total Total HTTP requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        histogram = [
+            "# HELP http_request_duration_seconds HTTP request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for key, series in sorted(self._series.items()):
+            labels = _labels(names, key)
+            count = sum(series[:-1])
+            lines.append(f"http_requests_total{labels} {count}")
+            cumulative = 0
+            for bound, observed in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += observed
+                bucket_labels = _labels(names + ("le",), key + (bound,))
+                histogram.append(f"http_request_duration_seconds_bucket{bucket_labels} {cumulative}")
+            histogram.append(f"http_request_duration_seconds_sum{labels} {series[-1]:.6f}")
+            histogram.append(f"http_request_duration_seconds_count{labels} {count}")
+        return lines + histogram
+
+    def clear(self):
+        self._series.clear()
+
+class CallbackMetric:
+    """
+    Metric read from a callback at scrape time; the callback returns either
+    a number or a mapping of label-value tuples to numbers.
+    """
+    def __init__(self, name: str, documentation: str, callback: Callable,
+                 labelnames: Tuple[str, ...] = (), kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = labelnames
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        value = self.callback()
+        if isinstance(value, dict):
+            for key, sample in value.items():
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {sample}")
+        else:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+request_metrics = RequestMetrics()
+_collected: Dict[str, CallbackMetric] = {}
+
+def register(name: str, documentation: str, callback: Callable,
+             labelnames: Tuple[str, ...] = (), kind: str = "gauge"):
+    _collected[name] = CallbackMetric(name, documentation, callback, labelnames, kind)
+
+def render() -> str:
+    lines = request_metrics.render()
+    for metric in _collected.values():
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording count, status and latency of each HTTP
+    request, labeled by route template rather than raw path.
+    """
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.observe(scope["method"], route_template(scope), status, time.perf_counter() - start)
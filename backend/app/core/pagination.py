@@ -0,0 +1,27 @@
+import base64
+import json
+from fastapi import HTTPException
+
+# Keyset pagination cursors. Clients treat them as opaque strings; the
+# payload is the sort key of the row the next page starts after.
+
+def encode_cursor(**key) -> str:
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, *fields: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, dict) or set(key) != set(fields):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+def decode_offset(cursor: str) -> int:
+    """The position in a ranked result list that an offset cursor points at."""
+    offset = decode_cursor(cursor, "offset")["offset"]
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
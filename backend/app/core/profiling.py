@@ -0,0 +1,173 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+# Collapse bind placeholders and expanded IN lists so executions of the same
+# query with different parameters share one shape
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|:\w+|\?")
+_IN_LIST = re.compile(r"\((\s*\?\s*,)+\s*\?\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+class RequestProfile:
+    """
+    SQL executed while serving one request.
+    """
+    __slots__ = ("route", "queries", "db_seconds", "shapes")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def suspected_n_plus_one(self) -> Dict[str, int]:
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count >= settings.N_PLUS_ONE_THRESHOLD
+        }
+
+class RouteStats:
+    __slots__ = ("requests", "queries", "db_seconds", "max_queries", "n_plus_one")
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.max_queries = 0
+        self.n_plus_one: Counter = Counter()
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0,
+            "max_queries": self.max_queries,
+            "db_ms_total": round(self.db_seconds * 1000, 3),
+            "db_ms_per_request": round(self.db_seconds * 1000 / self.requests, 3) if self.requests else 0,
+            "suspected_n_plus_one": dict(self.n_plus_one.most_common(5)),
+        }
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_request_profile", default=None)
+_route_stats: Dict[str, RouteStats] = {}
+_route_stats_lock = threading.Lock()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.queries += 1
+        profile.db_seconds += elapsed
+        profile.shapes[statement_shape(statement)] += 1
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        count = len(parameters) if parameters else 0
+        logger.warning(
+            "Slow query (%.1fms) on %s: %s [%d parameter(s) redacted]",
+            elapsed * 1000,
+            profile.route if profile else "background",
+            _WHITESPACE.sub(" ", statement).strip(),
+            count,
+        )
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # so later statements on this pooled connection don't time from it
+    if context.connection is not None and context.execution_context is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+def instrument_engine(engine: Engine):
+    """
+    Attribute every statement run on `engine` (the sync engine behind an
+    AsyncEngine too) to the request being served.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+def _record(profile: RequestProfile):
+    suspects = profile.suspected_n_plus_one()
+    for shape, count in suspects.items():
+        logger.warning("Suspected N+1 on %s: %d executions of %s", profile.route, count, shape)
+    with _route_stats_lock:
+        stats = _route_stats.get(profile.route)
+        if stats is None:
+            stats = _route_stats[profile.route] = RouteStats()
+        stats.requests += 1
+        stats.queries += profile.queries
+        stats.db_seconds += profile.db_seconds
+        stats.max_queries = max(stats.max_queries, profile.queries)
+        stats.n_plus_one.update(suspects)
+
+def route_stats() -> Dict[str, dict]:
+    with _route_stats_lock:
+        return {
+            route: stats.as_dict()
+            for route, stats in sorted(_route_stats.items(), key=lambda item: -item[1].db_seconds)
+        }
+
+def reset_route_stats():
+    with _route_stats_lock:
+        _route_stats.clear()
+
+def route_template(scope) -> str:
+    """Path template of the matched route, e.g. /api/v1/profiles/{user_id}."""
+    # Newer FastAPI keeps included routes un-prefixed and records the
+    # effective (prefixed) route in its own scope namespace.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None)
+    if path:
+        return path
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return scope.get("root_path", "") + route.path
+
+class SQLProfilingMiddleware:
+    """
+    Pure ASGI middleware: collects the SQL run for each HTTP request,
+    reports it in a Server-Timing header and aggregates it per route.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile("unmatched")
+        token = _current.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                profile.route = route_template(scope)
+                timing = f'db;dur={profile.db_seconds * 1000:.2f};desc="{profile.queries} queries"'
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            profile.route = route_template(scope)
+            _record(profile)
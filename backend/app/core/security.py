@@ -1,5 +1,11 @@
+import asyncio
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Any, Union
+from typing import List, Optional, Any, Union
+from fastapi import HTTPException
 from jose import jwt
 from passlib.context import CryptContext
 from .config import settings
@@ -12,6 +18,109 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# Passwords per pool job in PasswordHasher.hash_many
+HASH_CHUNK = 8
+
+def _hash_all(passwords: List[str]) -> List[str]:
+    return [get_password_hash(password) for password in passwords]
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification in a dedicated process pool so the
+    CPU cost never lands on the event loop or the request threadpool.
+    At most `max_workers + max_queue` jobs may be in flight; beyond that
+    callers get a 503 instead of piling up behind a login storm.
+    """
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # "spawn" avoids forking a process that already runs threads/an event loop
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _acquire(self, count: int = 1):
+        with self._lock:
+            if self._pending + count > self.max_pending:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Authentication service is busy, please retry shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += count
+
+    def _release(self, count: int = 1):
+        with self._lock:
+            self._pending -= count
+
+    async def _run(self, fn, *args):
+        self._acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the job ends, not when the caller stops waiting: a
+        # cancelled request leaves a started bcrypt job running in the pool
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash passwords for a bulk job, blocking the calling thread. They go
+        to the shared pool HASH_CHUNK at a time, at most `max_workers`
+        chunks in flight, each counted as one pending job, so a login
+        never queues behind more than a chunk per worker. Raises the
+        same 503 as hash() when logins already fill the pool.
+        """
+        executor = self._get_executor()
+        in_flight: deque = deque()
+        hashes: List[str] = []
+        for start in range(0, len(passwords), HASH_CHUNK):
+            if len(in_flight) >= self.max_workers:
+                hashes.extend(in_flight.popleft().result())
+            self._acquire()
+            try:
+                future = executor.submit(_hash_all, passwords[start:start + HASH_CHUNK])
+            except BaseException:
+                self._release()
+                raise
+            future.add_done_callback(lambda _: self._release())
+            in_flight.append(future)
+        while in_flight:
+            hashes.extend(in_flight.popleft().result())
+        return hashes
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
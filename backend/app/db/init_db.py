@@ -0,0 +1,41 @@
+import os
+import time
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError
+from app.db.session import engine
+
+# Wait for the database to come up (e.g. under docker-compose)
+MAX_RETRIES = 10
+RETRY_DELAY = 2
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+def wait_for_db():
+    for i in range(MAX_RETRIES):
+        try:
+            with engine.connect():
+                return
+        except OperationalError as e:
+            if i == MAX_RETRIES - 1:
+                raise e
+            print(f"Database not ready, retrying in {RETRY_DELAY} seconds...")
+            time.sleep(RETRY_DELAY)
+
+def init_db():
+    """
+    Bring the schema up to date with the Alembic migrations. A database that
+    was bootstrapped by create_all before migrations existed is stamped at
+    the initial revision first.
+    """
+    wait_for_db()
+    config = Config(os.path.abspath(ALEMBIC_INI))
+    config.set_main_option("script_location", os.path.abspath(os.path.join(os.path.dirname(ALEMBIC_INI), "alembic")))
+    tables = inspect(engine).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        command.stamp(config, "0001")
+    command.upgrade(config, "head")
+
+if __name__ == "__main__":
+    init_db()
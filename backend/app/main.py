@@ -1,33 +1,44 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import auth, profiles, networking, jobs, events, donations, gamification, chat
-from app.db.session import engine, Base
-from app.models.user import User
-from app.models.profile import Profile
-from app.models.connection import Connection
-from app.models.job import Job
-from app.models.event import Event
-from app.models.donation import DonationCampaign, Donation
-from app.models.gamification import Badge, UserBadge
-from app.models.chat import Message # Ensure model is loaded
-import time
-from sqlalchemy.exc import OperationalError
+from app.api.endpoints import auth, profiles, networking, jobs, events, donations, gamification, chat, admin, health, metrics, typeahead
+from app.core import security
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import SQLProfilingMiddleware, instrument_engine
+from app.core.config import settings
+from app.db import session
 
-# Create tables with retry logic
-MAX_RETRIES = 10
-RETRY_DELAY = 2
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_BOOTSTRAP_ON_STARTUP:
+        # Imported here so workers that don't bootstrap never load Alembic
+        from app.db.init_db import init_db
+        await run_in_threadpool(init_db)
+    await chat.manager.start()
+    await chat.manager.listen(networking.ACCEPTED_TOPIC, networking.apply_shared_accepted)
+    chat.message_writer.start()
+    networking.directory_index.start()
+    networking.people_you_may_know.start()
+    networking.mentor_index.start()
+    yield
+    await networking.mentor_index.stop()
+    await networking.people_you_may_know.stop()
+    await networking.directory_index.stop()
+    await chat.message_writer.stop()
+    await chat.manager.stop()
+    security.password_hasher.shutdown()
+    for engine in session.all_engines():
+        await engine.dispose()
 
-for i in range(MAX_RETRIES):
-    try:
-        Base.metadata.create_all(bind=engine)
-        break
-    except OperationalError as e:
-        if i == MAX_RETRIES - 1:
-            raise e
-        print(f"Database not ready, retrying in {RETRY_DELAY} seconds...")
-        time.sleep(RETRY_DELAY)
+app = FastAPI(title="Smart Alumni Connect API", lifespan=lifespan)
 
-app = FastAPI(title="Smart Alumni Connect API")
+instrument_engine(session.engine)
+for engine in session.all_engines():
+    instrument_engine(engine.sync_engine)
+
+app.add_middleware(SQLProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,7 +55,11 @@ app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
 app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
 app.include_router(donations.router, prefix="/api/v1/donations", tags=["donations"])
 app.include_router(gamification.router, prefix="/api/v1/gamification", tags=["gamification"])
+app.include_router(typeahead.router, prefix="/api/v1/typeahead", tags=["typeahead"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+app.include_router(health.router, prefix="/health", tags=["health"])
+app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/")
 def read_root():
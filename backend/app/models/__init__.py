@@ -5,4 +5,4 @@ from .job import Job
 from .event import Event
 from .donation import DonationCampaign, Donation
 from .gamification import Badge, UserBadge
-from .chat import Message
+from .chat import Message, Conversation, Room, RoomMember
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session import Base
@@ -8,12 +8,76 @@ class Message(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    recipient_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # A direct message has a recipient, a room post has a room instead
+    recipient_id = Column(Integer, ForeignKey("users.id"))
+    room_id = Column(Integer, ForeignKey("rooms.id"))
     
+    # On PostgreSQL, migration 0007 adds a trigger-maintained `search_vector`
+    # tsvector of this with a GIN index for message search; it isn't mapped
+    # so loading messages doesn't fetch it
     content = Column(Text, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
     is_read = Column(Boolean, default=False)
+    # Set by clients of the structured WebSocket protocol to make resends
+    # idempotent; unique per sender
+    client_id = Column(String(64))
 
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id])
     recipient = relationship("User", foreign_keys=[recipient_id])
+
+    __table_args__ = (
+        # get_chat_history: keyset pages over each direction of a conversation
+        Index("ix_messages_sender_recipient_id", "sender_id", "recipient_id", "id"),
+        Index("ix_messages_sender_client_id", "sender_id", "client_id", unique=True),
+        # Room history: keyset pages over one room
+        Index("ix_messages_room_id", "room_id", "id"),
+    )
+
+class Conversation(Base):
+    """
+    One row per (owner, peer) pair: the owner's view of a conversation,
+    kept up to date as messages are stored so the inbox never has to
+    aggregate over messages.
+    """
+    __tablename__ = "conversations"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    peer_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_message_id = Column(Integer, nullable=False)
+    last_message_at = Column(DateTime)
+    last_sender_id = Column(Integer)
+    last_message_preview = Column(String(200))
+    unread_count = Column(Integer, nullable=False, default=0)
+    # Messages from the peer up to this id have all been marked read
+    last_read_message_id = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Inbox: the owner's conversations by latest activity
+        Index("ix_conversations_owner_last_message", "owner_id", "last_message_id"),
+    )
+
+class Room(Base):
+    """
+    A group conversation. Each post is stored once, as a Message with
+    room_id set, however many members the room has.
+    """
+    __tablename__ = "rooms"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class RoomMember(Base):
+    __tablename__ = "room_members"
+
+    room_id = Column(Integer, ForeignKey("rooms.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    role = Column(String, nullable=False, default="member") # owner, member
+    joined_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # The rooms a user belongs to, loaded when they connect
+        Index("ix_room_members_user_id", "user_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Index, case
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -9,6 +9,10 @@ class ConnectionStatus(str, enum.Enum):
     ACCEPTED = "accepted"
     DECLINED = "declined"
 
+def pair_key(a, b):
+    """Two users as (smaller id, larger id): the same whichever asked whom."""
+    return case((a < b, a), else_=b), case((a < b, b), else_=a)
+
 class Connection(Base):
     __tablename__ = "connections"
 
@@ -21,3 +25,14 @@ class Connection(Base):
     # Relationships
     requester = relationship("User", foreign_keys=[requester_id])
     recipient = relationship("User", foreign_keys=[recipient_id])
+
+    __table_args__ = (
+        # Existence checks in both directions and the caller's own rows
+        Index("ix_connections_requester_recipient", "requester_id", "recipient_id"),
+        # One row per pair of users, so concurrent or batched requests
+        # between the same two can't both go in
+        Index("ix_connections_pair", *pair_key(requester_id, recipient_id), unique=True),
+        # Listing a user's connections or inbox a page at a time, by id
+        Index("ix_connections_requester_status_id", "requester_id", "status", "id"),
+        Index("ix_connections_recipient_status_id", "recipient_id", "status", "id"),
+    )
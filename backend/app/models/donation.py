@@ -24,7 +24,7 @@ class Donation(Base):
     __tablename__ = "donations"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     campaign_id = Column(Integer, ForeignKey("donation_campaigns.id"), nullable=False)
     
     amount = Column(Float, nullable=False)
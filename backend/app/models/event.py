@@ -12,7 +12,7 @@ class Event(Base):
     title = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
     event_type = Column(String, default="virtual") # virtual, in-person
-    start_time = Column(DateTime, nullable=False)
+    start_time = Column(DateTime, nullable=False, index=True)
     end_time = Column(DateTime, nullable=True)
     location = Column(String, nullable=True) # URL or Address
     max_attendees = Column(Integer, nullable=True)
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.db.session import Base
+from app.db.session import Base, trigram_index
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -21,3 +21,9 @@ class Job(Base):
 
     # Relationships
     poster = relationship("User", back_populates="jobs")
+
+    __table_args__ = (
+        # ilike '%q%' job search
+        trigram_index("ix_jobs_title_trgm", "title"),
+        trigram_index("ix_jobs_location_trgm", "location"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, Text, Index, func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -18,6 +18,16 @@ class Profile(Base):
     interest = Column(String, nullable=True) # Comma separated
     points = Column(Integer, default=0)
     linkedin_url = Column(String, nullable=True)
+    # Set by the database on every insert and update; the directory index
+    # polls it for changed profiles
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="profile")
+
+    __table_args__ = (
+        # Leaderboard
+        Index("ix_profiles_points_desc", points.desc()),
+        # Directory index refreshes
+        Index("ix_profiles_updated_at", "updated_at"),
+    )
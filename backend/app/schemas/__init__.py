@@ -1,9 +1,14 @@
-from .user import User, UserCreate
+from .user import User, UserCreate, UserImportResult, UserImportRowError
 from .token import Token, TokenData
-from .profile import Profile, ProfileCreate, ProfileUpdate
-from .networking import Connection, ConnectionCreate, ConnectionUpdate
+from .profile import Profile, ProfileCreate, ProfileUpdate, FacetCount, ProfileFacets, ProfileSearchPage
+from .networking import Connection, ConnectionBatchCreate, ConnectionBatchItem, ConnectionBatchResult, ConnectionBatchUpdate, ConnectionCreate, ConnectionPage, ConnectionPath, ConnectionSummary, ConnectionUpdate, MentorMatch, MutualCount, PersonSuggestion
 from .job import Job, JobCreate, JobUpdate
 from .event import Event, EventCreate
 from .donation import Campaign, CampaignCreate, Donation, DonationCreate
 from .gamification import Badge, BadgeCreate, UserBadge, LeaderboardEntry, PointsUpdate
-from .chat import Message, MessageCreate
+from .typeahead import Suggestion
+from .chat import (
+    Message, MessageCreate, MessagePage, ConversationSummary, ConversationPage, MarkRead, MarkReadResult,
+    Room, RoomCreate, RoomMembersAdd, RoomMessage, RoomMessageCreate, RoomMessagePage,
+    MessageSearchHit, MessageSearchPage,
+)
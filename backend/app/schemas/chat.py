@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -17,3 +17,88 @@ class Message(MessageBase):
 
     class Config:
         from_attributes = True
+
+class MessagePage(BaseModel):
+    # Newest first. Pass next_cursor as `before` for older messages (null
+    # once the start of the conversation is reached) and prev_cursor as
+    # `after` to fetch messages newer than this page.
+    items: List[Message]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+class ConversationSummary(BaseModel):
+    user_id: int
+    full_name: Optional[str] = None
+    last_message_id: int
+    last_message_at: Optional[datetime] = None
+    last_sender_id: Optional[int] = None
+    last_message_preview: Optional[str] = None
+    unread_count: int
+
+class ConversationPage(BaseModel):
+    # Most recently active first; pass next_cursor as `before` for more
+    items: List[ConversationSummary]
+    next_cursor: Optional[str] = None
+
+class MarkRead(BaseModel):
+    # Defaults to the latest message in the conversation
+    up_to_id: Optional[int] = None
+
+class MarkReadResult(BaseModel):
+    marked: int
+    unread_count: int
+
+class RoomCreate(BaseModel):
+    name: str
+    # Added as members alongside the creator, who becomes the owner
+    member_ids: List[int] = []
+
+class Room(BaseModel):
+    id: int
+    name: str
+    created_by: int
+    created_at: datetime
+    member_count: int
+
+class RoomMembersAdd(BaseModel):
+    user_ids: List[int]
+
+class RoomMessageCreate(BaseModel):
+    content: str
+
+class RoomMessage(BaseModel):
+    id: int
+    room_id: int
+    sender_id: int
+    content: str
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+class RoomMessagePage(BaseModel):
+    # Same paging as MessagePage
+    items: List[RoomMessage]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+class MessageSearchHit(BaseModel):
+    id: int
+    sender_id: int
+    # One of recipient_id (direct message) or room_id (room post) is set
+    recipient_id: Optional[int] = None
+    room_id: Optional[int] = None
+    content: str
+    timestamp: datetime
+    rank: float
+    # The content (or its best fragments) with matches wrapped in
+    # <mark></mark>; not HTML-escaped
+    highlight: str
+
+class MessageSearchPage(BaseModel):
+    # Best match first; pass next_cursor as `cursor` for the next page
+    items: List[MessageSearchHit]
+    next_cursor: Optional[str] = None
+    # More messages matched than the newest CHAT_SEARCH_CANDIDATES that
+    # were ranked; older ones need a narrower query
+    truncated: bool = False
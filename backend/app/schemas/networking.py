@@ -12,6 +12,24 @@ class ConnectionCreate(ConnectionBase):
 class ConnectionUpdate(ConnectionBase):
     status: str # "accepted" or "declined"
 
+class ConnectionBatchCreate(BaseModel):
+    user_ids: List[int]
+
+class ConnectionBatchUpdate(ConnectionUpdate):
+    request_ids: List[int]
+
+class ConnectionBatchItem(BaseModel):
+    # The user asked to connect with, or the request responded to
+    id: int
+    # Set when it went through; otherwise error says why not
+    connection_id: Optional[int] = None
+    error: Optional[str] = None
+
+class ConnectionBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[ConnectionBatchItem]
+
 class Connection(ConnectionBase):
     id: int
     requester_id: int
@@ -25,3 +43,48 @@ class Connection(ConnectionBase):
 
     class Config:
         from_attributes = True
+
+class ConnectionSummary(BaseModel):
+    # The connection (or request) and the other person in it
+    id: int
+    status: str
+    created_at: Optional[datetime] = None
+    user_id: int
+    full_name: Optional[str] = None
+    department: Optional[str] = None
+    graduation_year: Optional[int] = None
+    profile_picture_url: Optional[str] = None
+
+class ConnectionPage(BaseModel):
+    # Pass next_cursor as `cursor`, with the same `sort`, for the next page
+    items: List[ConnectionSummary]
+    total: int
+    next_cursor: Optional[str] = None
+
+class PersonSuggestion(BaseModel):
+    user_id: int
+    full_name: Optional[str] = None
+    department: Optional[str] = None
+    graduation_year: Optional[int] = None
+    profile_picture_url: Optional[str] = None
+    mutual_connections: int
+
+class MentorMatch(BaseModel):
+    user_id: int
+    full_name: Optional[str] = None
+    department: Optional[str] = None
+    graduation_year: Optional[int] = None
+    profile_picture_url: Optional[str] = None
+    score: float
+    # Skills and interests you both listed
+    shared_skills: List[str]
+
+class ConnectionPath(BaseModel):
+    # None when further than the search goes
+    degree: Optional[int] = None
+    # From you to them, both included; empty when degree is None
+    user_ids: List[int] = []
+
+class MutualCount(BaseModel):
+    user_id: int
+    mutual_connections: int
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional, Union
 from pydantic import BaseModel
 
 # Shared properties
@@ -10,6 +10,9 @@ class ProfileBase(BaseModel):
     bio: Optional[str] = None
     profile_picture_url: Optional[str] = None
     linkedin_url: Optional[str] = None
+    # Comma separated
+    skills: Optional[str] = None
+    interest: Optional[str] = None
 
 # Properties to receive via API on creation
 class ProfileCreate(ProfileBase):
@@ -26,3 +29,20 @@ class Profile(ProfileBase):
 
     class Config:
         from_attributes = True
+
+class FacetCount(BaseModel):
+    value: Union[int, str]
+    count: int
+
+class ProfileFacets(BaseModel):
+    # Most common first
+    graduation_year: List[FacetCount] = []
+    department: List[FacetCount] = []
+
+class ProfileSearchPage(BaseModel):
+    # Best match first; pass next_cursor as `cursor` for the next page.
+    # total and the facets count every match.
+    items: List[Profile]
+    total: int
+    facets: ProfileFacets
+    next_cursor: Optional[str] = None
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+class Suggestion(BaseModel):
+    # name, department, skill, company or title
+    kind: str
+    text: str
+    # Profiles or jobs with this value
+    count: int
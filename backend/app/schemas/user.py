@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 
 # Shared properties
@@ -18,3 +18,14 @@ class User(UserBase):
 
     class Config:
         from_attributes = True
+
+# Bulk import results
+class UserImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+class UserImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: List[UserImportRowError] = []
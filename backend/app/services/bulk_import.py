@@ -0,0 +1,199 @@
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import schemas
+from app.core import security
+from app.models.profile import Profile
+from app.models.user import User
+
+USER_FIELDS = ("email", "hashed_password", "full_name", "role", "is_active")
+# Whatever an upload row may carry for the profile, so COPY and the
+# insert() path write the same columns
+PROFILE_FIELDS = ("user_id", *schemas.profile.ProfileCreate.model_fields, "points")
+
+class ParsedRow:
+    __slots__ = ("line", "user", "profile")
+
+    def __init__(self, line: int, user: schemas.user.UserCreate, profile: schemas.profile.ProfileCreate):
+        self.line = line
+        self.user = user
+        self.profile = profile
+
+def iter_records(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Yield (line number, record, parse error) from a CSV or JSONL upload
+    one row at a time, so the file is never loaded into memory at once.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            # Empty CSV cells mean "not provided", not the empty string
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in record.items() if k}, None
+    else:
+        for line_num, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_num, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_num, None, "Each line must be a JSON object"
+                continue
+            yield line_num, record, None
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+class UserImporter:
+    """
+    Bulk-creates users and their profiles from parsed upload rows.
+    Passwords are hashed on the shared password pool while earlier
+    batches are being written, and each batch is written with set-based statements
+    (COPY on PostgreSQL). Bad rows are reported, never abort the import.
+    """
+    def __init__(self, db: Session, batch_size: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.created = 0
+        self.errors: List[schemas.user.UserImportRowError] = []
+        self._seen_emails = set()
+
+    def _fail(self, line: int, email: Optional[str], error: str):
+        self.errors.append(schemas.user.UserImportRowError(row=line, email=email, error=error))
+
+    def _parse(self, line: int, record: Dict[str, Any]) -> Optional[ParsedRow]:
+        email = record.get("email")
+        try:
+            user_in = schemas.user.UserCreate(**record)
+            profile_in = schemas.profile.ProfileCreate(**record)
+        except ValidationError as e:
+            self._fail(line, email, _validation_message(e))
+            return None
+        email = user_in.email.lower()
+        if email in self._seen_emails:
+            self._fail(line, email, "Duplicate email in upload")
+            return None
+        self._seen_emails.add(email)
+        user_in.email = email
+        return ParsedRow(line, user_in, profile_in)
+
+    def _batches(self, records) -> Iterator[List[ParsedRow]]:
+        batch: List[ParsedRow] = []
+        for line, record, error in records:
+            if error:
+                self._fail(line, None, error)
+                continue
+            row = self._parse(line, record)
+            if row is None:
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _drop_existing(self, batch: List[ParsedRow]) -> List[ParsedRow]:
+        emails = [row.user.email for row in batch]
+        existing = set(self.db.scalars(select(User.email).where(User.email.in_(emails))))
+        # End the read here: the batch waits on hashing before it's written,
+        # and a transaction left open that long would hold its connection and
+        # stamp the profiles' updated_at long before they commit
+        self.db.rollback()
+        fresh = []
+        for row in batch:
+            if row.user.email in existing:
+                self._fail(row.line, row.user.email, "The user with this username already exists in the system.")
+            else:
+                fresh.append(row)
+        return fresh
+
+    def run(self, records) -> schemas.user.UserImportResult:
+        # One thread feeds the shared password pool, so this batch is hashed
+        # while the previous one is written
+        with ThreadPoolExecutor(max_workers=1) as hashing:
+            pending = None
+            for batch in self._batches(records):
+                batch = self._drop_existing(batch)
+                if not batch:
+                    continue
+                future = hashing.submit(security.password_hasher.hash_many, [row.user.password for row in batch])
+                if pending is not None:
+                    self._write(pending[0], pending[1].result())
+                pending = (batch, future)
+            if pending is not None:
+                self._write(pending[0], pending[1].result())
+        errors = sorted(self.errors, key=lambda e: e.row)
+        return schemas.user.UserImportResult(created=self.created, failed=len(errors), errors=errors)
+
+    def _write(self, batch: List[ParsedRow], hashes):
+        user_rows = []
+        for row, hashed_password in zip(batch, hashes):
+            user_rows.append({
+                "email": row.user.email,
+                "hashed_password": hashed_password,
+                "full_name": row.user.full_name,
+                "role": row.user.role,
+                "is_active": True if row.user.is_active is None else row.user.is_active,
+            })
+        try:
+            self._insert_batch(batch, user_rows)
+            self.db.commit()
+            self.created += len(batch)
+        except IntegrityError:
+            # Someone registered one of these emails concurrently: retry row by row
+            self.db.rollback()
+            self._insert_rows_individually(batch, user_rows)
+
+    def _profile_rows(self, batch: List[ParsedRow], ids_by_email: Dict[str, int]) -> List[Dict[str, Any]]:
+        rows = []
+        for row in batch:
+            profile = row.profile.dict()
+            profile["full_name"] = profile["full_name"] or row.user.full_name
+            profile["user_id"] = ids_by_email[row.user.email]
+            profile["points"] = 0
+            rows.append(profile)
+        return rows
+
+    def _insert_batch(self, batch: List[ParsedRow], user_rows: List[Dict[str, Any]]):
+        if self.db.get_bind().dialect.name == "postgresql":
+            self._copy("users", USER_FIELDS, user_rows)
+            emails = [row["email"] for row in user_rows]
+            ids_by_email = dict(self.db.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+            self._copy("profiles", PROFILE_FIELDS, self._profile_rows(batch, ids_by_email))
+        else:
+            result = self.db.execute(insert(User).returning(User.email, User.id), user_rows)
+            ids_by_email = dict(result.all())
+            self.db.execute(insert(Profile), self._profile_rows(batch, ids_by_email))
+
+    def _copy(self, table: str, columns: Tuple[str, ...], rows: List[Dict[str, Any]]):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _insert_rows_individually(self, batch: List[ParsedRow], user_rows: List[Dict[str, Any]]):
+        for row, user_row in zip(batch, user_rows):
+            try:
+                user_id = self.db.execute(insert(User).returning(User.id), user_row).scalar_one()
+                self.db.execute(insert(Profile), self._profile_rows([row], {row.user.email: user_id}))
+                self.db.commit()
+                self.created += 1
+            except IntegrityError:
+                self.db.rollback()
+                self._fail(row.line, row.user.email, "The user with this username already exists in the system.")
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger("app.chat")
+
+# Called with (topic, message) for every message published to a topic this
+# worker subscribes to. Topics are "user_<id>" and "room_<id>".
+Deliver = Callable[[str, str], Awaitable[None]]
+
+class Backplane:
+    """
+    Carries chat messages between worker processes. A worker subscribes
+    to the topics of the users (and rooms) that have sockets on it and
+    only receives their traffic.
+
+    publish() is only for sockets that may live on *other* workers: the
+    caller delivers to its own sockets directly, and a backplane never
+    echoes a worker's own messages back to it.
+    """
+    async def start(self, deliver: Deliver):
+        self.deliver = deliver
+
+    async def stop(self):
+        pass
+
+    async def subscribe(self, topic: str):
+        pass
+
+    async def unsubscribe(self, topic: str):
+        pass
+
+    async def publish(self, topic: str, message: str):
+        await self.publish_many([(topic, message)])
+
+    async def publish_many(self, messages: List[Tuple[str, str]]):
+        pass
+
+class InMemoryHub:
+    """The topics of the in-memory backplanes sharing it, and who subscribes."""
+    def __init__(self):
+        self.subscribers: Dict[str, Set["InMemoryBackplane"]] = {}
+
+class InMemoryBackplane(Backplane):
+    """
+    Pub/sub between the backplanes sharing one hub, within one process.
+    With a single ConnectionManager (SQLite, one worker) every socket is
+    local and nothing is carried; tests give two managers the same hub to
+    stand in for two workers. Each backplane delivers from its own queue,
+    in publish order, like PostgresBackplane.
+    """
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub if hub is not None else InMemoryHub()
+        self.topics: Set[str] = set()
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._task = None
+
+    async def start(self, deliver: Deliver):
+        await super().start(deliver)
+        self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        for topic in list(self.topics):
+            await self.unsubscribe(topic)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def subscribe(self, topic: str):
+        self.topics.add(topic)
+        self.hub.subscribers.setdefault(topic, set()).add(self)
+
+    async def unsubscribe(self, topic: str):
+        self.topics.discard(topic)
+        subscribers = self.hub.subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self.hub.subscribers[topic]
+
+    async def publish_many(self, messages: List[Tuple[str, str]]):
+        for topic, message in messages:
+            for backplane in self.hub.subscribers.get(topic, ()):
+                if backplane is not self:
+                    backplane._inbox.put_nowait((topic, message))
+
+    async def _dispatch(self):
+        while True:
+            topic, message = await self._inbox.get()
+            try:
+                await self.deliver(topic, message)
+            except Exception:
+                logger.exception("Chat backplane delivery to %s failed", topic)
+
+class PostgresBackplane(Backplane):
+    """
+    LISTEN/NOTIFY with one channel per topic. Each worker holds a single
+    listening connection and LISTENs on the channels of its connected
+    users and their rooms; publishes go through the regular async engine
+    pool.
+    """
+    # NOTIFY payloads are capped at 8000 bytes; longer messages are split
+    MAX_PAYLOAD = 7000
+    RECONNECT_SECONDS = 1.0
+    # Parts of a split message still incomplete after this long were lost
+    # (e.g. with the listening connection) and are dropped
+    PARTIAL_TTL_SECONDS = 30.0
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.dsn = make_url(engine.url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.origin = uuid.uuid4().hex
+        self.channels: Set[str] = set()
+        self._listener = None
+        self._lock = asyncio.Lock()
+        self._connected = asyncio.Event()
+        self._lost = asyncio.Event()
+        self._partials: Dict[str, Tuple[float, list]] = {}  # key -> (first seen, parts)
+        self._partials_swept = 0.0
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._tasks: list = []
+
+    @staticmethod
+    def channel(topic: str) -> str:
+        return f"chat_{topic}"
+
+    async def start(self, deliver: Deliver):
+        await super().start(deliver)
+        self._tasks = [asyncio.create_task(self._supervise()), asyncio.create_task(self._dispatch())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.close()
+
+    async def _supervise(self):
+        # Keep one listening connection open, re-LISTENing after a reconnect
+        import asyncpg
+        while True:
+            try:
+                async with self._lock:
+                    self._lost.clear()
+                    self._listener = await asyncpg.connect(self.dsn)
+                    self._listener.add_termination_listener(lambda conn: self._lost.set())
+                    for topic in self.channels:
+                        await self._listener.add_listener(self.channel(topic), self._on_notify)
+                self._connected.set()
+                await self._lost.wait()
+                logger.warning("Chat backplane connection lost; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Chat backplane unavailable: %s", e)
+            self._connected.clear()
+            await asyncio.sleep(self.RECONNECT_SECONDS)
+
+    async def subscribe(self, topic: str):
+        async with self._lock:
+            if topic in self.channels:
+                return
+            self.channels.add(topic)
+            if self._connected.is_set():
+                await self._listener.add_listener(self.channel(topic), self._on_notify)
+
+    async def unsubscribe(self, topic: str):
+        async with self._lock:
+            if topic not in self.channels:
+                return
+            self.channels.discard(topic)
+            if self._connected.is_set():
+                await self._listener.remove_listener(self.channel(topic), self._on_notify)
+
+    async def publish_many(self, messages: List[Tuple[str, str]]):
+        notifications = []
+        for topic, message in messages:
+            # JSON-encode first so the payload is pure ASCII and chars == bytes
+            encoded = json.dumps(message)
+            chunks = [encoded[i:i + self.MAX_PAYLOAD] for i in range(0, len(encoded), self.MAX_PAYLOAD)]
+            key = uuid.uuid4().hex[:12]
+            notifications.extend(
+                {"channel": self.channel(topic), "payload": f"{self.origin}:{key}:{index}:{len(chunks)}:{chunk}"}
+                for index, chunk in enumerate(chunks)
+            )
+        if not notifications:
+            return
+        # One transaction, so the parts of a split message arrive together
+        async with self.engine.begin() as conn:
+            await conn.execute(text("SELECT pg_notify(:channel, :payload)"), notifications)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        origin, key, index, total, chunk = payload.split(":", 4)
+        if origin == self.origin:
+            return
+        if total != "1":
+            now = time.monotonic()
+            self._expire_partials(now)
+            _, parts = self._partials.setdefault(key, (now, [None] * int(total)))
+            parts[int(index)] = chunk
+            if any(part is None for part in parts):
+                return
+            del self._partials[key]
+            chunk = "".join(parts)
+        self._inbox.put_nowait((channel[len("chat_"):], json.loads(chunk)))
+
+    def _expire_partials(self, now: float):
+        if now - self._partials_swept < self.PARTIAL_TTL_SECONDS:
+            return
+        self._partials_swept = now
+        for key in [key for key, (seen, _) in self._partials.items() if now - seen > self.PARTIAL_TTL_SECONDS]:
+            logger.warning("Chat backplane dropped an incomplete split message")
+            del self._partials[key]
+
+    async def _dispatch(self):
+        # Deliver in arrival order, one message at a time
+        while True:
+            topic, message = await self._inbox.get()
+            try:
+                await self.deliver(topic, message)
+            except Exception:
+                logger.exception("Chat backplane delivery to %s failed", topic)
+
+def create_backplane(kind: str, engine: AsyncEngine) -> Backplane:
+    if kind == "auto":
+        kind = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if kind == "postgres":
+        return PostgresBackplane(engine)
+    if kind == "memory":
+        return InMemoryBackplane()
+    raise ValueError(f"Unknown CHAT_BACKPLANE {kind!r}")
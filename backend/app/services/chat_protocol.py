@@ -0,0 +1,154 @@
+import json
+from typing import Optional, Union
+
+# Chat WebSocket framing. Internally every frame is an event dict with a
+# "type"; a codec turns events into wire frames for one socket and
+# incoming frames into events.
+#
+# Client -> server
+#   {"type": "send", "recipient_id": 2, "content": "hi", "client_id": "c-1"}
+#   {"type": "room_send", "room_id": 7, "content": "hi all", "client_id": "c-2"}
+#   {"type": "resume", "last_seq": 120}
+#   {"type": "ping"} / {"type": "pong"}
+# Server -> client
+#   {"type": "message", "seq": 121, "sender_id": 1, "recipient_id": 2, "content": "hi", "timestamp": "...", "client_id": "c-1"}
+#   {"type": "room_message", "seq": 122, "room_id": 7, "sender_id": 1, "content": "hi all", "timestamp": "...", "client_id": "c-2"}
+#   {"type": "room_joined", "room_id": 7} / {"type": "room_left", "room_id": 7}
+#   {"type": "ack", "seq": 121, "client_id": "c-1"}
+#   {"type": "resumed", "last_seq": 121, "truncated": false}
+#   {"type": "error", "detail": "..."}
+#   {"type": "ping"} / {"type": "pong"}
+#
+# `seq` is the message id, shared by direct messages and room posts:
+# increasing, so "everything after seq N" is a well-defined gap to replay
+# on reconnect. `client_id` is chosen by the
+# client and makes resending a frame idempotent. The server pings sockets
+# that have been quiet for a while; any frame from the client, including a
+# pong, counts as activity.
+
+MAX_CLIENT_ID_LENGTH = 64
+
+Frame = Union[str, bytes]
+
+class ProtocolError(ValueError):
+    pass
+
+class LegacyCodec:
+    """
+    The original plain-text format: "recipient_id:content" in,
+    "From {sender_id}: {content}" out. No ids, acks are "Ack {seq}".
+    """
+    name = "text"
+    binary = False
+    # Text clients can't answer pings; the server's WebSocket-level pings
+    # (uvicorn --ws-ping-interval) still drop dead connections
+    heartbeat = False
+
+    def decode(self, data: str) -> dict:
+        try:
+            recipient_id, content = data.split(":", 1)
+            return {"type": "send", "recipient_id": int(recipient_id), "content": content}
+        except ValueError:
+            raise ProtocolError("Invalid message format. Use recipient_id:content")
+
+    def encode(self, event: dict) -> Optional[str]:
+        kind = event["type"]
+        if kind == "message":
+            return f"From {event['sender_id']}: {event['content']}"
+        if kind == "room_message":
+            return f"Room {event['room_id']} from {event['sender_id']}: {event['content']}"
+        if kind == "ack":
+            return f"Ack {event['seq']}"
+        if kind == "error":
+            return event["detail"]
+        if kind == "notice":
+            return event["text"]
+        # Nothing else has a text form
+        return None
+
+class JsonCodec:
+    name = "json"
+    binary = False
+    heartbeat = True
+
+    def decode(self, data: str) -> dict:
+        try:
+            event = json.loads(data)
+        except ValueError:
+            raise ProtocolError("Frames must be JSON objects")
+        return validate(event)
+
+    def encode(self, event: dict) -> str:
+        return json.dumps(event, separators=(",", ":"))
+
+class MsgpackCodec:
+    name = "msgpack"
+    binary = True
+    heartbeat = True
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def decode(self, data: bytes) -> dict:
+        try:
+            event = self._msgpack.unpackb(data)
+        except Exception:
+            raise ProtocolError("Frames must be MessagePack maps")
+        return validate(event)
+
+    def encode(self, event: dict) -> bytes:
+        return self._msgpack.packb(event)
+
+CODECS = {"text": LegacyCodec, "json": JsonCodec, "msgpack": MsgpackCodec}
+
+def get_codec(name: str):
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ProtocolError(f"Unknown protocol {name!r}")
+    return codec()
+
+def validate(event) -> dict:
+    if not isinstance(event, dict) or not isinstance(event.get("type"), str):
+        raise ProtocolError("Frames need a string 'type'")
+    if event["type"] in ("send", "room_send"):
+        target = "recipient_id" if event["type"] == "send" else "room_id"
+        if not isinstance(event.get(target), int) or not isinstance(event.get("content"), str):
+            raise ProtocolError(f"'{event['type']}' needs an integer {target} and string content")
+        client_id = event.get("client_id")
+        if client_id is not None and (not isinstance(client_id, str) or len(client_id) > MAX_CLIENT_ID_LENGTH):
+            raise ProtocolError(f"client_id must be a string of at most {MAX_CLIENT_ID_LENGTH} characters")
+    elif event["type"] == "resume":
+        if not isinstance(event.get("last_seq"), int):
+            raise ProtocolError("'resume' needs an integer last_seq")
+    elif event["type"] not in ("ping", "pong"):
+        raise ProtocolError(f"Unknown frame type {event['type']!r}")
+    return event
+
+def message_event(message_id: int, sender_id: int, recipient_id: int, content: str, timestamp,
+                  client_id: Optional[str] = None) -> dict:
+    event = {
+        "type": "message",
+        "seq": message_id,
+        "sender_id": sender_id,
+        "recipient_id": recipient_id,
+        "content": content,
+        "timestamp": timestamp.isoformat(),
+    }
+    if client_id is not None:
+        event["client_id"] = client_id
+    return event
+
+def room_message_event(message_id: int, room_id: int, sender_id: int, content: str, timestamp,
+                       client_id: Optional[str] = None) -> dict:
+    event = {
+        "type": "room_message",
+        "seq": message_id,
+        "room_id": room_id,
+        "sender_id": sender_id,
+        "content": content,
+        "timestamp": timestamp.isoformat(),
+    }
+    if client_id is not None:
+        event["client_id"] = client_id
+    return event
@@ -0,0 +1,136 @@
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from scipy import sparse
+
+# Accepted connections as an undirected graph in memory: a CSR snapshot
+# loaded in bulk, plus the edges accepted since, so it answers without
+# touching the database between snapshots.
+
+def adjacency(size: int, a: np.ndarray, b: np.ndarray) -> sparse.csr_matrix:
+    """Symmetric 0/1 CSR matrix of the edges a[i]-b[i] between indices below `size`."""
+    matrix = sparse.csr_matrix(
+        (np.ones(2 * len(a), dtype=np.int32), (np.concatenate([a, b]), np.concatenate([b, a]))), shape=(size, size),
+    )
+    # Edges given twice count once
+    matrix.data[:] = 1
+    return matrix
+
+class ConnectionGraph:
+    """
+    `user_ids` is sorted and a user's position in it is their index; the
+    snapshot's neighbours of index i are indices[indptr[i]:indptr[i + 1]].
+    Edges added later live in `recent` by user id, including for users
+    the snapshot doesn't know. Only ever grows: nothing un-accepts a
+    connection.
+    """
+    def __init__(self, user_ids: Optional[np.ndarray] = None, indptr: Optional[np.ndarray] = None,
+                 indices: Optional[np.ndarray] = None):
+        self.user_ids = user_ids if user_ids is not None else np.zeros(0, dtype=np.int32)
+        self.indptr = indptr if indptr is not None else np.zeros(1, dtype=np.int32)
+        self.indices = indices if indices is not None else np.zeros(0, dtype=np.int32)
+        self.recent: Dict[int, Set[int]] = {}
+
+    def edge_count(self) -> int:
+        return len(self.indices) // 2 + sum(map(len, self.recent.values())) // 2
+
+    def index(self, user_ids: np.ndarray) -> np.ndarray:
+        """Snapshot index of each user id, -1 for users it doesn't have."""
+        positions = np.searchsorted(self.user_ids, user_ids)
+        found = positions < len(self.user_ids)
+        found[found] = self.user_ids[positions[found]] == np.asarray(user_ids)[found]
+        return np.where(found, positions, -1)
+
+    def neighbors(self, user_id: int) -> np.ndarray:
+        """Sorted user ids `user_id` is connected to."""
+        i = int(self.index(np.array([user_id]))[0])
+        snapshot = self.user_ids[self.indices[self.indptr[i]:self.indptr[i + 1]]] if i >= 0 else self.user_ids[:0]
+        recent = self.recent.get(user_id)
+        if not recent:
+            return snapshot
+        return np.union1d(snapshot, np.fromiter(recent, dtype=self.user_ids.dtype, count=len(recent)))
+
+    def connect(self, a: int, b: int):
+        self.recent.setdefault(a, set()).add(b)
+        self.recent.setdefault(b, set()).add(a)
+
+    def adjacent(self, user_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Every connection of `user_ids`, as parallel arrays of (neighbour, user)."""
+        indices = self.index(user_ids)
+        known = indices >= 0
+        starts = self.indptr[indices[known]]
+        counts = self.indptr[indices[known] + 1] - starts
+        # Each user's slice of `indices`, concatenated
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        neighbors = [self.user_ids[self.indices[positions]]]
+        owners = [np.repeat(np.asarray(user_ids)[known], counts)]
+        if self.recent:
+            for user_id in np.asarray(user_ids).tolist():
+                recent = self.recent.get(user_id)
+                if recent:
+                    neighbors.append(np.fromiter(recent, dtype=self.user_ids.dtype, count=len(recent)))
+                    owners.append(np.full(len(recent), user_id, dtype=owners[0].dtype))
+        return np.concatenate(neighbors), np.concatenate(owners)
+
+    def mutual_counts(self, user_id: int, others: np.ndarray) -> np.ndarray:
+        """Connections `user_id` shares with each of `others`."""
+        users = np.unique(others)
+        neighbors, owners = self.adjacent(users)
+        shared = np.isin(neighbors, self.neighbors(user_id))
+        # An edge held in the snapshot and again in `recent` is one connection
+        pairs = np.unique(owners[shared].astype(np.int64) << 32 | neighbors[shared].astype(np.int64))
+        counts = np.bincount(np.searchsorted(users, pairs >> 32), minlength=len(users))
+        return counts[np.searchsorted(users, others)]
+
+    def path(self, source: int, target: int, max_depth: int) -> Optional[List[int]]:
+        """
+        A shortest chain of connections from `source` to `target` of at
+        most `max_depth` hops, or None. Searches from both ends, always
+        widening the smaller frontier.
+        """
+        if source == target:
+            return [source]
+        forward, backward = _Search(source), _Search(target)
+        for _ in range(max_depth):
+            search, other = (forward, backward) if len(forward.frontier) <= len(backward.frontier) else (backward, forward)
+            neighbors, owners = self.adjacent(search.frontier)
+            found, first = np.unique(neighbors, return_index=True)
+            new = ~np.isin(found, search.visited)
+            if not new.any():
+                return None
+            search.add_level(found[new], owners[first[new]])
+            meeting = other.best_meeting(search.frontier)
+            if meeting is not None:
+                return forward.trail(meeting)[::-1] + backward.trail(meeting)[1:]
+        return None
+
+class _Search:
+    """One side of a bidirectional breadth-first search."""
+    def __init__(self, root: int):
+        # Per level: the users reached, sorted, and who each was reached from
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = [(np.array([root]), np.array([-1]))]
+        self.visited = np.array([root])
+
+    @property
+    def frontier(self) -> np.ndarray:
+        return self.levels[-1][0]
+
+    def add_level(self, users: np.ndarray, parents: np.ndarray):
+        self.levels.append((users, parents))
+        self.visited = np.union1d(self.visited, users)
+
+    def best_meeting(self, users: np.ndarray) -> Optional[int]:
+        """Of `users`, one this side reached soonest, if any."""
+        for reached, _ in self.levels:
+            common = np.intersect1d(users, reached, assume_unique=True)
+            if len(common):
+                return int(common[0])
+        return None
+
+    def trail(self, user_id: int) -> List[int]:
+        """`user_id` back to the root."""
+        trail = [user_id]
+        for reached, parents in reversed(self.levels[1:]):
+            position = np.searchsorted(reached, trail[-1])
+            if position < len(reached) and reached[position] == trail[-1]:
+                trail.append(int(parents[position]))
+        return trail
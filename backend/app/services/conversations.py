@@ -0,0 +1,143 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.models.chat import Conversation, Message
+
+PREVIEW_LENGTH = 200
+
+# Rebuilds every summary from messages (migration 0004 backfill). Run on
+# an empty conversations table, e.g. to repair after manual data fixes.
+REBUILD_STATEMENTS = [
+    """INSERT INTO conversations (owner_id, peer_id, last_message_id, unread_count, last_read_message_id)
+       SELECT owner_id, peer_id, max(id), sum(unread), 0
+       FROM (
+           SELECT sender_id AS owner_id, recipient_id AS peer_id, id, 0 AS unread
+           FROM messages WHERE recipient_id IS NOT NULL
+           UNION ALL
+           SELECT recipient_id, sender_id, id, CASE WHEN is_read THEN 0 ELSE 1 END
+           FROM messages WHERE sender_id <> recipient_id
+       ) AS sides
+       GROUP BY owner_id, peer_id""",
+    """UPDATE conversations SET
+           last_message_at = (SELECT timestamp FROM messages WHERE id = conversations.last_message_id),
+           last_sender_id = (SELECT sender_id FROM messages WHERE id = conversations.last_message_id),
+           last_message_preview = (SELECT substr(content, 1, 200) FROM messages WHERE id = conversations.last_message_id)""",
+]
+
+@lru_cache(maxsize=None)
+def _upsert(dialect_name: str):
+    """
+    The summary upsert, built once per dialect: executed with the rows as
+    parameters it is the same statement every batch, so neither it nor its
+    compiled form (nor the costly `excluded` alias) is rebuilt per batch.
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert(Conversation)
+    newer = stmt.excluded.last_message_id > Conversation.last_message_id
+
+    def latest(column: str):
+        return case((newer, getattr(stmt.excluded, column)), else_=getattr(Conversation, column))
+
+    return stmt.on_conflict_do_update(
+        index_elements=[Conversation.owner_id, Conversation.peer_id],
+        set_={
+            # Batches can commit out of id order; keep the newest message
+            "last_message_at": latest("last_message_at"),
+            "last_sender_id": latest("last_sender_id"),
+            "last_message_preview": latest("last_message_preview"),
+            "last_message_id": latest("last_message_id"),
+            "unread_count": Conversation.unread_count + stmt.excluded.unread_count,
+        },
+    )
+
+def summarize(messages: Iterable[dict]) -> Dict[Tuple[int, int], dict]:
+    """
+    Fold stored messages (dicts with id, sender_id, recipient_id, content,
+    timestamp) into per-(owner, peer) summary updates. Both participants
+    get the latest message; only the recipient's unread count grows.
+    Room posts have no recipient and are skipped.
+    """
+    updates: Dict[Tuple[int, int], dict] = {}
+    for message in messages:
+        if message["recipient_id"] is None:
+            continue
+        sides = [(message["sender_id"], message["recipient_id"], 0)]
+        if message["recipient_id"] != message["sender_id"]:
+            sides.append((message["recipient_id"], message["sender_id"], 1))
+        for owner_id, peer_id, unread in sides:
+            row = updates.get((owner_id, peer_id))
+            if row is None:
+                row = updates[(owner_id, peer_id)] = {
+                    "owner_id": owner_id, "peer_id": peer_id,
+                    "unread_count": 0, "last_message_id": 0, "last_read_message_id": 0,
+                }
+            row["unread_count"] += unread
+            if message["id"] > row["last_message_id"]:
+                row.update(
+                    last_message_id=message["id"],
+                    last_message_at=message["timestamp"],
+                    last_sender_id=message["sender_id"],
+                    last_message_preview=message["content"][:PREVIEW_LENGTH],
+                )
+    return updates
+
+async def record_messages(conn: AsyncConnection, messages: Iterable[dict]):
+    """
+    Upsert the conversation summaries for newly stored messages, in the
+    same transaction as the messages themselves.
+    """
+    updates = summarize(messages)
+    if not updates:
+        return
+    # Fixed key order so concurrent batches lock rows in the same order
+    rows = [updates[key] for key in sorted(updates)]
+    await conn.execute(_upsert(conn.dialect.name), rows)
+
+async def mark_read(conn: AsyncConnection, owner_id: int, peer_id: int, up_to_id: int) -> Tuple[int, int]:
+    """
+    Mark the peer's messages to the owner up to and including up_to_id as
+    read and refresh the owner's unread count. Returns (marked, unread_count).
+    """
+    conversation = (await conn.execute(
+        select(Conversation.last_read_message_id, Conversation.unread_count)
+        .where(Conversation.owner_id == owner_id, Conversation.peer_id == peer_id)
+        .with_for_update()
+    )).first()
+    if conversation is None:
+        return 0, 0
+    read_from = conversation.last_read_message_id
+    if up_to_id <= read_from:
+        return 0, conversation.unread_count
+
+    # Everything at or below the read position is already read, so both
+    # statements are range scans over the newly read span only
+    marked = (await conn.execute(
+        update(Message)
+        .where(
+            Message.sender_id == peer_id,
+            Message.recipient_id == owner_id,
+            Message.id > read_from,
+            Message.id <= up_to_id,
+            Message.is_read.is_not(True),
+        )
+        .values(is_read=True)
+    )).rowcount
+    unread = await _unread_after(conn, owner_id, peer_id, up_to_id)
+    await conn.execute(
+        update(Conversation)
+        .where(Conversation.owner_id == owner_id, Conversation.peer_id == peer_id)
+        .values(unread_count=unread, last_read_message_id=up_to_id)
+    )
+    return marked, unread
+
+async def _unread_after(conn: AsyncConnection, owner_id: int, peer_id: int, message_id: int) -> int:
+    return await conn.scalar(
+        select(func.count()).select_from(Message).where(
+            Message.sender_id == peer_id,
+            Message.recipient_id == owner_id,
+            Message.id > message_id,
+            Message.is_read.is_not(True),
+        )
+    )
@@ -0,0 +1,396 @@
+import asyncio
+import bisect
+import logging
+import re
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.models.profile import Profile
+from app.services.typeahead import Typeahead, profile_suggestions
+
+logger = logging.getLogger("app.directory")
+
+# Alumni directory search, served from an index each worker keeps in
+# memory. Every query word matches as a prefix of a word in the profile,
+# or, from FUZZY_MIN_LENGTH letters on, as a prefix with a typo or two;
+# a profile matches when all of them do. It scores the best field each
+# word matched in, summed over the words, and ties go to the most points.
+# Totals and facet counts are exact, over every match.
+
+# Weights in tenths, best first; the postings store the field class
+FIELD_CLASSES = (("full_name",), ("department", "skills", "graduation_year"), ("location",), ("bio",))
+CLASS_WEIGHTS = (10, 4, 2, 1)
+# Words matched only with typos count for less
+FUZZY_WEIGHTS = (5, 2, 1, 1)
+# Query words this long tolerate one edit (a letter added, dropped,
+# changed, or two swapped), and FUZZY_LONG letters or more two
+FUZZY_MIN_LENGTH = 5
+FUZZY_LONG = 9
+# Most dictionary words checked for typos per query word, by shared trigrams
+FUZZY_CANDIDATES = 300
+FACET_SIZE = 20
+# Sort key bits: score, then points, then the lower id
+_SCORE_MAX = (1 << 9) - 1
+_POINTS_MAX = (1 << 22) - 1
+_ID_MAX = (1 << 31) - 1
+
+BUILD_CHUNK = 1000
+# Refreshes read the changes after the newest (updated_at, id) seen, and
+# every REFRESH_OVERLAP re-read this far behind it: updated_at is stamped
+# at transaction start, so a transaction can commit after a later one.
+# Profile writes and each bulk import batch commit well inside this
+REFRESH_OVERLAP = timedelta(seconds=60)
+# Dead slots are compacted away once they outnumber the live ones, and
+# there are at least this many
+COMPACT_MIN_DEAD = 10_000
+
+COLUMNS = (
+    Profile.id, Profile.full_name, Profile.department, Profile.skills, Profile.location, Profile.bio,
+    Profile.points, Profile.graduation_year, Profile.updated_at,
+)
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+class DirectoryResults(NamedTuple):
+    # One page of profile ids plus one lookahead
+    profile_ids: List[int]
+    total: int
+    # (value, count), most common first
+    graduation_years: List[Tuple[int, int]]
+    departments: List[Tuple[str, int]]
+
+class DirectoryIndex:
+    """
+    Inverted index over the profile columns the directory searches, plus
+    per-profile points, graduation year and department for ranking and
+    facets, all in flat arrays so a query is a handful of numpy passes.
+
+    Profiles live in slots. Changing what one is searched by appends a
+    new slot and retires the old, while points, which only rank, change
+    in place; refreshes compact the dead slots away once there are more
+    of them than live ones. The index is built from the database in the background at startup, and
+    changes made on other workers arrive by polling profiles.updated_at
+    every `refresh_interval` seconds; this worker's own are applied as
+    they're made. A `typeahead` given is kept in step: it gets every
+    profile this index does, and jobs on the same schedule.
+    """
+    def __init__(self, engine: AsyncEngine, refresh_interval: float, typeahead: Optional[Typeahead] = None):
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self.typeahead = typeahead
+        self.words: List[str] = []  # sorted, for prefix ranges
+        self.postings: Dict[str, array] = {}  # word -> slot * 4 + field class
+        self.vocabulary: List[str] = []  # every word, in the order first seen
+        self.trigrams: Dict[str, array] = {}  # trigram -> vocabulary indexes, for typos
+        self.ids = array("i")
+        self.points = array("i")
+        self.years = array("i")  # 0 when unset
+        self.departments = array("i")  # code, 0 when unset
+        self.fingerprints = array("q")
+        self.alive = bytearray()
+        self.suggestion_records = array("i")  # typeahead record
+        self.slots: Dict[int, int] = {}  # profile id -> live slot
+        self.department_codes: Dict[str, int] = {}
+        self.department_names: List[Optional[str]] = [None]
+        self.synced_at = datetime.min
+        self.synced_id = 0
+        self._swept_at = time.monotonic()
+        self.built = False
+        self._build_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        for task in (self._refresh_task, self._build_task):
+            if task is not None and not task.done():
+                task.cancel()
+        if self._refresh_task is not None:
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        if not self.built:
+            self._build_task = None
+
+    def profile_count(self) -> int:
+        return len(self.slots)
+
+    async def ready(self):
+        """Wait for the initial build, starting it if nothing has yet."""
+        task = self._build_task
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = self._build_task = asyncio.create_task(self._build())
+        await asyncio.shield(task)
+
+    async def _build(self):
+        async with self.engine.connect() as conn:
+            result = await conn.stream(select(*COLUMNS).execution_options(yield_per=BUILD_CHUNK))
+            async for rows in result.partitions(BUILD_CHUNK):
+                for row in rows:
+                    self._add(row, building=True)
+                    self._seen(row)
+                # Don't hold up requests for the whole build
+                await asyncio.sleep(0)
+            if self.typeahead is not None:
+                await self.typeahead.load_jobs(conn, building=True)
+        self.words.sort()
+        if self.typeahead is not None:
+            self.typeahead.finish_build()
+            await self.typeahead.warm()
+        self.built = True
+        logger.info("Directory index built: %d profiles, %d words", len(self.slots), len(self.words))
+
+    async def _refresh_loop(self):
+        await self.ready()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the directory index")
+
+    async def refresh(self):
+        """Apply profiles changed since the last refresh."""
+        query = select(*COLUMNS)
+        if time.monotonic() - self._swept_at >= REFRESH_OVERLAP.total_seconds():
+            # Catch up on transactions that committed behind the mark
+            self._swept_at = time.monotonic()
+            if self.synced_at > datetime.min:
+                query = query.where(Profile.updated_at >= self.synced_at - REFRESH_OVERLAP)
+        else:
+            query = query.where(Profile.updated_at >= self.synced_at, or_(
+                Profile.updated_at > self.synced_at, and_(Profile.updated_at == self.synced_at, Profile.id > self.synced_id),
+            ))
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(query)).all()
+            if self.typeahead is not None:
+                await self.typeahead.load_jobs(conn)
+        for start in range(0, len(rows), BUILD_CHUNK):
+            for row in rows[start:start + BUILD_CHUNK]:
+                self._add(row)
+                self._seen(row)
+            await asyncio.sleep(0)
+        dead = len(self.ids) - len(self.slots)
+        if dead > max(len(self.slots), COMPACT_MIN_DEAD):
+            self._compact()
+
+    def update(self, profile: Profile):
+        """Apply a profile this worker just committed."""
+        if self.built:
+            self._add(profile)
+
+    def _seen(self, row):
+        if row.updated_at is not None and (row.updated_at, row.id) > (self.synced_at, self.synced_id):
+            self.synced_at, self.synced_id = row.updated_at, row.id
+
+    def _add(self, row, building: bool = False):
+        fingerprint = hash((row.full_name, row.department, row.skills, row.location, row.bio, row.graduation_year))
+        points = min(max(row.points or 0, 0), _POINTS_MAX)
+        old = self.slots.get(row.id)
+        if old is not None:
+            if self.fingerprints[old] == fingerprint:
+                self.points[old] = points
+                return
+            self.alive[old] = 0
+        slot = len(self.ids)
+        self.ids.append(row.id)
+        self.points.append(points)
+        self.years.append(row.graduation_year or 0)
+        self.departments.append(self._department_code(row.department))
+        self.fingerprints.append(fingerprint)
+        self.alive.append(1)
+        self.slots[row.id] = slot
+        if self.typeahead is not None:
+            self.suggestion_records.append(self.typeahead.add(
+                profile_suggestions(row),
+                replaces=self.suggestion_records[old] if old is not None else None,
+                building=building,
+            ))
+
+        # Each word once, in the best field it appears in
+        classes: Dict[str, int] = {}
+        for field_class, fields in enumerate(FIELD_CLASSES):
+            for field in fields:
+                value = getattr(row, field)
+                for word in tokenize(value if value is None else str(value)):
+                    classes.setdefault(word, field_class)
+        for word, field_class in classes.items():
+            postings = self.postings.get(word)
+            if postings is None:
+                postings = self.postings[word] = array("i")
+                self._add_word(word)
+                if building:
+                    self.words.append(word)
+                else:
+                    bisect.insort(self.words, word)
+            postings.append(slot * 4 + field_class)
+
+    def _add_word(self, word: str):
+        code = len(self.vocabulary)
+        self.vocabulary.append(word)
+        for trigram in _trigrams(word):
+            codes = self.trigrams.get(trigram)
+            if codes is None:
+                codes = self.trigrams[trigram] = array("i")
+            codes.append(code)
+
+    def _similar(self, term: str) -> List[str]:
+        """Words `term` is a typo'd prefix of: those sharing enough trigrams, checked by edit distance."""
+        edits = 2 if len(term) >= FUZZY_LONG else 1
+        trigrams = _trigrams(term)
+        found = [np.frombuffer(self.trigrams[trigram], dtype=np.int32) for trigram in trigrams if trigram in self.trigrams]
+        if not found:
+            return []
+        shared = np.bincount(np.concatenate(found))
+        # Each edit changes at most four trigrams (a swap does)
+        candidates = np.flatnonzero(shared >= max(1, len(trigrams) - 4 * edits))
+        if len(candidates) > FUZZY_CANDIDATES:
+            candidates = candidates[np.argpartition(-shared[candidates], FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]]
+        return [
+            word for word in (self.vocabulary[code] for code in candidates.tolist())
+            if word in self.postings and prefix_distance(term, word, edits) <= edits
+        ]
+
+    def _compact(self):
+        """Drop the dead slots, renumbering the live ones in order."""
+        alive = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+        keep = np.flatnonzero(alive)
+        renumber = np.cumsum(alive, dtype=np.int64) - 1
+        postings: Dict[str, array] = {}
+        for word in self.words:
+            entries = np.frombuffer(self.postings[word], dtype=np.int32)
+            entries = entries[alive[entries >> 2]]
+            if len(entries):
+                postings[word] = _to_array("i", (renumber[entries >> 2] << 2) | (entries & 3))
+        self.words = [word for word in self.words if word in postings]
+        self.postings = postings
+        self.vocabulary, self.trigrams = [], {}
+        for word in self.words:
+            self._add_word(word)
+        for name in ("ids", "points", "years", "departments", "fingerprints"):
+            values = getattr(self, name)
+            setattr(self, name, _to_array(values.typecode, np.frombuffer(values, dtype=values.typecode)[keep]))
+        if self.typeahead is not None:
+            records = np.frombuffer(self.suggestion_records, dtype=np.int32)[keep].tolist()
+            self.suggestion_records = array("i", self.typeahead.compact(records))
+        self.alive = bytearray(b"\x01") * len(keep)
+        self.slots = {profile_id: slot for slot, profile_id in enumerate(self.ids)}
+        logger.info("Directory index compacted: %d dead slots dropped", len(alive) - len(keep))
+
+    def _department_code(self, department: Optional[str]) -> int:
+        if not department:
+            return 0
+        code = self.department_codes.get(department)
+        if code is None:
+            code = self.department_codes[department] = len(self.department_names)
+            self.department_names.append(department)
+        return code
+
+    def _term_scores(self, term: str, size: int) -> np.ndarray:
+        """Per slot, the weight of the best field a word starting with `term`, or nearly, is in."""
+        scores = np.zeros(size, dtype=np.int64)
+        start = bisect.bisect_left(self.words, term)
+        end = start
+        while end < len(self.words) and self.words[end].startswith(term):
+            end += 1
+        matches = [(word, CLASS_WEIGHTS) for word in self.words[start:end]]
+        if len(term) >= FUZZY_MIN_LENGTH:
+            exact = set(self.words[start:end])
+            matches += [(word, FUZZY_WEIGHTS) for word in self._similar(term) if word not in exact]
+        if not matches:
+            return scores
+        entries = [np.frombuffer(self.postings[word], dtype=np.int32) for word, _ in matches]
+        weights = np.concatenate([
+            np.asarray(class_weights, dtype=np.int64)[word_entries & 3]
+            for word_entries, (_, class_weights) in zip(entries, matches)
+        ])
+        slots = np.concatenate(entries) >> 2
+        # Lowest weight first so the best one a slot matched is written last
+        order = np.argsort(weights, kind="stable")
+        scores[slots[order]] = weights[order]
+        return scores
+
+    def search(self, query: Optional[str], department: Optional[str], year: Optional[int],
+               limit: int, offset: int) -> DirectoryResults:
+        size = len(self.ids)
+        if size == 0:
+            return DirectoryResults([], 0, [], [])
+        matched = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+        departments = np.frombuffer(self.departments, dtype=np.int32)
+        years = np.frombuffer(self.years, dtype=np.int32)
+        if department is not None:
+            wanted = department.strip().lower()
+            codes = [code for code, name in enumerate(self.department_names) if name is not None and wanted in name.lower()]
+            matched &= np.isin(departments, codes)
+        if year is not None:
+            matched &= years == year
+        score = np.zeros(size, dtype=np.int64)
+        for term in dict.fromkeys(tokenize(query)):
+            term_scores = self._term_scores(term, size)
+            matched &= term_scores > 0
+            score += term_scores
+
+        slots = np.flatnonzero(matched)
+        total = len(slots)
+        if total == 0:
+            return DirectoryResults([], 0, [], [])
+        ids = np.frombuffer(self.ids, dtype=np.int32)[slots].astype(np.int64)
+        keys = (
+            (np.minimum(score[slots], _SCORE_MAX) << 53)
+            | (np.frombuffer(self.points, dtype=np.int32)[slots].astype(np.int64) << 31)
+            | (_ID_MAX - ids)
+        )
+        wanted = min(offset + limit + 1, total)
+        top = np.argpartition(-keys, wanted - 1)[:wanted] if wanted < total else np.arange(total)
+        top = top[np.argsort(-keys[top])][offset:]
+
+        matched_years = years[slots]
+        year_counts = np.bincount(matched_years[(matched_years > 0) & (matched_years < 10000)], minlength=1)
+        department_counts = np.bincount(departments[slots])
+        department_counts[0] = 0
+        return DirectoryResults(
+            profile_ids=ids[top].tolist(),
+            total=total,
+            graduation_years=_facet(year_counts, lambda value: value),
+            departments=_facet(department_counts, lambda code: self.department_names[code]),
+        )
+
+def _trigrams(word: str) -> List[str]:
+    # Padded at the start only: prefixes share the word's leading trigrams
+    padded = "  " + word
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(word))))
+
+def prefix_distance(term: str, word: str, limit: int) -> int:
+    """
+    Fewest edits (a letter added, dropped or changed, or two adjacent ones
+    swapped) turning `term` into a prefix of `word`; past `limit`, limit + 1.
+    """
+    width = min(len(word), len(term) + limit)
+    before, row = None, list(range(width + 1))
+    for i in range(1, len(term) + 1):
+        current = [i] + [0] * width
+        for j in range(1, width + 1):
+            cost = term[i - 1] != word[j - 1]
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if (before is not None and j > 1 and term[i - 1] == word[j - 2] and term[i - 2] == word[j - 1]):
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, row = row, current
+    return min(min(row), limit + 1)
+
+def _to_array(typecode: str, values: np.ndarray) -> array:
+    result = array(typecode)
+    result.frombytes(values.astype(typecode).tobytes())
+    return result
+
+def _facet(counts: np.ndarray, label) -> List[Tuple]:
+    order = np.argsort(-counts, kind="stable")[:FACET_SIZE]
+    return [(label(int(value)), int(counts[value])) for value in order if counts[value]]
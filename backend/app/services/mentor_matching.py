@@ -0,0 +1,219 @@
+import asyncio
+import logging
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.models.profile import Profile
+from app.models.user import User
+from app.services.typeahead import normalize
+
+logger = logging.getLogger("app.mentoring")
+
+# Mentor matching: people of the wanted role ranked by how much their
+# skills and interests overlap the user's (the Jaccard similarity of the
+# two sets), with a bonus for the same department and a nearby
+# graduation year. Only people with something in common are matched.
+
+SKILL_WEIGHT = 3.0
+DEPARTMENT_WEIGHT = 1.0
+# Full bonus for the same year, fading to none YEAR_WINDOW years apart
+YEAR_WEIGHT = 1.0
+YEAR_WINDOW = 10
+# By years apart
+_YEAR_BONUS = (YEAR_WEIGHT * (1 - np.arange(YEAR_WINDOW + 1) / YEAR_WINDOW)).astype(np.float32)
+ROLES = ("alumni", "student")
+_ROLE_CODES = {role: code for code, role in enumerate(ROLES, 1)}
+
+BUILD_CHUNK = 1000
+# As for the directory index: updated_at is stamped at transaction start
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+COLUMNS = (
+    Profile.user_id, Profile.department, Profile.graduation_year, Profile.skills, Profile.interest,
+    Profile.updated_at, User.role,
+)
+
+def profile_tags(profile) -> List[str]:
+    """Skills and interests, normalized, each once."""
+    values = f"{profile.skills or ''},{profile.interest or ''}".split(",")
+    return list(dict.fromkeys(tag for tag in map(normalize, values) if tag))
+
+class Match(NamedTuple):
+    user_id: int
+    score: float
+    # Skills and interests in common
+    shared: List[str]
+
+class MentorIndex:
+    """
+    Every profile as a set of codes into one vocabulary of skills and
+    interests, held as a sparse matrix both ways: each slot's codes, and
+    per code the slots that have it. A match reads the user's codes'
+    slot lists to count what everyone shares with them, then scores all
+    profiles of the role in a few numpy passes.
+
+    Profiles live in slots: changing one appends a new slot and retires
+    the old, and dead slots are reclaimed when the worker restarts. Built
+    in the background at startup; other workers' changes arrive by
+    polling profiles.updated_at every `refresh_interval` seconds, and
+    this worker's own as they're made.
+    """
+    def __init__(self, engine: AsyncEngine, refresh_interval: float):
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self.vocabulary: List[str] = []
+        self.codes: Dict[str, int] = {}  # tag -> index in vocabulary
+        self.postings: List[array] = []  # per code, slots
+        self.tag_starts = array("q", [0])  # slot's codes are tags[tag_starts[slot]:tag_starts[slot + 1]]
+        self.tags = array("i")
+        self.ids = array("i")  # user ids
+        self.roles = bytearray()  # code, 0 for other roles
+        self.years = array("i")  # 0 when unset
+        self.departments = array("i")  # code, 0 when unset
+        self.department_codes: Dict[str, int] = {}
+        self.fingerprints = array("q")
+        self.alive = bytearray()
+        self.slots: Dict[int, int] = {}  # user id -> live slot
+        self.synced_at = datetime.min
+        self.built = False
+        self._build_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        for task in (self._refresh_task, self._build_task):
+            if task is not None and not task.done():
+                task.cancel()
+        if self._refresh_task is not None:
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        if not self.built:
+            self._build_task = None
+
+    def profile_count(self) -> int:
+        return len(self.slots)
+
+    async def ready(self):
+        """Wait for the initial build, starting it if nothing has yet."""
+        task = self._build_task
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = self._build_task = asyncio.create_task(self._build())
+        await asyncio.shield(task)
+
+    async def _build(self):
+        async with self.engine.connect() as conn:
+            result = await conn.stream(_select().execution_options(yield_per=BUILD_CHUNK))
+            async for rows in result.partitions(BUILD_CHUNK):
+                for row in rows:
+                    self._add(row, row.role)
+                    self._seen(row)
+                await asyncio.sleep(0)
+        self.built = True
+        logger.info("Mentor index built: %d profiles, %d skills and interests", len(self.slots), len(self.vocabulary))
+
+    async def _refresh_loop(self):
+        await self.ready()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the mentor index")
+
+    async def refresh(self):
+        """Apply profiles changed since the last refresh."""
+        since = self.synced_at - REFRESH_OVERLAP if self.synced_at > datetime.min else self.synced_at
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(_select().where(Profile.updated_at >= since))).all()
+        for start in range(0, len(rows), BUILD_CHUNK):
+            for row in rows[start:start + BUILD_CHUNK]:
+                self._add(row, row.role)
+                self._seen(row)
+            await asyncio.sleep(0)
+
+    def update(self, profile: Profile, role: str):
+        """Apply a profile this worker just committed."""
+        if self.built:
+            self._add(profile, role)
+
+    def _seen(self, row):
+        if row.updated_at is not None and row.updated_at > self.synced_at:
+            self.synced_at = row.updated_at
+
+    def _add(self, row, role: Optional[str]):
+        tags = profile_tags(row)
+        fingerprint = hash((role, row.department, row.graduation_year, *tags))
+        old = self.slots.get(row.user_id)
+        if old is not None:
+            if self.fingerprints[old] == fingerprint:
+                return
+            self.alive[old] = 0
+        slot = len(self.ids)
+        self.ids.append(row.user_id)
+        self.roles.append(_ROLE_CODES.get(role, 0))
+        self.years.append(row.graduation_year or 0)
+        self.departments.append(self.department_codes.setdefault(row.department, len(self.department_codes) + 1)
+                                if row.department else 0)
+        self.fingerprints.append(fingerprint)
+        self.alive.append(1)
+        self.slots[row.user_id] = slot
+        for tag in tags:
+            code = self.codes.get(tag)
+            if code is None:
+                code = self.codes[tag] = len(self.vocabulary)
+                self.vocabulary.append(tag)
+                self.postings.append(array("i"))
+            self.tags.append(code)
+            self.postings[code].append(slot)
+        self.tag_starts.append(len(self.tags))
+
+    def _slot_tags(self, slot: int) -> np.ndarray:
+        return np.frombuffer(self.tags, dtype=np.int32)[self.tag_starts[slot]:self.tag_starts[slot + 1]]
+
+    def match(self, user_id: int, role: str, limit: int) -> List[Match]:
+        """Up to `limit` people with `role` for `user_id`, best first."""
+        slot = self.slots.get(user_id)
+        size = len(self.ids)
+        if slot is None or size == 0:
+            return []
+        tags = self._slot_tags(slot)
+        department, year = self.departments[slot], self.years[slot]
+
+        score = np.zeros(size, dtype=np.float32)
+        if len(tags):
+            shared = np.bincount(
+                np.concatenate([np.frombuffer(self.postings[code], dtype=np.int32) for code in tags.tolist()]),
+                minlength=size,
+            )
+            sharing = np.flatnonzero(shared)
+            starts = np.frombuffer(self.tag_starts, dtype=np.int64)
+            union = starts[sharing + 1] - starts[sharing] + len(tags) - shared[sharing]
+            score[sharing] = SKILL_WEIGHT * shared[sharing] / union
+        if department:
+            np.add(score, DEPARTMENT_WEIGHT, out=score, where=np.frombuffer(self.departments, dtype=np.int32) == department)
+        if year:
+            # Unset years are far enough from any real one to get nothing
+            apart = np.abs(np.frombuffer(self.years, dtype=np.int32) - year)
+            score += _YEAR_BONUS[np.minimum(apart, YEAR_WINDOW, out=apart)]
+
+        eligible = (np.frombuffer(self.roles, dtype=np.uint8) == _ROLE_CODES.get(role, -1))
+        eligible &= np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+        eligible[slot] = False
+        score[~eligible] = 0
+        top = np.argpartition(-score, limit)[:limit] if size > limit else np.arange(size)
+        top = top[np.argsort(-score[top], kind="stable")]
+        top = top[score[top] > 0]
+        wanted = set(tags.tolist())
+        return [
+            Match(self.ids[match], float(score[match]),
+                  [self.vocabulary[code] for code in self._slot_tags(match).tolist() if code in wanted])
+            for match in top.tolist()
+        ]
+
+def _select():
+    return select(*COLUMNS).join(User, User.id == Profile.user_id)
@@ -0,0 +1,263 @@
+import asyncio
+import bisect
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, desc, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.models.chat import Message, RoomMember
+
+# Full-text search over the messages a user can read: their direct
+# messages and the posts of rooms they belong to. On PostgreSQL it runs on
+# the trigger-maintained `search_vector` column and its GIN index
+# (migration 0007); elsewhere on an in-process inverted index. Either way
+# only the newest `candidates` matches are ranked, and the caller is told
+# when older ones were left out. Results come back best first with the
+# matched words wrapped in <mark></mark>.
+
+TEXT_SEARCH_CONFIG = "english"
+HIGHLIGHT_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+search_vector = literal_column("messages.search_vector", TSVECTOR)
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(content: str) -> List[str]:
+    return _WORD.findall(content.lower())
+
+def highlight(content: str, terms: Iterable[str]) -> str:
+    terms = set(terms)
+    return _WORD.sub(lambda m: f"<mark>{m.group()}</mark>" if m.group().lower() in terms else m.group(), content)
+
+# The newest matches are found in one of two ways. A backwards scan of the
+# newest NEWEST_WINDOW messages finds the candidates of a common word long
+# before the window runs out; only when it comes up short are a rarer
+# word's matches looked up in the GIN index instead
+NEWEST_WINDOW = 40_000
+
+def _room_ids(user_id: int):
+    return select(RoomMember.room_id).where(RoomMember.user_id == user_id)
+
+def _visible(columns, user_id: int):
+    return or_(
+        and_(columns.recipient_id.is_not(None),
+             or_(columns.sender_id == user_id, columns.recipient_id == user_id)),
+        columns.room_id.in_(_room_ids(user_id)),
+    )
+
+async def search(conn: AsyncConnection, user_id: int, query: str, limit: int, offset: int, candidates: int) -> Tuple[List[dict], bool]:
+    """
+    One page of hits plus one lookahead row, as dicts with the message's
+    fields, `rank` and `highlight`, and whether more than `candidates`
+    messages matched, so older matches were left unranked.
+    """
+    if conn.dialect.name == "postgresql":
+        return await _search_postgresql(conn, user_id, query, limit, offset, candidates)
+    await index.ensure_built(conn)
+    rooms = set((await conn.execute(_room_ids(user_id))).scalars().all())
+    return index.search(user_id, rooms, query, limit, offset, candidates)
+
+async def _newest_match_ids(conn: AsyncConnection, user_id: int, tsquery, count: int) -> List[int]:
+    # The LIMIT keeps the match condition above the window, so the planner
+    # can't trade the short backwards scan for a GIN scan of every match
+    window = (
+        select(Message.id, Message.sender_id, Message.recipient_id, Message.room_id,
+               search_vector.label("search_vector"))
+        .order_by(Message.id.desc())
+        .limit(NEWEST_WINDOW)
+        .subquery()
+    )
+    ids = (await conn.execute(
+        select(window.c.id)
+        .where(window.c.search_vector.op("@@")(tsquery), _visible(window.c, user_id))
+        .order_by(window.c.id.desc())
+        .limit(count)
+    )).scalars().all()
+    if len(ids) == count:
+        return list(ids)
+    # Too rare for the window: a materialized CTE has the GIN index find
+    # every match, and the newest of them are kept
+    matches = (
+        select(Message.id, Message.sender_id, Message.recipient_id, Message.room_id)
+        .where(search_vector.op("@@")(tsquery))
+        .cte("matches")
+        .prefix_with("MATERIALIZED")
+    )
+    return list((await conn.execute(
+        select(matches.c.id)
+        .where(_visible(matches.c, user_id))
+        .order_by(matches.c.id.desc())
+        .limit(count)
+    )).scalars().all())
+
+async def _search_postgresql(conn: AsyncConnection, user_id: int, query: str, limit: int, offset: int, candidates: int) -> Tuple[List[dict], bool]:
+    tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+    ids = await _newest_match_ids(conn, user_id, tsquery, candidates + 1)
+    truncated = len(ids) > candidates
+    if not ids:
+        return [], truncated
+    matches = (
+        select(Message.id, func.ts_rank(search_vector, tsquery).label("rank"))
+        .where(Message.id.in_(ids[:candidates]))
+        .subquery()
+    )
+    page = (
+        select(matches.c.id, matches.c.rank)
+        .order_by(desc(matches.c.rank), desc(matches.c.id))
+        .offset(offset)
+        .limit(limit + 1)
+        .subquery()
+    )
+    # Headlines are the costly part, so they're made for the page only
+    rows = await conn.execute(
+        select(
+            Message.id, Message.sender_id, Message.recipient_id, Message.room_id, Message.content,
+            Message.timestamp, page.c.rank,
+            func.ts_headline(TEXT_SEARCH_CONFIG, Message.content, tsquery, HIGHLIGHT_OPTIONS).label("highlight"),
+        )
+        .join(page, page.c.id == Message.id)
+        .order_by(desc(page.c.rank), desc(page.c.id))
+    )
+    return [dict(row._mapping) for row in rows], truncated
+
+class _Document(NamedTuple):
+    sender_id: int
+    recipient_id: Optional[int]
+    room_id: Optional[int]
+    content: str
+    timestamp: datetime
+    length: int
+
+class MessageIndex:
+    """
+    In-process inverted index over message content, for databases without
+    full-text search (SQLite in tests). Built from the messages table on
+    the first search, then kept current by add() as this process stores
+    messages; messages stored by other processes are not seen. Ranked with
+    BM25.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        # term -> ids of the messages containing it, ascending
+        self.postings: Dict[str, List[int]] = {}
+        self.documents: Dict[int, _Document] = {}
+        self.total_length = 0
+        self.built = False
+        self._pending: Optional[List[dict]] = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_built(self, conn: AsyncConnection):
+        if self.built:
+            return
+        async with self._lock:
+            if self.built:
+                return
+            # Messages stored while the table is read are held back and
+            # merged afterwards, so none fall between the two
+            self._pending = []
+            rows = await conn.execute(select(
+                Message.id, Message.sender_id, Message.recipient_id, Message.room_id,
+                Message.content, Message.timestamp,
+            ))
+            for row in rows:
+                self._add(row._mapping)
+            pending, self._pending = self._pending, None
+            for message in pending:
+                self._add(message)
+            self.built = True
+
+    def add(self, messages: Iterable[dict]):
+        """Index newly stored messages (dicts with id, sender_id, recipient_id, room_id, content, timestamp)."""
+        if self._pending is not None:
+            self._pending.extend(messages)
+        elif self.built:
+            for message in messages:
+                self._add(message)
+
+    def _add(self, message):
+        if message["id"] in self.documents:
+            return
+        terms = tokenize(message["content"])
+        self.documents[message["id"]] = _Document(
+            message["sender_id"], message.get("recipient_id"), message.get("room_id"),
+            message["content"], message["timestamp"], len(terms),
+        )
+        self.total_length += len(terms)
+        for term in set(terms):
+            ids = self.postings.setdefault(term, [])
+            # Batches can commit out of id order
+            if not ids or ids[-1] < message["id"]:
+                ids.append(message["id"])
+            else:
+                bisect.insort(ids, message["id"])
+
+    def _newest_matches(self, terms: List[str], visible: Callable[[_Document], bool], candidates: int) -> List[int]:
+        lists = sorted((self.postings.get(term, []) for term in terms), key=len)
+        if not lists or not lists[0]:
+            return []
+        shortest, others = lists[0], lists[1:]
+
+        def contains(ids: List[int], message_id: int) -> bool:
+            i = bisect.bisect_left(ids, message_id)
+            return i < len(ids) and ids[i] == message_id
+
+        matches = []
+        for message_id in reversed(shortest):
+            if all(contains(ids, message_id) for ids in others) and visible(self.documents[message_id]):
+                matches.append(message_id)
+                if len(matches) == candidates:
+                    break
+        return matches
+
+    def search(self, user_id: int, room_ids: set, query: str, limit: int, offset: int, candidates: int) -> Tuple[List[dict], bool]:
+        terms = sorted(set(tokenize(query)))
+
+        def visible(document: _Document) -> bool:
+            if document.recipient_id is not None:
+                return user_id in (document.sender_id, document.recipient_id)
+            return document.room_id in room_ids
+
+        matches = self._newest_matches(terms, visible, candidates + 1)
+        truncated = len(matches) > candidates
+        matches = matches[:candidates]
+        if not matches:
+            return [], truncated
+        count = len(self.documents)
+        average_length = self.total_length / count
+        idf = {
+            term: math.log(1 + (count - len(self.postings[term]) + 0.5) / (len(self.postings[term]) + 0.5))
+            for term in terms
+        }
+
+        def score(message_id: int) -> float:
+            document = self.documents[message_id]
+            frequencies = Counter(tokenize(document.content))
+            norm = self.K1 * (1 - self.B + self.B * document.length / average_length)
+            return sum(idf[term] * frequencies[term] * (self.K1 + 1) / (frequencies[term] + norm) for term in terms)
+
+        ranked = sorted(((score(message_id), message_id) for message_id in matches), reverse=True)
+        hits = []
+        for rank, message_id in ranked[offset:offset + limit + 1]:
+            document = self.documents[message_id]
+            hits.append({
+                "id": message_id,
+                "sender_id": document.sender_id,
+                "recipient_id": document.recipient_id,
+                "room_id": document.room_id,
+                "content": document.content,
+                "timestamp": document.timestamp,
+                "rank": rank,
+                "highlight": highlight(document.content, terms),
+            })
+        return hits, truncated
+
+index = MessageIndex()
+
+def record_messages(messages: Iterable[dict]):
+    """Make newly stored messages searchable on databases without full-text search."""
+    index.add(messages)
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.models.chat import Message
+from app.services import conversations, message_search
+
+logger = logging.getLogger("app.chat")
+
+_STOP = object()
+
+class StoredMessage(NamedTuple):
+    id: int
+    timestamp: datetime
+    # False when the message was a resend of one already stored
+    created: bool
+
+class MessageWriter:
+    """
+    Write-behind persistence for chat messages. Messages from every socket
+    on this worker are queued and stored by one task in multi-row INSERTs,
+    one transaction per batch, so a busy worker commits (and fsyncs) once
+    per batch instead of once per message.
+
+    A batch is flushed as soon as it reaches `batch_size`, otherwise after
+    lingering `interval` seconds for more messages to arrive. The queue is
+    bounded: when the database falls behind, enqueue() blocks the sockets'
+    receive loops instead of buffering without limit. A batch the
+    database refuses is stored again one message at a time, so a bad row
+    only fails its own message.
+    """
+    def __init__(self, engine: AsyncEngine, batch_size: int, interval: float, max_queue: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.batches = 0
+        self.messages = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Flush everything queued so far, then end the writer task
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def enqueue(self, sender_id: int, recipient_id: Optional[int], content: str,
+                      client_id: Optional[str] = None, room_id: Optional[int] = None) -> asyncio.Future:
+        """
+        Queue a direct message (recipient_id) or room post (room_id); the
+        returned future resolves to a StoredMessage once the batch holding
+        it is committed. A message whose (sender_id, client_id) was already
+        stored resolves to the original instead.
+        """
+        row = {
+            "sender_id": sender_id,
+            "recipient_id": recipient_id,
+            "room_id": room_id,
+            "content": content,
+            "timestamp": datetime.utcnow(),
+            "is_read": False,
+            "client_id": client_id,
+        }
+        stored = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, stored))
+        return stored
+
+    async def write(self, sender_id: int, recipient_id: Optional[int], content: str,
+                    client_id: Optional[str] = None, room_id: Optional[int] = None) -> StoredMessage:
+        return await (await self.enqueue(sender_id, recipient_id, content, client_id, room_id))
+
+    def _drain(self, batch: list, limit: int):
+        while len(batch) < limit and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is _STOP:
+                self._stopping = True
+                return
+            batch.append(item)
+
+    async def _run(self):
+        while not self._stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            self._drain(batch, self.batch_size)
+            if len(batch) < self.batch_size and self.interval > 0 and not self._stopping:
+                await asyncio.sleep(self.interval)
+                self._drain(batch, self.batch_size)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]):
+        try:
+            try:
+                results = await self._store(batch)
+            except IntegrityError:
+                # A resend raced its original on another worker and hit the
+                # unique index; the original is visible to the retry
+                results = await self._store(batch)
+        except Exception as e:
+            if len(batch) > 1:
+                # Something in it the database refuses: store the messages
+                # one at a time so only that one fails
+                logger.warning("Failed to store a batch of %d chat messages (%s); retrying one at a time", len(batch), e)
+                for item in batch:
+                    await self._flush([item])
+                return
+            logger.exception("Failed to store a chat message")
+            for _, stored in batch:
+                if not stored.done():
+                    stored.set_exception(e)
+            return
+        self.batches += 1
+        self.messages += sum(result.created for result in results)
+        for (_, stored), result in zip(batch, results):
+            if not stored.done():
+                stored.set_result(result)
+
+    async def _store(self, batch: List[Tuple[dict, asyncio.Future]]) -> List[StoredMessage]:
+        results: List[Optional[StoredMessage]] = [None] * len(batch)
+        stored_rows = []
+        async with self.engine.begin() as conn:
+            existing = await self._existing(conn, [row for row, _ in batch])
+            new, first_copy = [], {}
+            for index, (row, _) in enumerate(batch):
+                key = (row["sender_id"], row["client_id"])
+                if row["client_id"] is None:
+                    new.append(index)
+                elif key in existing:
+                    results[index] = existing[key]
+                elif key not in first_copy:
+                    first_copy[key] = index
+                    new.append(index)
+
+            if new:
+                rows = [batch[index][0] for index in new]
+                ids = (await conn.execute(
+                    insert(Message).returning(Message.id, sort_by_parameter_order=True), rows
+                )).scalars().all()
+                stored_rows = [dict(row, id=message_id) for row, message_id in zip(rows, ids)]
+                await conversations.record_messages(conn, stored_rows)
+                for index, row, message_id in zip(new, rows, ids):
+                    results[index] = StoredMessage(message_id, row["timestamp"], True)
+        # Searchable once committed
+        message_search.record_messages(stored_rows)
+
+        # Resent within the same batch: resolve to the first copy
+        for index, (row, _) in enumerate(batch):
+            if results[index] is None:
+                first = results[first_copy[(row["sender_id"], row["client_id"])]]
+                results[index] = first._replace(created=False)
+        return results
+
+    async def _existing(self, conn, rows: List[dict]) -> Dict[Tuple[int, str], StoredMessage]:
+        keys = {(row["sender_id"], row["client_id"]) for row in rows if row["client_id"] is not None}
+        if not keys:
+            return {}
+        found = await conn.execute(
+            select(Message.sender_id, Message.client_id, Message.id, Message.timestamp)
+            .where(tuple_(Message.sender_id, Message.client_id).in_(list(keys)))
+        )
+        return {(sender_id, client_id): StoredMessage(message_id, timestamp, False)
+                for sender_id, client_id, message_id, timestamp in found}
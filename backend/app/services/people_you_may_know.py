@@ -0,0 +1,319 @@
+import asyncio
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Set, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from app.models.connection import Connection, ConnectionStatus
+from app.models.profile import Profile
+from app.services.connection_graph import ConnectionGraph, adjacency
+
+logger = logging.getLogger("app.networking")
+
+# "People you may know": friends of friends, ranked by how many
+# connections they share with the user, with a bonus for the same
+# department and a nearby graduation year.
+
+MUTUAL_WEIGHT = 1.0
+DEPARTMENT_WEIGHT = 2.0
+# Full bonus for the same year, fading to none YEAR_WINDOW years apart
+YEAR_WEIGHT = 1.0
+YEAR_WINDOW = 3
+# Users whose friends-of-friends are ranked per sparse product
+BLOCK_ROWS = 2048
+EDGE_CHUNK = 100_000
+# How often a worker waiting on another's build checks whether it's done
+LOCK_POLL_SECONDS = 1.0
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def scores(mutuals: np.ndarray, departments: np.ndarray, years: np.ndarray,
+           user_departments, user_years) -> np.ndarray:
+    """Candidate scores; department code 0 and year 0 mean unknown."""
+    same_department = (departments == user_departments) & (departments != 0)
+    known_years = (years != 0) & (user_years != 0)
+    closeness = np.maximum(0, 1 - np.abs(years - user_years) / YEAR_WINDOW) * known_years
+    return MUTUAL_WEIGHT * mutuals + DEPARTMENT_WEIGHT * same_department + YEAR_WEIGHT * closeness
+
+class Snapshot(NamedTuple):
+    user_ids: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    departments: np.ndarray
+    years: np.ndarray
+    # Per user index, best first, -1 padded
+    candidates: np.ndarray
+    mutuals: np.ndarray
+
+def build_snapshot(engine, top_k: int) -> Snapshot:
+    """Load accepted connections and profiles and rank everyone's candidates."""
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=EDGE_CHUNK).execute(
+            select(Connection.requester_id, Connection.recipient_id)
+            .where(Connection.status == ConnectionStatus.ACCEPTED)
+        )
+        edges = np.concatenate([np.zeros(0, dtype=np.int32)] + [
+            np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int32, count=2 * len(rows))
+            for rows in result.partitions()
+        ]).reshape(-1, 2)
+        profiles = conn.execute(select(Profile.user_id, Profile.department, Profile.graduation_year)).all()
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    profile_ids = np.array([profile.user_id for profile in profiles], dtype=np.int32)
+    user_ids = np.unique(np.concatenate([edges.ravel(), profile_ids]))
+    n = len(user_ids)
+
+    department_codes: Dict[str, int] = {}
+    departments = np.zeros(n, dtype=np.int32)
+    years = np.zeros(n, dtype=np.int32)
+    positions = np.searchsorted(user_ids, profile_ids)
+    departments[positions] = [
+        department_codes.setdefault(profile.department, len(department_codes) + 1) if profile.department else 0
+        for profile in profiles
+    ]
+    years[positions] = [profile.graduation_year or 0 for profile in profiles]
+    del profiles
+
+    a, b = np.searchsorted(user_ids, edges[:, 0]), np.searchsorted(user_ids, edges[:, 1])
+    del edges
+    graph = adjacency(n, a, b)
+    del a, b
+
+    candidates = np.full((n, top_k), -1, dtype=np.int32)
+    mutuals = np.zeros((n, top_k), dtype=np.int16)
+    for start in range(0, n, BLOCK_ROWS):
+        block = graph[start:start + BLOCK_ROWS]
+        # Paths of length two, less the users already connected
+        paths = block @ graph
+        paths = paths - paths.multiply(block)
+        paths.eliminate_zeros()
+        rows = np.repeat(np.arange(start, start + block.shape[0]), np.diff(paths.indptr))
+        ranked = scores(paths.data, departments[paths.indices], years[paths.indices], departments[rows], years[rows])
+        ranked[paths.indices == rows] = -np.inf
+        for row in range(block.shape[0]):
+            lo, hi = paths.indptr[row], paths.indptr[row + 1]
+            row_scores = ranked[lo:hi]
+            top = np.argpartition(row_scores, -top_k)[-top_k:] if hi - lo > top_k else np.arange(hi - lo)
+            top = top[np.argsort(-row_scores[top])]
+            top = top[row_scores[top] > -np.inf]
+            candidates[start + row, :len(top)] = paths.indices[lo:hi][top]
+            mutuals[start + row, :len(top)] = np.minimum(paths.data[lo:hi][top], np.iinfo(np.int16).max)
+    return Snapshot(user_ids, graph.indptr, graph.indices, departments, years, candidates, mutuals)
+
+class PeopleYouMayKnow:
+    """
+    Precomputed friend-of-friend suggestions. Every `rebuild_interval`
+    seconds a subprocess ranks the top `top_k` for every user from a
+    fresh read of the connections table; building takes minutes and
+    gigabytes at millions of connections and runs at low priority, off
+    the event loop.
+
+    Workers on one host share the build: the snapshot is saved in
+    `snapshot_dir`, and whichever worker finds it older than
+    `rebuild_interval` builds it under a file lock while the others wait
+    for it and load the result. A snapshot can be up to two intervals
+    old by the time a worker loads it.
+
+    Connections accepted on this worker in between are added to the
+    graph at once: the two users and everyone connected to either have
+    their suggestions recomputed from the graph on their next request.
+    Those accepted after a snapshot started reading the table are
+    replayed onto it when it's loaded. Other workers pass theirs on the
+    same way (networking.share_accepted), over the chat backplane.
+    """
+    def __init__(self, rebuild_interval: float, top_k: int, snapshot_dir: str):
+        self.rebuild_interval = rebuild_interval
+        self.top_k = top_k
+        self.snapshot_dir = snapshot_dir
+        self.graph = ConnectionGraph()
+        self.departments = np.zeros(0, dtype=np.int32)
+        self.years = np.zeros(0, dtype=np.int32)
+        self.candidates = np.zeros((0, top_k), dtype=np.int32)
+        self.mutuals = np.zeros((0, top_k), dtype=np.int16)
+        self.built = False
+        self._stale: Set[int] = set()
+        self._live: Dict[int, List[Tuple[int, int]]] = {}
+        # (time, a, b) accepted on this worker since the loaded snapshot
+        # started reading the table, replayed onto the next one
+        self._accepted: List[Tuple[float, int, int]] = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Failed to rebuild people you may know")
+            await asyncio.sleep(self.rebuild_interval)
+
+    async def rebuild(self):
+        snapshot, started_at = await self._shared_snapshot()
+        self.load(snapshot)
+        self._accepted = [accepted for accepted in self._accepted if accepted[0] >= started_at]
+        self._apply([(a, b) for _, a, b in self._accepted])
+        logger.info("People you may know rebuilt: %d users, %d connections",
+                    len(self.graph.user_ids), self.graph.edge_count())
+
+    async def _shared_snapshot(self) -> Tuple[Snapshot, float]:
+        """The saved snapshot, built first if it's stale and no other worker is building it."""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, f"snapshot-{self.top_k}.npz")
+        with open(os.path.join(self.snapshot_dir, "build.lock"), "w") as lock:
+            while not self._fresh(path):
+                if not _try_lock(lock):
+                    await asyncio.sleep(LOCK_POLL_SECONDS)
+                    continue
+                try:
+                    # Another worker may have finished one since we looked
+                    if not self._fresh(path):
+                        await self._build_in_subprocess(path)
+                finally:
+                    _unlock(lock)
+                break
+        return await run_in_threadpool(_load_snapshot, path)
+
+    def _fresh(self, path: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(path) < self.rebuild_interval
+        except FileNotFoundError:
+            return False
+
+    async def _build_in_subprocess(self, path: str):
+        fd, building = tempfile.mkstemp(suffix=".npz", dir=self.snapshot_dir)
+        os.close(fd)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "app.services.people_you_may_know", building, str(self.top_k), cwd=BACKEND_DIR,
+            )
+            try:
+                returncode = await process.wait()
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+            if returncode != 0:
+                raise RuntimeError(f"snapshot build exited with {returncode}")
+            os.replace(building, path)
+        finally:
+            if os.path.exists(building):
+                os.unlink(building)
+
+    def load(self, snapshot: Snapshot):
+        self.graph = ConnectionGraph(snapshot.user_ids, snapshot.indptr, snapshot.indices)
+        self.departments, self.years = snapshot.departments, snapshot.years
+        self.candidates, self.mutuals = snapshot.candidates, snapshot.mutuals
+        self._stale.clear()
+        self._live.clear()
+        self.built = True
+
+    def connect(self, a: int, b: int):
+        """Apply a connection accepted on this worker."""
+        self.connect_many([(a, b)])
+
+    def connect_many(self, pairs: List[Tuple[int, int]]):
+        """Apply several at once, reading everyone's connections in one pass."""
+        if not pairs:
+            return
+        accepted_at = time.time()
+        self._accepted.extend((accepted_at, a, b) for a, b in pairs)
+        self._apply(pairs)
+
+    def _apply(self, pairs: List[Tuple[int, int]]):
+        if not pairs:
+            return
+        users = np.unique(np.array(pairs))
+        neighbors, _ = self.graph.adjacent(users)
+        for a, b in pairs:
+            self.graph.connect(a, b)
+        affected = set(users.tolist())
+        affected.update(neighbors.tolist())
+        self._stale.update(affected)
+        for user_id in affected:
+            self._live.pop(user_id, None)
+
+    def suggest(self, user_id: int) -> List[Tuple[int, int]]:
+        """Up to top_k (user id, mutual connections), best first."""
+        live = self._live.get(user_id)
+        if live is not None:
+            return live
+        i = int(self.graph.index(np.array([user_id]))[0])
+        if i < 0 or user_id in self._stale:
+            live = self._live[user_id] = self._rank(user_id)
+            return live
+        found = self.candidates[i] >= 0
+        return list(zip(self.graph.user_ids[self.candidates[i][found]].tolist(), self.mutuals[i][found].tolist()))
+
+    def _rank(self, user_id: int) -> List[Tuple[int, int]]:
+        friends = self.graph.neighbors(user_id)
+        if not len(friends):
+            return []
+        paths = np.concatenate([self.graph.neighbors(friend) for friend in friends.tolist()])
+        ids, mutuals = np.unique(paths, return_counts=True)
+        keep = (ids != user_id) & ~np.isin(ids, friends)
+        ids, mutuals = ids[keep], mutuals[keep]
+        department, year = self._features(np.array([user_id]))
+        ranked = scores(mutuals, *self._features(ids), department[0], year[0])
+        top = np.argsort(-ranked, kind="stable")[:self.top_k]
+        return list(zip(ids[top].tolist(), mutuals[top].tolist()))
+
+    def _features(self, user_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        indices = self.graph.index(user_ids)
+        known = indices >= 0
+        departments = np.zeros(len(user_ids), dtype=np.int32)
+        years = np.zeros(len(user_ids), dtype=np.int32)
+        departments[known] = self.departments[indices[known]]
+        years[known] = self.years[indices[known]]
+        return departments, years
+
+# The build lock is released by the OS if its holder dies. fcntl is Unix
+# only and msvcrt Windows only, so each is imported where it's used
+def _try_lock(lock) -> bool:
+    if os.name == "nt":
+        import msvcrt
+        try:
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+    import fcntl
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+def _unlock(lock):
+    if os.name == "nt":
+        import msvcrt
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _load_snapshot(path: str) -> Tuple[Snapshot, float]:
+    """The snapshot and when its build started reading the tables."""
+    with np.load(path) as arrays:
+        return Snapshot(**{field: arrays[field] for field in Snapshot._fields}), float(arrays["started_at"])
+
+if __name__ == "__main__":
+    # Run by PeopleYouMayKnow: build and save a snapshot without holding
+    # up the web worker
+    from app.db.session import engine
+    if hasattr(os, "nice"):
+        os.nice(10)
+    path, top_k = sys.argv[1], int(sys.argv[2])
+    started_at = time.time()
+    np.savez(path, started_at=started_at, **build_snapshot(engine, top_k)._asdict())
@@ -0,0 +1,215 @@
+import asyncio
+import bisect
+import heapq
+import re
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.models.job import Job
+
+# Autocomplete over people's names, departments and skills and over job
+# companies and titles. A suggestion is a distinct value of one kind,
+# weighted by how many profiles or jobs carry it, and it completes any
+# prefix of any of its words: "sci" suggests "Computer Science".
+
+KINDS = ("name", "department", "skill", "company", "title")
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+# Prefixes matching more keys than this keep their best suggestions cached
+SCAN_LIMIT = 256
+# Suggestions kept per kind for a cached prefix, so the largest `limit`
+CACHE_DEPTH = 20
+# Jobs are re-read this far behind the newest one seen, for inserts that
+# committed out of order
+JOB_OVERLAP = timedelta(seconds=60)
+JOB_CHUNK = 1000
+
+_SPACE = re.compile(r"\s+")
+_WORD_START = re.compile(r"\b\w")
+
+def normalize(text: str) -> str:
+    return _SPACE.sub(" ", text.strip()).lower()
+
+def profile_suggestions(profile) -> List[Tuple[str, str]]:
+    suggestions = [("name", profile.full_name), ("department", profile.department)]
+    suggestions += [("skill", skill) for skill in (profile.skills or "").split(",")]
+    return suggestions
+
+def job_suggestions(job) -> List[Tuple[str, str]]:
+    return [("company", job.company), ("title", job.title)]
+
+class Suggestion(NamedTuple):
+    kind: str
+    text: str
+    count: int
+
+class Typeahead:
+    """
+    Prefix index over suggestions. Each suggestion has one key per word it
+    contains (its text from that word on), and the keys are kept in one
+    sorted list, so the suggestions completing a prefix are a bisected
+    range. Ranges too wide to rank per keystroke have their top
+    suggestions cached; count changes update those lists in place, except
+    when a cached suggestion loses count, which drops the prefix's list.
+
+    Profiles and jobs are added as records, the suggestions one row
+    contributes; adding a row's new record in place of its old one moves
+    the counts. Old records stay until `compact` drops them.
+    """
+    def __init__(self):
+        self.texts: List[str] = []
+        self.kinds = array("b")
+        self.counts = array("i")
+        self.entries: List[Dict[str, int]] = [{} for _ in KINDS]  # per kind, normalized text -> entry
+        self.keys: List[str] = []  # sorted once built
+        self.key_entries = array("i")  # entry of each key
+        self.record_starts = array("i", [0])
+        self.record_entries = array("i")
+        self.job_records: Dict[int, int] = {}
+        self.jobs_synced_at = datetime.min
+        self._cache: Dict[str, List[List[int]]] = {}  # prefix -> best entries first, per kind
+        self._cached_length = 0
+
+    def suggestion_count(self) -> int:
+        return len(self.texts)
+
+    def add(self, suggestions: Iterable[Tuple[str, Optional[str]]], replaces: Optional[int] = None,
+            building: bool = False) -> int:
+        """Add a row's suggestions, moving counts from its old record; returns the new record."""
+        entries = list(dict.fromkeys(
+            self._entry(_KIND_CODES[kind], text, building)
+            for kind, text in suggestions if text and text.strip()
+        ))
+        old = self._record(replaces) if replaces is not None else []
+        for entry in old:
+            if entry not in entries:
+                self._count(entry, -1, building)
+        for entry in entries:
+            if entry not in old:
+                self._count(entry, 1, building)
+        record = len(self.record_starts) - 1
+        self.record_entries.extend(entries)
+        self.record_starts.append(len(self.record_entries))
+        return record
+
+    def compact(self, records: List[int]) -> List[int]:
+        """Keep only `records` and the jobs' records; returns their new numbers."""
+        starts, entries = array("i", [0]), array("i")
+
+        def move(record: int) -> int:
+            entries.extend(self.record_entries[self.record_starts[record]:self.record_starts[record + 1]])
+            starts.append(len(entries))
+            return len(starts) - 2
+
+        moved = [move(record) for record in records]
+        self.job_records = {job_id: move(record) for job_id, record in self.job_records.items()}
+        self.record_starts, self.record_entries = starts, entries
+        return moved
+
+    def finish_build(self):
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.keys = [self.keys[i] for i in order]
+        self.key_entries = array("i", (self.key_entries[i] for i in order))
+
+    async def warm(self):
+        """Cache the one-letter prefixes, the widest ranges there are."""
+        for letter in sorted({key[0] for key in self.keys}):
+            self.complete(letter, KINDS, CACHE_DEPTH)
+            await asyncio.sleep(0)
+
+    async def load_jobs(self, conn: AsyncConnection, building: bool = False):
+        """Add jobs posted since the last load."""
+        since = self.jobs_synced_at - JOB_OVERLAP if self.jobs_synced_at > datetime.min else self.jobs_synced_at
+        result = await conn.stream(
+            select(Job.id, Job.company, Job.title, Job.created_at)
+            .where(Job.created_at >= since)
+            .execution_options(yield_per=JOB_CHUNK)
+        )
+        async for jobs in result.partitions(JOB_CHUNK):
+            for job in jobs:
+                if job.id not in self.job_records:
+                    self.job_records[job.id] = self.add(job_suggestions(job), building=building)
+                if job.created_at is not None and job.created_at > self.jobs_synced_at:
+                    self.jobs_synced_at = job.created_at
+            await asyncio.sleep(0)
+
+    def complete(self, prefix: str, kinds: Sequence[str] = KINDS, limit: int = 10) -> List[Suggestion]:
+        """The most common suggestions of `kinds` with a word starting with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        best = self._cache.get(prefix)
+        if best is None:
+            start = bisect.bisect_left(self.keys, prefix)
+            end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+            best = self._best(start, end)
+            if end - start > SCAN_LIMIT:
+                self._cache[prefix] = best
+                self._cached_length = max(self._cached_length, len(prefix))
+        entries = sorted((entry for kind in kinds for entry in best[_KIND_CODES[kind]]), key=self._rank)
+        return [Suggestion(KINDS[self.kinds[entry]], self.texts[entry], self.counts[entry]) for entry in entries[:limit]]
+
+    def _rank(self, entry: int):
+        return -self.counts[entry], self.texts[entry]
+
+    def _best(self, start: int, end: int) -> List[List[int]]:
+        candidates = [set() for _ in KINDS]
+        for entry in self.key_entries[start:end]:
+            if self.counts[entry] > 0:
+                candidates[self.kinds[entry]].add(entry)
+        return [heapq.nsmallest(CACHE_DEPTH, entries, key=self._rank) for entries in candidates]
+
+    def _record(self, record: int) -> List[int]:
+        return self.record_entries[self.record_starts[record]:self.record_starts[record + 1]].tolist()
+
+    def _entry(self, kind: int, text: str, building: bool) -> int:
+        normalized = normalize(text)
+        entry = self.entries[kind].get(normalized)
+        if entry is not None:
+            return entry
+        entry = self.entries[kind][normalized] = len(self.texts)
+        self.texts.append(text.strip())
+        self.kinds.append(kind)
+        self.counts.append(0)
+        for word in _WORD_START.finditer(normalized):
+            key = normalized[word.start():]
+            if building:
+                self.keys.append(key)
+                self.key_entries.append(entry)
+            else:
+                position = bisect.bisect_right(self.keys, key)
+                self.keys.insert(position, key)
+                self.key_entries.insert(position, entry)
+        return entry
+
+    def _count(self, entry: int, delta: int, building: bool):
+        self.counts[entry] += delta
+        if building or not self._cache:
+            return
+        kind = self.kinds[entry]
+        for prefix in self._cached_prefixes(entry):
+            best = self._cache[prefix][kind]
+            if delta > 0:
+                # Complete lists hold every suggestion in range, so anything
+                # rising joins them; full ones only take it if it now beats the last
+                if entry not in best and (len(best) < CACHE_DEPTH or self._rank(entry) < self._rank(best[-1])):
+                    best.append(entry)
+                best.sort(key=self._rank)
+                del best[CACHE_DEPTH:]
+            elif entry in best:
+                if len(best) < CACHE_DEPTH:
+                    if self.counts[entry] <= 0:
+                        best.remove(entry)
+                    best.sort(key=self._rank)
+                else:
+                    # What should replace it is unknown
+                    del self._cache[prefix]
+
+    def _cached_prefixes(self, entry: int) -> List[str]:
+        normalized = normalize(self.texts[entry])
+        prefixes = set()
+        for word in _WORD_START.finditer(normalized):
+            key = normalized[word.start():word.start() + self._cached_length]
+            prefixes.update(key[:end] for end in range(1, len(key) + 1))
+        return [prefix for prefix in prefixes if prefix in self._cache]
@@ -0,0 +1,102 @@
+import requests
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = "http://127.0.0.1:8000"
+
+# Login throughput vs. /jobs latency while a login storm is running.
+# Run against the server with different PASSWORD_HASH_WORKERS values
+# (e.g. 1, 2, 4, 8) to see login throughput scale with cores.
+
+EMAIL = "bench_auth@example.com"
+PASSWORD = "Password123!"
+
+def get_token():
+    login_data = {"username": EMAIL, "password": PASSWORD}
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+
+    register_data = {"email": EMAIL, "password": PASSWORD, "full_name": "Bench Auth", "role": "alumni"}
+    requests.post(f"{BASE_URL}/api/v1/auth/register", json=register_data)
+
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+    return None
+
+def login_storm(concurrency, duration, results):
+    login_data = {"username": EMAIL, "password": PASSWORD}
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        ok = busy = 0
+        while time.perf_counter() < deadline:
+            r = session.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+            if r.status_code == 200:
+                ok += 1
+            elif r.status_code == 503:
+                busy += 1
+        return ok, busy
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda _: worker(), range(concurrency)))
+    results["ok"] = sum(o for o, _ in outcomes)
+    results["busy"] = sum(b for _, b in outcomes)
+
+def probe_jobs(headers, stop, samples):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        session.get(f"{BASE_URL}/api/v1/jobs/", headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.05)
+
+def report(label, samples):
+    if not samples:
+        print(f"{label}: no samples")
+        return
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label}: median {statistics.median(samples):.1f}ms, p99 {p99:.1f}ms ({len(samples)} requests)")
+
+def bench_auth(concurrency=32, duration=10):
+    print("\n--- Benchmarking Login Throughput ---")
+    token = get_token()
+    if not token:
+        print("Failed to get token.")
+        return
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Baseline /jobs latency on an idle server
+    idle_samples = []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe_jobs, args=(headers, stop, idle_samples))
+    prober.start()
+    time.sleep(3)
+    stop.set()
+    prober.join()
+    report("/jobs idle", idle_samples)
+
+    # /jobs latency during a login storm
+    storm_samples = []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe_jobs, args=(headers, stop, storm_samples))
+    prober.start()
+    results = {}
+    login_storm(concurrency, duration, results)
+    stop.set()
+    prober.join()
+
+    print(f"Logins: {results['ok']} ok, {results['busy']} rejected with 503 in {duration}s "
+          f"({results['ok'] / duration:.1f} logins/s, concurrency {concurrency})")
+    report("/jobs during login storm", storm_samples)
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    bench_auth(concurrency, duration)
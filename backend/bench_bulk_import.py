@@ -0,0 +1,54 @@
+import io
+import requests
+import sys
+import time
+import uuid
+from sqlalchemy import insert, select
+from app.core.security import create_access_token
+from app.db.session import engine
+from app.models.user import User
+
+BASE_URL = "http://127.0.0.1:8000"
+
+def get_admin_token(email, name):
+    # Admins can't self-register, so make (or find) one in the database
+    with engine.begin() as conn:
+        admin_id = conn.scalar(select(User.id).where(User.email == email))
+        if admin_id is None:
+            admin_id = conn.scalar(insert(User).returning(User.id).values(
+                email=email, hashed_password="x", full_name=name, role="admin", is_active=True,
+            ))
+    return create_access_token(admin_id)
+
+def build_csv(count):
+    run = uuid.uuid4().hex[:8]
+    departments = ["Computer Science", "Mechanical", "Electrical", "Civil", "Business"]
+    buffer = io.StringIO()
+    buffer.write("email,password,full_name,role,graduation_year,department\n")
+    for i in range(count):
+        buffer.write(f"import_{run}_{i}@example.com,Password123!,Alumnus {i},alumni,{2000 + i % 25},{departments[i % 5]}\n")
+    return buffer.getvalue().encode()
+
+def bench_bulk_import(count=100000):
+    print(f"\n--- Benchmarking Bulk Import of {count} users ---")
+    token = get_admin_token("bulk_admin@example.com", "Bulk Admin")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    payload = build_csv(count)
+    start = time.perf_counter()
+    r = requests.post(
+        f"{BASE_URL}/api/v1/admin/users/import",
+        headers=headers,
+        files={"file": ("alumni.csv", payload, "text/csv")},
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Status: {r.status_code}")
+    if r.status_code == 200:
+        result = r.json()
+        print(f"Created {result['created']}, failed {result['failed']} in {elapsed:.1f}s "
+              f"({result['created'] / elapsed:.0f} users/s)")
+    else:
+        print(r.text)
+
+if __name__ == "__main__":
+    bench_bulk_import(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import requests
+import websockets
+from jose import jwt
+
+# Cross-worker chat delivery. Starts N separate uvicorn processes (as if
+# they were N containers) against the same PostgreSQL DATABASE_URL, puts
+# each receiver on a different worker from its sender, and checks every
+# message arrives while measuring delivered messages/sec.
+#
+#   python bench_chat_backplane.py [workers=1,2,4] [pairs=50] [messages=200]
+
+WORKER_COUNTS = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else "1,2,4").split(",")]
+PAIRS = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+MESSAGES = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+FIRST_PORT = 8100
+
+def base_url(port):
+    return f"http://127.0.0.1:{port}"
+
+def start_workers(count):
+    env = dict(os.environ, CHAT_BACKPLANE="postgres")
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(FIRST_PORT + i), "--log-level", "warning"],
+            env=env,
+        )
+        for i in range(count)
+    ]
+    for i in range(count):
+        for _ in range(100):
+            try:
+                if requests.get(f"{base_url(FIRST_PORT + i)}/health/live").status_code == 200:
+                    break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+    return workers
+
+def get_token(port, email, password, name):
+    login_data = {"username": email, "password": password}
+    r = requests.post(f"{base_url(port)}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+
+    register_data = {"email": email, "password": password, "full_name": name, "role": "alumni"}
+    requests.post(f"{base_url(port)}/api/v1/auth/register", json=register_data)
+
+    r = requests.post(f"{base_url(port)}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+    return None
+
+def ws_url(port, token):
+    user_id = jwt.get_unverified_claims(token)["sub"]
+    return f"ws://127.0.0.1:{port}/api/v1/chat/ws/{user_id}?token={token}"
+
+async def receive(socket, expected, received):
+    while received[0] < expected:
+        await socket.recv()
+        received[0] += 1
+
+async def run(workers, tokens):
+    ports = [FIRST_PORT + i for i in range(workers)]
+    receivers, senders, counters = [], [], []
+    for i, (sender_token, receiver_token) in enumerate(tokens):
+        # With more than one worker, never put a pair on the same worker
+        receivers.append(await websockets.connect(ws_url(ports[i % workers], receiver_token)))
+        senders.append(await websockets.connect(ws_url(ports[(i + 1) % workers], sender_token)))
+        counters.append([0])
+    await asyncio.sleep(0.5)  # let LISTEN registrations settle
+
+    async def send(socket, recipient_id):
+        for n in range(MESSAGES):
+            await socket.send(f"{recipient_id}:message {n}")
+
+    start = time.perf_counter()
+    receiving = [asyncio.create_task(receive(r, MESSAGES, c)) for r, c in zip(receivers, counters)]
+    await asyncio.gather(*(
+        send(s, jwt.get_unverified_claims(receiver_token)["sub"])
+        for s, (_, receiver_token) in zip(senders, tokens)
+    ))
+    done, pending = await asyncio.wait(receiving, timeout=30)
+    elapsed = time.perf_counter() - start
+    for task in pending:
+        task.cancel()
+    for socket in receivers + senders:
+        await socket.close()
+    delivered = sum(c[0] for c in counters)
+    return delivered, elapsed
+
+def bench_chat_backplane():
+    print(f"\n--- Benchmarking cross-worker chat delivery ({PAIRS} pairs x {MESSAGES} messages) ---")
+    for count in WORKER_COUNTS:
+        workers = start_workers(count)
+        try:
+            tokens = [
+                (get_token(FIRST_PORT, f"bp_sender{i}@example.com", "Password123!", f"Sender {i}"),
+                 get_token(FIRST_PORT, f"bp_receiver{i}@example.com", "Password123!", f"Receiver {i}"))
+                for i in range(PAIRS)
+            ]
+            delivered, elapsed = asyncio.run(run(count, tokens))
+            expected = PAIRS * MESSAGES
+            print(f"{count} worker(s): delivered {delivered}/{expected} in {elapsed:.2f}s "
+                  f"({delivered / elapsed:.0f} msg/s), lost {expected - delivered}")
+        finally:
+            for worker in workers:
+                worker.terminate()
+                worker.wait()
+
+if __name__ == "__main__":
+    bench_chat_backplane()
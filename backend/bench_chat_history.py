@@ -0,0 +1,61 @@
+import statistics
+import sys
+import time
+from sqlalchemy import text
+from app.api.endpoints.chat import _history_page_query
+from app.db.session import engine
+
+# Opening a chat before and after keyset pagination, on one conversation
+# grown to 10k/100k/1M messages. Seeds a SCRATCH PostgreSQL database
+# (DATABASE_URL, migrated with `alembic upgrade head`); do not point this
+# at a database whose data you care about.
+
+SIZES = [int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+PAGE = 50
+RUNS = 5
+
+LEGACY = text("""SELECT * FROM messages
+    WHERE (sender_id = :a AND recipient_id = :b) OR (sender_id = :b AND recipient_id = :a)
+    ORDER BY timestamp""")
+
+def seed_users(conn):
+    ids = conn.execute(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+        VALUES ('chat_bench_a@example.com', 'x', 'A', 'alumni', true),
+               ('chat_bench_b@example.com', 'x', 'B', 'alumni', true)
+        RETURNING id""")).scalars().all()
+    return ids[0], ids[1]
+
+def grow(conn, a, b, have, want):
+    conn.execute(text("""INSERT INTO messages (sender_id, recipient_id, content, timestamp, is_read)
+        SELECT CASE WHEN i % 2 = 0 THEN :a ELSE :b END, CASE WHEN i % 2 = 0 THEN :b ELSE :a END,
+               'message ' || i, now() - ((:want - i) || ' seconds')::interval, false
+        FROM generate_series(:have + 1, :want) i"""), {"a": a, "b": b, "have": have, "want": want})
+    conn.execute(text("ANALYZE messages"))
+
+def timed(conn, statement, params=None):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        rows = conn.execute(statement, params or {}).all()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, len(rows)
+
+def bench_chat_history():
+    print(f"\n--- Benchmarking chat history (page size {PAGE}) ---")
+    with engine.begin() as conn:
+        a, b = seed_users(conn)
+    have = 0
+    for size in SIZES:
+        with engine.begin() as conn:
+            grow(conn, a, b, have, size)
+        have = size
+        with engine.connect() as conn:
+            middle = conn.scalar(text("SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY id) FROM messages WHERE sender_id IN (:a, :b)"), {"a": a, "b": b})
+            legacy_ms, legacy_rows = timed(conn, LEGACY, {"a": a, "b": b})
+            first_ms, _ = timed(conn, _history_page_query(a, b, PAGE, None, None))
+            deep_ms, _ = timed(conn, _history_page_query(a, b, PAGE, middle, None))
+        print(f"{size:>9} messages: full history {legacy_ms:8.1f}ms ({legacy_rows} rows) | "
+              f"first page {first_ms:.2f}ms | page from the middle {deep_ms:.2f}ms")
+
+if __name__ == "__main__":
+    bench_chat_history()
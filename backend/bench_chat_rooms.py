@@ -0,0 +1,134 @@
+import asyncio
+import time
+from datetime import datetime
+from sqlalchemy import text
+from app.api.endpoints.chat import ConnectionManager, _member_room_ids
+from app.core.config import settings
+from app.db.session import async_engine
+from app.services.chat_backplane import InMemoryBackplane
+from app.services.chat_protocol import room_message_event
+from app.services.message_writer import MessageWriter
+
+# Posting to a 5,000-member room. Storage: one room post versus the
+# per-recipient direct messages a one-to-one-only chat needed. Delivery:
+# the ConnectionManager's room index with 1%, 10% and 100% of the members
+# online on fake sockets, to show the cost follows the online members.
+# Run against a SCRATCH database (DATABASE_URL, migrated with
+# `alembic upgrade head`).
+
+MEMBERS = 5_000
+POSTS = 20
+ONLINE_FRACTIONS = [0.01, 0.1, 1.0]
+
+class FakeSocket:
+    def __init__(self):
+        self.received = 0
+        self.done = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.received += 1
+        if self.done is not None and self.received == POSTS:
+            self.done()
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def seed_room():
+    async with async_engine.begin() as conn:
+        existing = (await conn.execute(text(
+            "SELECT count(*) FROM users WHERE email LIKE 'room_bench_%'"
+        ))).scalar()
+        if existing < MEMBERS:
+            await conn.execute(
+                text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+                        VALUES (:email, 'x', :email, 'alumni', true)"""),
+                [{"email": f"room_bench_{i}@example.com"} for i in range(existing, MEMBERS)],
+            )
+        user_ids = (await conn.execute(text(
+            "SELECT id FROM users WHERE email LIKE 'room_bench_%' ORDER BY id"
+        ))).scalars().all()[:MEMBERS]
+        room_id = (await conn.execute(text(
+            "INSERT INTO rooms (name, created_by, created_at) VALUES ('Class of 2015', :owner, :now) RETURNING id"
+        ), {"owner": user_ids[0], "now": datetime.utcnow()})).scalar()
+        await conn.execute(
+            text("INSERT INTO room_members (room_id, user_id, role, joined_at) VALUES (:room_id, :user_id, 'member', :now)"),
+            [{"room_id": room_id, "user_id": user_id, "now": datetime.utcnow()} for user_id in user_ids],
+        )
+    return room_id, user_ids
+
+async def bench_storage(room_id, user_ids):
+    writer = MessageWriter(
+        async_engine,
+        batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+        interval=settings.CHAT_WRITE_INTERVAL_MS / 1000,
+        max_queue=settings.CHAT_WRITE_MAX_QUEUE,
+    )
+    writer.start()
+    sender, recipients = user_ids[0], user_ids[1:]
+
+    start = time.perf_counter()
+    for _ in range(POSTS):
+        await writer.write(sender, None, "hello class", room_id=room_id)
+    room = (time.perf_counter() - start) / POSTS
+
+    start = time.perf_counter()
+    for _ in range(2):
+        stored = [await writer.enqueue(sender, recipient, "hello class") for recipient in recipients]
+        await asyncio.gather(*stored)
+    per_recipient = (time.perf_counter() - start) / 2
+    await writer.stop()
+    print(f"store one post: room {room * 1000:.2f}ms (1 row) | "
+          f"one message per recipient {per_recipient * 1000:.0f}ms ({len(recipients)} rows)")
+
+async def bench_fan_out(room_id, user_ids):
+    for fraction in ONLINE_FRACTIONS:
+        manager = ConnectionManager(
+            InMemoryBackplane(), queue_size=POSTS * 2, queue_policy="drop_oldest", room_loader=_member_room_ids
+        )
+        await manager.start()
+        online = user_ids[:max(1, int(len(user_ids) * fraction))]
+        sockets = [FakeSocket() for _ in online]
+        for user_id, socket in zip(online, sockets):
+            await manager.connect(socket, user_id)
+
+        remaining = [len(sockets)]
+        all_received = asyncio.get_running_loop().create_future()
+
+        def done():
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                all_received.set_result(None)
+
+        for socket in sockets:
+            socket.done = done
+        start = time.perf_counter()
+        enqueue_time = 0.0
+        for n in range(POSTS):
+            event = room_message_event(n, room_id, online[0], "hello class", datetime.utcnow())
+            posted = time.perf_counter()
+            await manager.send_room_event(event, room_id)
+            enqueue_time += time.perf_counter() - posted
+        await all_received
+        elapsed = time.perf_counter() - start
+        print(f"{len(online):>5}/{len(user_ids)} online: fan-out {enqueue_time / POSTS * 1e6:8.0f}us per post "
+              f"({enqueue_time / POSTS / len(online) * 1e6:.2f}us per online member), "
+              f"all sockets written in {elapsed / POSTS * 1000:.2f}ms per post")
+        for user_id, socket in zip(online, sockets):
+            await manager.disconnect(socket, user_id)
+        await manager.stop()
+
+async def run():
+    room_id, user_ids = await seed_room()
+    await bench_storage(room_id, user_ids)
+    await bench_fan_out(room_id, user_ids)
+    await async_engine.dispose()
+
+def bench_chat_rooms():
+    print(f"\n--- Benchmarking a {MEMBERS}-member room ({POSTS} posts) ---")
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    bench_chat_rooms()
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import psutil
+import requests
+import websockets
+from sqlalchemy import text
+from app.core.security import create_access_token
+from app.db.session import engine
+
+# How many chat sockets one worker holds, and what it delivers while
+# holding them. Starts a single uvicorn worker against DATABASE_URL
+# (a SCRATCH database, migrated with `alembic upgrade head`), opens
+# CONNECTIONS authenticated sockets, reports the worker's memory per
+# socket, then has PAIRS of them exchange messages at increasing rates
+# while the rest stay connected, reporting p99 delivery latency and the
+# highest rate delivered within the SLO.
+#
+#   python bench_chat_sockets.py [connections=10000] [pairs=500]
+#
+# The load generator shares the machine with the worker, so on a small
+# box the rates it finds are a lower bound.
+
+CONNECTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+PAIRS = min(int(sys.argv[2]) if len(sys.argv) > 2 else 500, CONNECTIONS // 2)
+RATES = [250, 500, 1_000, 2_000, 4_000, 8_000, 16_000]
+STEP_SECONDS = 5
+P99_SLO_MS = 250
+MIN_DELIVERED = 0.999
+CONNECT_CONCURRENCY = 200
+PORT = 8200
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard < CONNECTIONS * 2 + 100:
+        print(f"warning: open file limit {hard} is too low for {CONNECTIONS} sockets on both ends")
+
+def seed_users(count):
+    """Bench users straight into the database: registering 10k through the API would time bcrypt."""
+    emails = [f"socket_bench_{i}@example.com" for i in range(count)]
+    with engine.begin() as conn:
+        existing = set(conn.execute(text("SELECT email FROM users WHERE email LIKE 'socket_bench_%'")).scalars())
+        missing = [{"email": email, "name": email.split("@")[0]} for email in emails if email not in existing]
+        if missing:
+            conn.execute(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+                VALUES (:email, 'x', :name, 'alumni', true)"""), missing)
+        ids = dict(conn.execute(text("SELECT email, id FROM users WHERE email LIKE 'socket_bench_%'")).all())
+    return [ids[email] for email in emails]
+
+def start_worker():
+    env = dict(os.environ, CHAT_BACKPLANE="memory")
+    # Same WebSocket options as the Dockerfile
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning",
+         "--backlog", "4096", "--ws-per-message-deflate", "false"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if requests.get(f"{BASE_URL}/health/live").status_code == 200:
+                break
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    return worker
+
+class Client:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.socket = None
+        self.latencies = []
+
+    async def connect(self, limit):
+        token = create_access_token(self.user_id)
+        url = f"ws://127.0.0.1:{PORT}/api/v1/chat/ws/{self.user_id}?token={token}&protocol=json"
+        async with limit:
+            self.socket = await websockets.connect(url, ping_interval=None, max_queue=None)
+        self.reader = asyncio.create_task(self.read())
+
+    async def read(self):
+        try:
+            async for frame in self.socket:
+                event = json.loads(frame)
+                if event["type"] == "message":
+                    self.latencies.append(time.perf_counter() - float(event["content"]))
+                elif event["type"] == "ping":
+                    await self.socket.send('{"type":"pong"}')
+        except websockets.ConnectionClosed:
+            pass
+
+def rss(worker):
+    return psutil.Process(worker.pid).memory_info().rss
+
+async def drive(senders, receivers, rate, seconds=STEP_SECONDS):
+    """Send `rate` messages/sec round-robin over the senders for `seconds`."""
+    for client in receivers:
+        client.latencies.clear()
+    sent = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        due = int(elapsed * rate) - sent
+        for _ in range(due):
+            sender, receiver = senders[sent % len(senders)], receivers[sent % len(receivers)]
+            frame = {"type": "send", "recipient_id": receiver.user_id, "content": repr(time.perf_counter())}
+            await sender.socket.send(json.dumps(frame))
+            sent += 1
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(2)  # let in-flight deliveries land
+    latencies = sorted(l for client in receivers for l in client.latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("inf")
+    return sent, len(latencies), p99
+
+async def run(worker, user_ids):
+    clients = [Client(user_id) for user_id in user_ids]
+    baseline = rss(worker)
+    limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client.connect(limit) for client in clients), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    connected = [client for client, result in zip(clients, results) if not isinstance(result, Exception)]
+    await asyncio.sleep(1)
+    per_socket = (rss(worker) - baseline) / max(len(connected), 1)
+    print(f"connected {len(connected)}/{len(clients)} sockets in {elapsed:.1f}s; "
+          f"worker RSS {baseline / 2**20:.0f}MB -> {rss(worker) / 2**20:.0f}MB, "
+          f"{per_socket / 1024:.1f}KB per socket")
+    if len(connected) < PAIRS * 2:
+        return
+
+    senders, receivers = connected[:PAIRS], connected[PAIRS:PAIRS * 2]
+    # Warm up the worker's pool connections and statement caches first
+    await drive(senders, receivers, RATES[0], seconds=1)
+    sustainable = 0
+    for rate in RATES:
+        sent, delivered, p99 = await drive(senders, receivers, rate)
+        ok = delivered >= sent * MIN_DELIVERED and p99 <= P99_SLO_MS
+        print(f"{rate:>6} msg/s offered: sent {sent}, delivered {delivered}, p99 {p99:.1f}ms"
+              f"{'' if ok else '  <- over SLO'}")
+        if not ok:
+            break
+        sustainable = rate
+    print(f"max sustainable: {sustainable} msg/s (p99 <= {P99_SLO_MS}ms, >= {MIN_DELIVERED:.1%} delivered) "
+          f"with {len(connected)} sockets open")
+
+    for client in connected:
+        await client.socket.close()
+
+def bench_chat_sockets():
+    print(f"\n--- Benchmarking chat socket scale ({CONNECTIONS} sockets, {PAIRS} sending pairs) ---")
+    raise_fd_limit()
+    user_ids = seed_users(CONNECTIONS)
+    worker = start_worker()
+    try:
+        asyncio.run(run(worker, user_ids))
+    finally:
+        worker.terminate()
+        worker.wait()
+
+if __name__ == "__main__":
+    bench_chat_sockets()
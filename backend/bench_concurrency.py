@@ -0,0 +1,67 @@
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://127.0.0.1:8000"
+
+# 1k concurrent clients hammering DB-backed endpoints. Run it against a
+# server on the previous sync build and on this async build to compare.
+# Each client is a thread with its own keep-alive session.
+
+def get_token(email, password, name):
+    login_data = {"username": email, "password": password}
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+
+    register_data = {"email": email, "password": password, "full_name": name, "role": "alumni"}
+    requests.post(f"{BASE_URL}/api/v1/auth/register", json=register_data)
+
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+    return None
+
+def client(headers, deadline, latencies, errors):
+    paths = ["/api/v1/profiles/me", "/api/v1/jobs/", "/api/v1/events/", "/api/v1/networking/connections"]
+    session = requests.Session()
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            r = session.get(f"{BASE_URL}{paths[i % len(paths)]}", headers=headers, timeout=60)
+            if r.status_code == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors.append(r.status_code)
+        except requests.RequestException as e:
+            errors.append(type(e).__name__)
+        i += 1
+
+def run(clients, duration):
+    token = get_token("bench_concurrency@example.com", "Password123!", "Bench Concurrency")
+    if not token:
+        print("Failed to get token.")
+        return
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(client, headers, deadline, latencies, errors)
+
+    latencies.sort()
+    print(f"{len(latencies)} ok / {len(errors)} failed in {duration}s with {clients} clients: "
+          f"{len(latencies) / duration:.1f} req/s")
+    if latencies:
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"latency median {statistics.median(latencies):.1f}ms, p99 {p99:.1f}ms")
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print(f"\n--- Benchmarking {clients} concurrent clients ---")
+    run(clients, duration)
@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+import requests
+from sqlalchemy import text
+from app.core.security import create_access_token
+from app.db.session import engine
+
+# Sending and answering connection requests in bulk, end to end against a
+# single uvicorn worker: BATCH requests sent one call at a time against
+# one batch call, the same for accepting BATCH incoming requests, and a
+# batch re-sent to the same users (every item conflicts). Seeds a SCRATCH
+# PostgreSQL database (DATABASE_URL, migrated with `alembic upgrade
+# head`); do not point this at a database whose data you care about.
+#
+#   python bench_connection_batches.py [batch=1000]
+
+BATCH = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+# Other users' connections, so the table isn't just this user's
+BACKGROUND = 500_000
+PORT = 8202
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+def seed():
+    """The sender, 2 * BATCH users to send to and 2 * BATCH requests to answer."""
+    with engine.begin() as conn:
+        owner = conn.scalar(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            VALUES ('batch_bench_owner@example.com', 'x', 'Batch Owner', 'alumni', true) RETURNING id"""))
+        first = conn.scalar(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            SELECT 'batch_bench_' || i || '@example.com', 'x', 'Peer ' || i, 'alumni', true
+            FROM generate_series(1, :n) i RETURNING id"""), {"n": 4 * BATCH})
+        incoming = conn.execute(text("""INSERT INTO connections (requester_id, recipient_id, status, created_at)
+            SELECT :first + 2 * :batch + i, :owner, 'pending', now() FROM generate_series(0, 2 * :batch - 1) i
+            RETURNING id"""), {"owner": owner, "first": first, "batch": BATCH}).scalars().all()
+        conn.execute(text("""INSERT INTO connections (requester_id, recipient_id, status, created_at)
+            SELECT :first + i % :n, :first + (i * 7 + 1) % :n, 'accepted', now()
+            FROM generate_series(1, :background) i
+            ON CONFLICT DO NOTHING"""), {"first": first, "n": 4 * BATCH, "background": BACKGROUND})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE connections"))
+    targets = list(range(first, first + 2 * BATCH))
+    return owner, targets[:BATCH], targets[BATCH:], sorted(incoming)[:BATCH], sorted(incoming)[BATCH:]
+
+def start_worker():
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=dict(os.environ, CHAT_BACKPLANE="memory"),
+    )
+    for _ in range(100):
+        try:
+            if requests.get(f"{BASE_URL}/health/live").status_code == 200:
+                break
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    # Let its startup rebuild of people-you-may-know (a child process) finish
+    # rather than share the CPU with the requests being timed
+    process = psutil.Process(worker.pid)
+    while process.children():
+        time.sleep(0.5)
+    return worker
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def report(label: str, calls: int, elapsed: float, statuses):
+    print(f"{label:<32} {calls:5d} calls {elapsed:9.0f}ms ({elapsed / BATCH:6.2f}ms per item) {statuses}")
+
+def bench_connection_batches():
+    print(f"\n--- Benchmarking connection batches ({BATCH} per batch, {BACKGROUND} other connections) ---")
+    owner, send_single, send_batch, answer_single, answer_batch = seed()
+    headers = {"Authorization": f"Bearer {create_access_token(owner)}"}
+    session = requests.Session()
+    worker = start_worker()
+    try:
+        url = f"{BASE_URL}/api/v1/networking/connect"
+        statuses, elapsed = timed(lambda: sorted({
+            session.post(f"{url}/{user_id}", headers=headers).status_code for user_id in send_single
+        }))
+        report("send, one call each", BATCH, elapsed, statuses)
+        result, elapsed = timed(lambda: session.post(url, headers=headers, json={"user_ids": send_batch}).json())
+        report("send, one batch", 1, elapsed, f"{result['succeeded']} sent, {result['failed']} failed")
+        result, elapsed = timed(lambda: session.post(url, headers=headers, json={"user_ids": send_batch}).json())
+        report("send again, one batch", 1, elapsed, f"{result['succeeded']} sent, {result['failed']} failed")
+
+        statuses, elapsed = timed(lambda: sorted({
+            session.put(f"{url}/{request_id}", headers=headers, json={"status": "accepted"}).status_code
+            for request_id in answer_single
+        }))
+        report("accept, one call each", BATCH, elapsed, statuses)
+        result, elapsed = timed(lambda: session.put(
+            url, headers=headers, json={"status": "accepted", "request_ids": answer_batch}).json())
+        report("accept, one batch", 1, elapsed, f"{result['succeeded']} accepted, {result['failed']} failed")
+    finally:
+        worker.terminate()
+        worker.wait()
+
+if __name__ == "__main__":
+    bench_connection_batches()
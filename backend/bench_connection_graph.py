@@ -0,0 +1,113 @@
+import statistics
+import sys
+import time
+import numpy as np
+import psutil
+from scipy import sparse
+from scipy.sparse import csgraph
+from app.core.config import settings
+from app.services.connection_graph import ConnectionGraph, adjacency
+
+# Degrees of separation and mutual counts on a 10M-connection graph held
+# in memory: bytes per connection, and latency for shortest paths between
+# pairs of users (by how far apart they turn out to be) and for batches of
+# mutual counts, before and after connections accepted since the
+# snapshot. Connections cluster in cohorts of 200, as in
+# bench_people_you_may_know.py. Runs in-process on a generated graph; no
+# database is needed. Ends by checking paths against scipy's shortest paths.
+#
+#   python bench_connection_graph.py [users=1000000] [connections=10000000]
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+CONNECTIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+COHORT = 200
+IN_COHORT = 0.7
+LOOKUPS = 2000
+BATCH = 100
+RECENT = 100_000
+CHECKS = 5
+
+def generate() -> ConnectionGraph:
+    rng = np.random.default_rng(22)
+    a = rng.integers(0, USERS, CONNECTIONS)
+    in_cohort = rng.random(CONNECTIONS) < IN_COHORT
+    b = np.where(in_cohort, a // COHORT * COHORT + rng.integers(0, COHORT, CONNECTIONS), rng.integers(0, USERS, CONNECTIONS))
+    b = np.minimum(b, USERS - 1)
+    keep = a != b
+    graph = adjacency(USERS, a[keep], b[keep])
+    # User ids as the connections table would have them: sorted, with gaps
+    user_ids = (np.arange(USERS, dtype=np.int32) * 2 + 1)
+    return ConnectionGraph(user_ids, graph.indptr, graph.indices)
+
+def timed(fn, samples=LOOKUPS):
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99) - 1]
+
+def bench_paths(graph: ConnectionGraph, rng, label: str):
+    by_degree = {}
+    for _ in range(LOOKUPS):
+        # Half the pairs from one cohort, where paths are short
+        a, b = rng.integers(0, USERS, 2)
+        if rng.random() < 0.5:
+            b = min(a // COHORT * COHORT + rng.integers(0, COHORT), USERS - 1)
+        a, b = graph.user_ids[[a, b]].tolist()
+        start = time.perf_counter()
+        path = graph.path(a, b, settings.CONNECTION_PATH_MAX_DEPTH)
+        by_degree.setdefault(len(path) - 1 if path else None, []).append((time.perf_counter() - start) * 1000)
+    for degree, times in sorted(by_degree.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+        times.sort()
+        name = f"{degree} hops" if degree is not None else f"> {settings.CONNECTION_PATH_MAX_DEPTH} hops"
+        print(f"{label} path, {name:>8} ({len(times):4d} pairs): "
+              f"p50 {statistics.median(times):6.2f}ms p99 {times[int(len(times) * 0.99) - 1]:6.2f}ms")
+
+def bench_connection_graph():
+    print(f"\n--- Benchmarking connection graph ({USERS} users, {CONNECTIONS} connections) ---")
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    start = time.perf_counter()
+    graph = generate()
+    built = time.perf_counter() - start
+    edges = graph.edge_count()
+    held = graph.user_ids.nbytes + graph.indptr.nbytes + graph.indices.nbytes
+    print(f"built in {built:.1f}s: {edges} distinct connections, arrays {held / 2**20:.0f}MB "
+          f"({held / edges:.1f} bytes per connection), RSS +{(process.memory_info().rss - rss) / 2**20:.0f}MB")
+
+    rng = np.random.default_rng(23)
+    bench_paths(graph, rng, "snapshot")
+    users = iter(rng.choice(graph.user_ids, LOOKUPS).tolist())
+    p50, p99 = timed(lambda: graph.mutual_counts(next(users), rng.choice(graph.user_ids, BATCH)))
+    print(f"snapshot mutual counts, {BATCH} users per request: p50 {p50:6.2f}ms p99 {p99:6.2f}ms")
+
+    rss = process.memory_info().rss
+    pairs = rng.choice(graph.user_ids, (RECENT, 2)).tolist()
+    start = time.perf_counter()
+    for a, b in pairs:
+        graph.connect(a, b)
+    print(f"{RECENT} connections accepted since the snapshot: {(time.perf_counter() - start) / RECENT * 1e6:.1f}us each, "
+          f"RSS +{(process.memory_info().rss - rss) / 2**20:.0f}MB")
+    bench_paths(graph, rng, "  +recent")
+    users = iter(rng.choice(graph.user_ids, LOOKUPS).tolist())
+    p50, p99 = timed(lambda: graph.mutual_counts(next(users), rng.choice(graph.user_ids, BATCH)))
+    print(f"  +recent mutual counts, {BATCH} users per request: p50 {p50:6.2f}ms p99 {p99:6.2f}ms")
+
+    snapshot = ConnectionGraph(graph.user_ids, graph.indptr, graph.indices)
+    matrix = sparse.csr_matrix((np.ones(len(snapshot.indices)), snapshot.indices, snapshot.indptr), shape=(USERS, USERS))
+    wrong = 0
+    for source in rng.integers(0, USERS, CHECKS).tolist():
+        distances = csgraph.shortest_path(matrix, indices=source, unweighted=True)
+        for target in rng.integers(0, USERS, 200).tolist():
+            path = snapshot.path(int(snapshot.user_ids[source]), int(snapshot.user_ids[target]),
+                                 settings.CONNECTION_PATH_MAX_DEPTH)
+            expected = distances[target] if distances[target] <= settings.CONNECTION_PATH_MAX_DEPTH else None
+            linked = path is None or all(b in snapshot.neighbors(a) for a, b in zip(path, path[1:]))
+            if (len(path) - 1 if path else None) != expected or not linked:
+                wrong += 1
+    print(f"path lengths agree with scipy's shortest paths: {'yes' if not wrong else f'NO ({wrong} differ)'}")
+
+if __name__ == "__main__":
+    bench_connection_graph()
@@ -0,0 +1,134 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+import requests
+from sqlalchemy import text
+from app.core.security import create_access_token
+from app.db.session import engine
+
+# The My Network and Pending Requests pages for a user with 5,000
+# connections, end to end against a single uvicorn worker: requests and
+# wall time to render the first page, to walk every page in each sort
+# order, and, for comparison, what fetching each counterpart's profile
+# separately (as the pages used to) costs on top. Six requests at a time,
+# as a browser would. Seeds a SCRATCH PostgreSQL database (DATABASE_URL,
+# migrated with `alembic upgrade head`); do not point this at a database
+# whose data you care about.
+#
+#   python bench_connection_listing.py [connections=5000]
+
+CONNECTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+PENDING = 200
+# Other users' connections, so the table isn't just this user's
+BACKGROUND = 500_000
+PAGE = 50
+RUNS = 5
+BROWSER_CONCURRENCY = 6
+PORT = 8201
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+def seed() -> int:
+    with engine.begin() as conn:
+        owner = conn.scalar(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            VALUES ('listing_bench_owner@example.com', 'x', 'Listing Owner', 'alumni', true) RETURNING id"""))
+        first = conn.scalar(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            SELECT 'listing_bench_' || i || '@example.com', 'x', 'Peer ' || i, 'alumni', true
+            FROM generate_series(1, :n) i RETURNING id"""), {"n": CONNECTIONS + PENDING})
+        conn.execute(text("""INSERT INTO profiles (user_id, full_name, department, graduation_year, points)
+            SELECT id, full_name, 'Computer Science', 2000 + id % 20, 0 FROM users
+            WHERE email LIKE 'listing_bench_%'"""))
+        # Half sent by the owner, half received
+        conn.execute(text("""INSERT INTO connections (requester_id, recipient_id, status, created_at)
+            SELECT CASE WHEN i % 2 = 0 THEN :owner ELSE :first + i END,
+                   CASE WHEN i % 2 = 0 THEN :first + i ELSE :owner END,
+                   'accepted', now() - (i || ' minutes')::interval
+            FROM generate_series(0, :n - 1) i"""), {"owner": owner, "first": first, "n": CONNECTIONS})
+        conn.execute(text("""INSERT INTO connections (requester_id, recipient_id, status, created_at)
+            SELECT :first + :n + i, :owner, 'pending', now() FROM generate_series(0, :pending - 1) i"""),
+            {"owner": owner, "first": first, "n": CONNECTIONS, "pending": PENDING})
+        conn.execute(text("""INSERT INTO connections (requester_id, recipient_id, status, created_at)
+            SELECT :first + i % :n, :first + (i * 7) % :n, 'accepted', now()
+            FROM generate_series(1, :background) i"""), {"first": first, "n": CONNECTIONS, "background": BACKGROUND})
+    # Index-only counts need the visibility map
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE connections"))
+    return owner
+
+def start_worker():
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=dict(os.environ, CHAT_BACKPLANE="memory"),
+    )
+    for _ in range(100):
+        try:
+            if requests.get(f"{BASE_URL}/health/live").status_code == 200:
+                break
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    # Let its startup rebuild of people-you-may-know (a child process) finish
+    # rather than share the CPU with the requests being timed
+    process = psutil.Process(worker.pid)
+    while process.children():
+        time.sleep(0.5)
+    return worker
+
+def timed(fn):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples), max(samples)
+
+def walk(session, headers, path, sort):
+    """Every page of a listing; returns (requests, items)."""
+    count, items, cursor = 0, 0, None
+    while True:
+        params = {"sort": sort, "limit": PAGE, **({"cursor": cursor} if cursor else {})}
+        page = session.get(f"{BASE_URL}/api/v1{path}", headers=headers, params=params).json()
+        count += 1
+        items += len(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return count, items
+
+def bench_connection_listing():
+    print(f"\n--- Benchmarking connection listings ({CONNECTIONS} connections, {PENDING} pending, page of {PAGE}) ---")
+    owner = seed()
+    headers = {"Authorization": f"Bearer {create_access_token(owner)}"}
+    session = requests.Session()
+    worker = start_worker()
+    try:
+        def render(path):
+            return session.get(f"{BASE_URL}/api/v1{path}", headers=headers, params={"limit": PAGE}).json()
+
+        for path in ("/networking/connections", "/networking/requests/received"):
+            page, p50, worst = timed(lambda: render(path))
+            print(f"{path:<30} first page: 1 request, {len(page['items'])} of {page['total']}, "
+                  f"p50 {p50:6.1f}ms max {worst:6.1f}ms")
+        for sort in ("recent", "name"):
+            (count, items), p50, worst = timed(lambda: walk(session, headers, "/networking/connections", sort))
+            print(f"all {items} connections by {sort:<6}: {count} requests, p50 {p50:6.0f}ms max {worst:6.0f}ms")
+
+        sessions = [requests.Session() for _ in range(BROWSER_CONCURRENCY)]
+        peers = [owner + 1 + i for i in range(CONNECTIONS)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(BROWSER_CONCURRENCY) as pool:
+            statuses = set(pool.map(
+                lambda i: sessions[i % BROWSER_CONCURRENCY].get(
+                    f"{BASE_URL}/api/v1/profiles/{peers[i]}", headers=headers).status_code,
+                range(len(peers)),
+            ))
+        print(f"for comparison, one /profiles call per connection: {len(peers)} requests in "
+              f"{time.perf_counter() - start:.1f}s (statuses {sorted(statuses)})")
+    finally:
+        worker.terminate()
+        worker.wait()
+
+if __name__ == "__main__":
+    bench_connection_listing()
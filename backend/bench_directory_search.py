@@ -0,0 +1,112 @@
+import asyncio
+import statistics
+import sys
+import time
+import psutil
+from sqlalchemy import select, text
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, async_engine, engine
+from app.models.profile import Profile
+from app.services.directory_search import DirectoryIndex
+
+# Directory search over 1M profiles: one letter, common and rare names,
+# departments, skills, typos, combinations and filter-only browsing, each timed
+# end to end (index query with total and facets, then loading the page's
+# rows), after timing the index build and measuring its memory. Seeds a
+# SCRATCH PostgreSQL database
+# (DATABASE_URL, migrated with `alembic upgrade head`) with users and
+# profiles; do not point this at a database whose data you care about.
+#
+#   python bench_directory_search.py [profiles=1000000]
+
+PROFILES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Priya", "Wei",
+               "Aisha", "Carlos", "Yuki", "Olga", "Mohammed", "Fatima", "Ivan", "Chen", "Ana", "Kwame"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+              "Patel", "Kumar", "Nguyen", "Kim", "Okafor", "Ivanova", "Tanaka", "Silva", "Novak", "Haddad"]
+DEPARTMENTS = ["Computer Science", "Computer Engineering", "Electrical Engineering", "Mechanical Engineering",
+               "Civil Engineering", "Mathematics", "Physics", "Chemistry", "Biology", "Economics", "History",
+               "Philosophy", "Psychology", "Business Administration", "Architecture", "Law", "Medicine",
+               "Nursing", "Music", "Fine Arts"]
+CITIES = ["London", "New York", "San Francisco", "Berlin", "Paris", "Bangalore", "Singapore", "Toronto", "Sydney",
+          "Lagos", "Nairobi", "Tokyo", "Seoul", "Madrid", "Chicago", "Boston", "Austin", "Dublin", "Zurich", "Dubai"]
+SKILLS = ["python", "java", "sql", "react", "kubernetes", "rust", "go", "excel", "leadership", "marketing",
+          "finance", "design", "research", "teaching", "sales", "statistics", "writing", "cad", "matlab", "aws"]
+BIO_WORDS = ["passionate", "about", "building", "products", "teams", "startups", "mentoring", "students",
+             "open", "source", "climate", "healthcare", "education", "fintech", "robotics", "data", "platforms",
+             "community", "volunteer", "speaker", "author", "founder", "consultant", "researcher"]
+QUERIES = [
+    ({"q": "a"}, "one letter"),
+    ({"q": "john"}, "common first name"),
+    ({"q": "priya patel"}, "full name"),
+    ({"q": "eng"}, "prefix of a department word"),
+    ({"q": "python"}, "skill"),
+    ({"q": "london python robotics"}, "city + skill + bio word"),
+    ({"q": "pyhton"}, "skill with a typo"),
+    ({"q": "jenifer willaims"}, "full name with typos"),
+    ({"q": "zzyzx"}, "no matches"),
+    ({"department": "engineering"}, "part of department names"),
+    ({"year": 2015}, "year filter only"),
+    ({"q": "kubernetes", "department": "Computer Science", "year": 2015}, "skill within a facet"),
+    ({}, "browse everyone"),
+]
+PAGE = 20
+RUNS = 20
+TARGET_MS = 100
+
+def pick(values):
+    """SQL for a random element of `values`, drawn per row."""
+    array = "ARRAY[" + ", ".join("'" + value.replace("'", "''") + "'" for value in values) + "]"
+    return f"({array})[1 + floor(random() * {len(values)})::int]"
+
+def seed():
+    with engine.begin() as conn:
+        first = conn.scalar(text("SELECT coalesce(max(id), 0) FROM users"))
+        conn.execute(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            SELECT 'directory_bench_' || i || '@example.com', 'x', 'bench', 'alumni', true
+            FROM generate_series(1, :n) i"""), {"n": PROFILES})
+        skills = " || ',' || ".join(pick(SKILLS) for _ in range(3))
+        bio = " || ' ' || ".join(pick(BIO_WORDS) for _ in range(8))
+        conn.execute(text(f"""INSERT INTO profiles (user_id, full_name, graduation_year, department, location,
+                                                    skills, bio, points)
+            SELECT :first + i, {pick(FIRST_NAMES)} || ' ' || {pick(LAST_NAMES)},
+                   1980 + floor(random() * 46)::int, {pick(DEPARTMENTS)}, {pick(CITIES)},
+                   {skills}, {bio}, floor(random() * 1000)::int
+            FROM generate_series(1, :n) i"""), {"first": first, "n": PROFILES})
+        conn.execute(text("ANALYZE profiles"))
+
+async def run():
+    index = DirectoryIndex(async_engine, refresh_interval=settings.DIRECTORY_INDEX_REFRESH_SECONDS)
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    start = time.perf_counter()
+    await index.ready()
+    print(f"index built in {time.perf_counter() - start:.0f}s: {index.profile_count()} profiles, "
+          f"{len(index.words)} words, {(process.memory_info().rss - rss) / 2**20:.0f}MB")
+    async with AsyncSessionLocal() as db:
+        for params, label in QUERIES:
+            samples = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                results = index.search(params.get("q"), params.get("department"), params.get("year"), PAGE, 0)
+                (await db.scalars(select(Profile).where(Profile.id.in_(results.profile_ids)))).all()
+                samples.append((time.perf_counter() - start) * 1000)
+                db.expunge_all()
+            samples.sort()
+            p99 = samples[int(len(samples) * 0.99) - 1]
+            print(f"{label:>28} {str(params):<70} {results.total:>7} matches | "
+                  f"p50 {statistics.median(samples):6.1f}ms p99 {p99:6.1f}ms"
+                  f"{'' if p99 <= TARGET_MS else '  <- over target'}")
+    await async_engine.dispose()
+
+def bench_directory_search():
+    print(f"\n--- Benchmarking directory search ({PROFILES} profiles, page {PAGE}) ---")
+    start = time.perf_counter()
+    seed()
+    print(f"seeded in {time.perf_counter() - start:.0f}s")
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    bench_directory_search()
@@ -0,0 +1,67 @@
+import statistics
+import sys
+import time
+from sqlalchemy import text
+from app.db.session import engine
+from app.services.conversations import REBUILD_STATEMENTS
+
+# Inbox for one user with PEERS conversations as their total message
+# volume grows to 10k/100k/1M: a GROUP BY over messages versus the
+# maintained conversations table. Seeds a SCRATCH PostgreSQL database
+# (DATABASE_URL, migrated with `alembic upgrade head`).
+
+SIZES = [int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+PEERS = 500
+PAGE = 30
+RUNS = 5
+
+NAIVE = text("""SELECT peer_id, max(id) AS last_message_id, sum(unread) AS unread_count
+    FROM (
+        SELECT recipient_id AS peer_id, id, 0 AS unread FROM messages WHERE sender_id = :owner
+        UNION ALL
+        SELECT sender_id, id, CASE WHEN is_read THEN 0 ELSE 1 END FROM messages WHERE recipient_id = :owner
+    ) AS sides
+    GROUP BY peer_id ORDER BY last_message_id DESC LIMIT :page""")
+
+SUMMARY = text("""SELECT conversations.*, users.full_name FROM conversations
+    JOIN users ON users.id = conversations.peer_id
+    WHERE owner_id = :owner ORDER BY last_message_id DESC LIMIT :page""")
+
+def timed(conn, statement, params):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        conn.execute(statement, params).all()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def bench_inbox():
+    print(f"\n--- Benchmarking inbox ({PEERS} conversations, page of {PAGE}) ---")
+    with engine.begin() as conn:
+        owner = conn.scalar(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            VALUES ('inbox_bench@example.com', 'x', 'Inbox Owner', 'alumni', true) RETURNING id"""))
+        first_peer = conn.scalar(text(f"""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            SELECT 'inbox_peer' || i || '@example.com', 'x', 'Peer ' || i, 'alumni', true
+            FROM generate_series(1, {PEERS}) i RETURNING id"""))
+    have = 0
+    for size in SIZES:
+        with engine.begin() as conn:
+            conn.execute(text("""INSERT INTO messages (sender_id, recipient_id, content, timestamp, is_read)
+                SELECT CASE WHEN i % 2 = 0 THEN :owner ELSE :first + i % :peers END,
+                       CASE WHEN i % 2 = 0 THEN :first + i % :peers ELSE :owner END,
+                       'message ' || i, now(), i % 3 = 0
+                FROM generate_series(:have + 1, :want) i"""),
+                {"owner": owner, "first": first_peer, "peers": PEERS, "have": have, "want": size})
+            conn.execute(text("TRUNCATE conversations"))
+            for statement in REBUILD_STATEMENTS:
+                conn.execute(text(statement))
+            conn.execute(text("ANALYZE"))
+        have = size
+        with engine.connect() as conn:
+            params = {"owner": owner, "page": PAGE}
+            naive_ms = timed(conn, NAIVE, params)
+            summary_ms = timed(conn, SUMMARY, params)
+        print(f"{size:>9} messages: GROUP BY over messages {naive_ms:8.1f}ms | conversations table {summary_ms:.2f}ms")
+
+if __name__ == "__main__":
+    bench_inbox()
@@ -0,0 +1,123 @@
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+import numpy as np
+import psutil
+from scipy import sparse
+from app.services import mentor_matching
+from app.services.mentor_matching import MentorIndex
+
+# Mentor matching over 1M profiles held in memory: index build time and
+# memory, then latency of a top-20 match for students (alumni ranked) and
+# for alumni (students ranked), and of applying a profile edit. Skills
+# and interests are drawn Zipf-like from a vocabulary of 5,000, so the
+# common ones are shared by a large part of the directory. Runs
+# in-process on generated profiles; no database is needed. Ends by
+# checking matches against a brute-force score from a scipy sparse matrix.
+#
+#   python bench_mentor_matching.py [profiles=1000000]
+
+PROFILES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+VOCABULARY = 5_000
+DEPARTMENTS = 40
+LOOKUPS = 500
+UPDATES = 10_000
+CHECKS = 20
+TOP = 20
+
+def generate(rng):
+    popularity = 1 / np.arange(1, VOCABULARY + 1)
+    popularity /= popularity.sum()
+    counts = rng.integers(2, 9, PROFILES)
+    tags = rng.choice(VOCABULARY, counts.sum(), p=popularity)
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    roles = rng.choice(["alumni", "student", "admin"], PROFILES, p=[0.7, 0.29, 0.01])
+    departments = rng.integers(0, DEPARTMENTS + 1, PROFILES)
+    years = np.where(roles == "student", rng.integers(2025, 2030, PROFILES), rng.integers(1970, 2025, PROFILES))
+    for i in range(PROFILES):
+        names = [f"Skill {tag}" for tag in tags[bounds[i]:bounds[i + 1]].tolist()]
+        split = len(names) // 2
+        yield SimpleNamespace(
+            user_id=i + 1, role=str(roles[i]),
+            department=f"Department {departments[i]}" if departments[i] else None,
+            graduation_year=int(years[i]) if i % 10 else None,
+            skills=", ".join(names[:split]), interest=",".join(names[split:]),
+        )
+
+def timed(fn, samples=LOOKUPS):
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99) - 1]
+
+def brute_force(index: MentorIndex, user_id: int, role: str) -> np.ndarray:
+    """Every live profile's score for `user_id`, from a sparse slot x skill matrix."""
+    size = len(index.ids)
+    starts = np.frombuffer(index.tag_starts, dtype=np.int64)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(index.tags)), np.frombuffer(index.tags, dtype=np.int32), starts),
+        shape=(size, len(index.vocabulary)),
+    )
+    slot = index.slots[user_id]
+    shared = (matrix @ matrix[slot].T).toarray().ravel()
+    sizes = np.diff(starts)
+    union = np.maximum(sizes + sizes[slot] - shared, 1)
+    departments = np.frombuffer(index.departments, dtype=np.int32)
+    years = np.frombuffer(index.years, dtype=np.int32)
+    year = years[slot]
+    score = (
+        mentor_matching.SKILL_WEIGHT * shared / union
+        + mentor_matching.DEPARTMENT_WEIGHT * ((departments == departments[slot]) & (departments != 0))
+        + mentor_matching.YEAR_WEIGHT * np.maximum(0, 1 - np.abs(years - year) / mentor_matching.YEAR_WINDOW)
+        * ((years != 0) & (year != 0))
+    )
+    eligible = (np.frombuffer(index.roles, dtype=np.uint8) == mentor_matching.ROLES.index(role) + 1)
+    eligible &= np.frombuffer(index.alive, dtype=np.uint8).astype(bool)
+    eligible[slot] = False
+    return np.where(eligible, score, 0)
+
+def bench_mentor_matching():
+    print(f"\n--- Benchmarking mentor matching ({PROFILES} profiles, {VOCABULARY} skills) ---")
+    rng = np.random.default_rng(25)
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    index = MentorIndex(engine=None, refresh_interval=0)
+    start = time.perf_counter()
+    for row in generate(rng):
+        index._add(row, row.role)
+    index.built = True
+    print(f"built in {time.perf_counter() - start:.1f}s: {len(index.tags)} skills and interests held, "
+          f"RSS +{(process.memory_info().rss - rss) / 2**20:.0f}MB")
+
+    roles = np.frombuffer(index.roles, dtype=np.uint8).copy()
+    students = np.flatnonzero(roles == 2) + 1
+    alumni = np.flatnonzero(roles == 1) + 1
+    for label, users, role in (("mentors for a student", students, "alumni"), ("mentees for an alumnus", alumni, "student")):
+        asking = iter(rng.choice(users, LOOKUPS).tolist())
+        p50, p99 = timed(lambda: index.match(next(asking), role, TOP))
+        print(f"top {TOP} {label:<24}: p50 {p50:6.2f}ms p99 {p99:6.2f}ms")
+
+    edits = iter(rng.choice(students, UPDATES).tolist())
+    p50, p99 = timed(lambda: index.update(SimpleNamespace(
+        user_id=next(edits), department="Department 1", graduation_year=2027,
+        skills="Skill 1, Skill 7, Skill 4999", interest="Skill 12",
+    ), "student"), samples=UPDATES)
+    print(f"profile edit applied: p50 {p50 * 1000:6.1f}us p99 {p99 * 1000:6.1f}us")
+    p50, p99 = timed(lambda: index.match(int(rng.choice(students)), "alumni", TOP), samples=100)
+    print(f"top {TOP} mentors after {UPDATES} edits     : p50 {p50:6.2f}ms p99 {p99:6.2f}ms")
+
+    wrong = 0
+    for user_id in rng.choice(students, CHECKS).tolist():
+        expected = np.sort(brute_force(index, user_id, "alumni"))[::-1][:TOP]
+        expected = expected[expected > 0]
+        got = np.array([match.score for match in index.match(user_id, "alumni", TOP)])
+        if len(got) != len(expected) or not np.allclose(got, expected, atol=1e-5):
+            wrong += 1
+    print(f"top {TOP} scores agree with a brute-force sparse product: {'yes' if not wrong else f'NO ({wrong} differ)'}")
+
+if __name__ == "__main__":
+    bench_mentor_matching()
@@ -0,0 +1,69 @@
+import asyncio
+import statistics
+import sys
+import time
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import async_engine, engine
+from app.services import message_search
+
+# Message search for a user with 1M messages, from words in nearly every
+# message down to words in a handful. Seeds a SCRATCH PostgreSQL database
+# (DATABASE_URL, migrated with `alembic upgrade head`) with messages of
+# ten words drawn from a Zipf-like vocabulary; do not point this at a
+# database whose data you care about.
+#
+#   python bench_message_search.py [messages=1000000]
+
+MESSAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+VOCABULARY = [f"word{n}" for n in range(1, 5001)]
+QUERIES = ["word1", "word3", "word30", "word60", "word100", "word300", "word3000", "word2 word40", "word7 word900", "nosuchword"]
+PAGE = 20
+RUNS = 20
+TARGET_MS = 50
+
+def seed():
+    with engine.begin() as conn:
+        ids = conn.execute(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            VALUES ('search_bench_a@example.com', 'x', 'A', 'alumni', true),
+                   ('search_bench_b@example.com', 'x', 'B', 'alumni', true)
+            RETURNING id""")).scalars().all()
+        # exp(random() * ln(n)) picks word k with probability ~1/k
+        conn.execute(text("""INSERT INTO messages (sender_id, recipient_id, content, timestamp, is_read)
+            SELECT CASE WHEN i % 2 = 0 THEN :a ELSE :b END, CASE WHEN i % 2 = 0 THEN :b ELSE :a END,
+                   (SELECT string_agg((:vocabulary)[floor(exp(random() * ln(:size)))::int], ' ')
+                    FROM generate_series(1, 10) WHERE i > 0),
+                   now() - ((:n - i) || ' seconds')::interval, false
+            FROM generate_series(1, :n) i"""),
+            {"a": ids[0], "b": ids[1], "vocabulary": VOCABULARY, "size": len(VOCABULARY), "n": MESSAGES})
+        conn.execute(text("ANALYZE messages"))
+    return ids[0]
+
+async def run(user_id):
+    async with async_engine.connect() as conn:
+        for query in QUERIES:
+            matching = await conn.scalar(
+                text("SELECT count(*) FROM messages WHERE search_vector @@ websearch_to_tsquery('english', :q)"),
+                {"q": query},
+            )
+            samples = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                hits, truncated = await message_search.search(conn, user_id, query, PAGE, 0, settings.CHAT_SEARCH_CANDIDATES)
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            p99 = samples[int(len(samples) * 0.99) - 1]
+            print(f"{query!r:>18}: {matching:>7} matching | first page ({len(hits[:PAGE])} hits{', truncated' if truncated else ''}) "
+                  f"p50 {statistics.median(samples):6.2f}ms p99 {p99:6.2f}ms"
+                  f"{'' if p99 <= TARGET_MS else '  <- over target'}")
+    await async_engine.dispose()
+
+def bench_message_search():
+    print(f"\n--- Benchmarking message search ({MESSAGES} messages, {settings.CHAT_SEARCH_CANDIDATES} candidates ranked) ---")
+    start = time.perf_counter()
+    user_id = seed()
+    print(f"seeded in {time.perf_counter() - start:.0f}s (search_vector maintained by the insert trigger)")
+    asyncio.run(run(user_id))
+
+if __name__ == "__main__":
+    bench_message_search()
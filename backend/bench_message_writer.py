@@ -0,0 +1,74 @@
+import asyncio
+import sys
+import time
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.chat import Message
+from app.services.message_writer import MessageWriter
+
+# Chat message ingest: one commit per message (the old WebSocket loop)
+# versus the batched MessageWriter, with 100/1k/10k concurrent senders
+# each storing messages back to back. Run against a SCRATCH database
+# (DATABASE_URL, migrated with `alembic upgrade head`).
+
+SENDERS = [int(n) for n in sys.argv[1:]] or [100, 1_000, 10_000]
+DURATION = 5
+
+async def seed_users():
+    async with async_engine.begin() as conn:
+        await conn.execute(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            VALUES ('writer_bench_a@example.com', 'x', 'A', 'alumni', true),
+                   ('writer_bench_b@example.com', 'x', 'B', 'alumni', true)"""))
+        ids = (await conn.execute(text(
+            "SELECT id FROM users WHERE email LIKE 'writer_bench_%' ORDER BY email"
+        ))).scalars().all()
+    return ids[0], ids[1]
+
+async def per_message_commit(sender_id, recipient_id, deadline, counter):
+    while time.perf_counter() < deadline:
+        async with AsyncSessionLocal() as db:
+            db.add(Message(sender_id=sender_id, recipient_id=recipient_id, content="hello"))
+            await db.commit()
+        counter[0] += 1
+
+async def batched(writer, sender_id, recipient_id, deadline, counter):
+    while time.perf_counter() < deadline:
+        await writer.write(sender_id, recipient_id, "hello")
+        counter[0] += 1
+
+async def measure(senders, make_sender):
+    counter = [0]
+    deadline = time.perf_counter() + DURATION
+    start = time.perf_counter()
+    results = await asyncio.gather(*(make_sender(deadline, counter) for _ in range(senders)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = [r for r in results if isinstance(r, Exception)]
+    return counter[0] / elapsed, errors
+
+async def run():
+    a, b = await seed_users()
+    for senders in SENDERS:
+        baseline, baseline_errors = await measure(senders, lambda d, c: per_message_commit(a, b, d, c))
+        writer = MessageWriter(
+            async_engine,
+            batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+            interval=settings.CHAT_WRITE_INTERVAL_MS / 1000,
+            max_queue=settings.CHAT_WRITE_MAX_QUEUE,
+        )
+        writer.start()
+        grouped, grouped_errors = await measure(senders, lambda d, c: batched(writer, a, b, d, c))
+        await writer.stop()
+        batch = writer.messages / writer.batches if writer.batches else 0
+        print(f"{senders:>6} senders: per-message commit {baseline:8.0f} msg/s"
+              f"{f' ({len(baseline_errors)} failed: {type(baseline_errors[0]).__name__})' if baseline_errors else ''}"
+              f" | batched writer {grouped:8.0f} msg/s (avg batch {batch:.0f})"
+              f"{f' ({len(grouped_errors)} failed)' if grouped_errors else ''}")
+    await async_engine.dispose()
+
+def bench_message_writer():
+    print(f"\n--- Benchmarking chat message ingest ({DURATION}s per run) ---")
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    bench_message_writer()
@@ -0,0 +1,95 @@
+import resource
+import statistics
+import sys
+import time
+import numpy as np
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import engine
+from app.services.people_you_may_know import PeopleYouMayKnow, build_snapshot
+
+# People-you-may-know over 1M users and 20M accepted connections: the
+# full rebuild (read both tables, build the graph, rank everyone's
+# candidates) with its peak memory, the snapshot a web worker then holds,
+# and serving from it, from the graph after new connections, and applying
+# a connection. Connections cluster in cohorts of 200 so friends of
+# friends overlap as they do in practice. Seeds a SCRATCH PostgreSQL
+# database (DATABASE_URL, migrated with `alembic upgrade head`); do not
+# point this at a database whose data you care about.
+#
+#   python bench_people_you_may_know.py [users=1000000] [connections=20000000]
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+CONNECTIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000_000
+COHORT = 200
+IN_COHORT = 0.7
+DEPARTMENTS = ["Computer Science", "Mathematics", "Physics", "Economics", "History", "Law", "Medicine", "Music"]
+LOOKUPS = 2000
+
+def seed() -> int:
+    with engine.begin() as conn:
+        first = conn.scalar(text("SELECT coalesce(max(id), 0) FROM users"))
+        conn.execute(text("""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+            SELECT 'pymk_bench_' || i || '@example.com', 'x', 'bench', 'alumni', true
+            FROM generate_series(1, :n) i"""), {"n": USERS})
+        departments = "ARRAY[" + ", ".join(f"'{d}'" for d in DEPARTMENTS) + "]"
+        conn.execute(text(f"""INSERT INTO profiles (user_id, full_name, department, graduation_year)
+            SELECT :first + i, 'bench', ({departments})[1 + ((i / :cohort) % {len(DEPARTMENTS)})],
+                   1980 + (i / :cohort) % 46
+            FROM generate_series(1, :n) i"""), {"first": first, "n": USERS, "cohort": COHORT})
+        conn.execute(text("""INSERT INTO connections (requester_id, recipient_id, status, created_at)
+            SELECT a, b, 'accepted', now() FROM (
+                SELECT a, CASE WHEN random() < :in_cohort
+                               THEN :first + 1 + (a - :first - 1) / :cohort * :cohort + floor(random() * :cohort)::int
+                               ELSE :first + 1 + floor(random() * :n)::int END AS b
+                FROM (SELECT :first + 1 + floor(random() * :n)::int AS a FROM generate_series(1, :m)) s
+            ) t WHERE a <> b AND b <= :first + :n"""),
+            {"first": first, "n": USERS, "m": CONNECTIONS, "cohort": COHORT, "in_cohort": IN_COHORT})
+        conn.execute(text("ANALYZE connections"))
+    return first
+
+def timed(fn, samples=LOOKUPS):
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99) - 1]
+
+def bench_people_you_may_know():
+    print(f"\n--- Benchmarking people you may know ({USERS} users, {CONNECTIONS} connections, "
+          f"top {settings.PYMK_TOP_K}) ---")
+    start = time.perf_counter()
+    first = seed()
+    print(f"seeded in {time.perf_counter() - start:.0f}s")
+
+    start = time.perf_counter()
+    snapshot = build_snapshot(engine, settings.PYMK_TOP_K)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"full rebuild in {time.perf_counter() - start:.0f}s, peak RSS {peak:.0f}MB: "
+          f"{len(snapshot.user_ids)} users, {len(snapshot.indices) // 2} connections")
+    held = sum(array.nbytes for array in snapshot)
+    print(f"snapshot held by each web worker: {held / 2**20:.0f}MB "
+          f"(graph {(snapshot.indptr.nbytes + snapshot.indices.nbytes) / 2**20:.0f}MB, "
+          f"candidates {(snapshot.candidates.nbytes + snapshot.mutuals.nbytes) / 2**20:.0f}MB)")
+
+    recommender = PeopleYouMayKnow(rebuild_interval=settings.PYMK_REBUILD_SECONDS, top_k=settings.PYMK_TOP_K,
+                                   snapshot_dir=settings.PYMK_SNAPSHOT_DIR)
+    recommender.load(snapshot)
+    rng = np.random.default_rng(21)
+    users = (first + 1 + rng.integers(0, USERS, LOOKUPS)).tolist()
+    found = sum(len(recommender.suggest(user_id)) for user_id in users[:100])
+    print(f"suggestions per user: {found / 100:.1f}")
+    lookups = iter(users * 2)
+    p50, p99 = timed(lambda: recommender.suggest(next(lookups)))
+    print(f"precomputed:           p50 {p50:6.2f}ms p99 {p99:6.2f}ms")
+    pairs = iter(zip(users, users[1:] + users[:1]))
+    p50, p99 = timed(lambda: recommender.connect(*next(pairs)), samples=LOOKUPS - 1)
+    print(f"apply a connection:    p50 {p50:6.2f}ms p99 {p99:6.2f}ms")
+    lookups = iter(users * 2)
+    p50, p99 = timed(lambda: recommender.suggest(next(lookups)))
+    print(f"recomputed from graph: p50 {p50:6.2f}ms p99 {p99:6.2f}ms (first request after a connection)")
+
+if __name__ == "__main__":
+    bench_people_you_may_know()
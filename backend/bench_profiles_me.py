@@ -0,0 +1,50 @@
+import requests
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = "http://127.0.0.1:8000"
+
+# Requests/sec on /profiles/me. Run once against a server started normally
+# and once with AUTH_CACHE_SIZE=0 (principal/user caches disabled) to compare.
+
+def get_token(email, password, name):
+    login_data = {"username": email, "password": password}
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+
+    register_data = {"email": email, "password": password, "full_name": name, "role": "alumni"}
+    requests.post(f"{BASE_URL}/api/v1/auth/register", json=register_data)
+
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+    return None
+
+def bench_profiles_me(concurrency=16, duration=10):
+    print("\n--- Benchmarking /profiles/me ---")
+    token = get_token("bench_me@example.com", "Password123!", "Bench Me")
+    if not token:
+        print("Failed to get token.")
+        return
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        count = 0
+        while time.perf_counter() < deadline:
+            r = session.get(f"{BASE_URL}/api/v1/profiles/me", headers=headers)
+            if r.status_code == 200:
+                count += 1
+        return count
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        total = sum(pool.map(lambda _: worker(), range(concurrency)))
+    print(f"{total} requests in {duration}s: {total / duration:.1f} req/s (concurrency {concurrency})")
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    bench_profiles_me(concurrency, duration)
@@ -0,0 +1,26 @@
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold-start cost of one uvicorn worker: a fresh interpreter importing the
+# app module, which is what every worker process does before serving.
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+def time_import():
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", "import app.main"], capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+    return elapsed
+
+def bench_startup():
+    print(f"\n--- Benchmarking cold start ({RUNS} runs) ---")
+    samples = [time_import() for _ in range(RUNS)]
+    print(f"import app.main: median {statistics.median(samples) * 1000:.0f}ms, "
+          f"min {min(samples) * 1000:.0f}ms, max {max(samples) * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    bench_startup()
@@ -0,0 +1,106 @@
+import random
+import statistics
+import sys
+import time
+from array import array
+from types import SimpleNamespace
+import psutil
+from app.services.typeahead import CACHE_DEPTH, KINDS, Typeahead, job_suggestions, profile_suggestions
+
+# Typeahead over 1M distinct suggestions: memory, build time, lookup
+# latency for prefixes typed one letter at a time, and the cost of the
+# incremental updates a profile edit makes. Everything runs in-process on
+# generated profiles and jobs; no database is needed. Ends by checking
+# the cached prefixes still agree with a fresh scan after the updates.
+#
+#   python bench_typeahead.py [profiles=1000000]
+
+PROFILES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+JOBS = PROFILES // 20
+SYLLABLES = ["an", "bel", "car", "da", "el", "fen", "gi", "hal", "is", "jo", "ka", "lin", "mar", "no", "or",
+             "pri", "qui", "ros", "sa", "ti", "ul", "vic", "wen", "xa", "yu", "zo"]
+DEPARTMENTS = ["Computer Science", "Computer Engineering", "Electrical Engineering", "Mechanical Engineering",
+               "Civil Engineering", "Mathematics", "Physics", "Chemistry", "Biology", "Economics", "History",
+               "Philosophy", "Psychology", "Business Administration", "Architecture", "Law", "Medicine",
+               "Nursing", "Music", "Fine Arts"]
+SKILLS = [f"{a}{b}" for a in SYLLABLES for b in SYLLABLES[:8]]
+TITLES = [f"{level} {role}" for level in ("Junior", "Senior", "Staff", "Principal", "Lead")
+          for role in ("Software Engineer", "Data Scientist", "Product Manager", "Designer", "Analyst", "Consultant")]
+PREFIXES = ["s", "sa", "sar", "sara", "c", "co", "comp", "eng", "jo", "kali", "zzq", "senior so"]
+LOOKUPS = 2000
+UPDATES = 20000
+TARGET_MS = 1
+
+def word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+def generate():
+    rng = random.Random(19)
+    first = sorted({word(rng, 3) for _ in range(3000)})[:1000]
+    last = sorted({word(rng, 4) for _ in range(3000)})[:PROFILES // 1000 + 1]
+    profiles = [
+        SimpleNamespace(full_name=f"{first[i % 1000]} {last[i // 1000]}", department=rng.choice(DEPARTMENTS),
+                        skills=",".join(rng.sample(SKILLS, 3)))
+        for i in range(PROFILES)
+    ]
+    companies = [f"{word(rng, 3)} {rng.choice(['Labs', 'Systems', 'Group', 'Inc'])}" for _ in range(JOBS // 5)]
+    jobs = [SimpleNamespace(company=rng.choice(companies), title=rng.choice(TITLES)) for _ in range(JOBS)]
+    return profiles, jobs
+
+def timed(samples):
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+def bench_typeahead():
+    print(f"\n--- Benchmarking typeahead ({PROFILES} profiles, {JOBS} jobs) ---")
+    profiles, jobs = generate()
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    start = time.perf_counter()
+    typeahead = Typeahead()
+    records = array("i", (typeahead.add(profile_suggestions(profile), building=True) for profile in profiles))
+    for job in jobs:
+        typeahead.add(job_suggestions(job), building=True)
+    typeahead.finish_build()
+    for letter in sorted({key[0] for key in typeahead.keys}):
+        typeahead.complete(letter, KINDS, CACHE_DEPTH)
+    built = time.perf_counter() - start
+    memory = process.memory_info().rss - rss
+    print(f"built in {built:.1f}s: {typeahead.suggestion_count()} suggestions, {len(typeahead.keys)} keys, "
+          f"{memory / 2**20:.0f}MB ({memory / typeahead.suggestion_count():.0f} bytes per suggestion, "
+          f"including {PROFILES} profile records)")
+
+    rng = random.Random(20)
+    for prefix in PREFIXES:
+        samples = []
+        for _ in range(LOOKUPS):
+            start = time.perf_counter()
+            suggestions = typeahead.complete(prefix, KINDS, 8)
+            samples.append((time.perf_counter() - start) * 1000)
+        p50, p99 = timed(samples)
+        top = suggestions[0].text if suggestions else "-"
+        print(f"{prefix!r:>12} {top:<32} p50 {p50 * 1000:6.0f}us p99 {p99 * 1000:6.0f}us"
+              f"{'' if p99 <= TARGET_MS else '  <- over target'}")
+
+    samples = []
+    for _ in range(UPDATES):
+        i = rng.randrange(PROFILES)
+        profile = profiles[i]
+        profile.department = rng.choice(DEPARTMENTS)
+        profile.skills = ",".join(rng.sample(SKILLS, 3))
+        start = time.perf_counter()
+        records[i] = typeahead.add(profile_suggestions(profile), replaces=records[i])
+        samples.append((time.perf_counter() - start) * 1000)
+    p50, p99 = timed(samples)
+    print(f"{UPDATES} profile edits: p50 {p50 * 1000:.0f}us p99 {p99 * 1000:.0f}us per edit")
+
+    stale = []
+    for prefix in list(typeahead._cache):
+        cached = typeahead.complete(prefix, KINDS, CACHE_DEPTH)
+        del typeahead._cache[prefix]
+        if typeahead.complete(prefix, KINDS, CACHE_DEPTH) != cached:
+            stale.append(prefix)
+    print(f"cached prefixes agree with a fresh scan: {'yes' if not stale else 'NO ' + str(stale[:10])}")
+
+if __name__ == "__main__":
+    bench_typeahead()
@@ -58,7 +58,7 @@ def test_chat():
     print(f"\n2. Bob checks history with Alice (ID {id_a})")
     r = requests.get(f"{BASE_URL}/api/v1/chat/history/{id_a}", headers=headers_b)
     print(f"Status: {r.status_code}")
-    history = r.json()
+    history = r.json()["items"]
     print(f"Found {len(history)} messages:")
     for msg in history:
         print(f"- From {msg['sender_id']}: {msg['content']}")
@@ -71,7 +71,7 @@ def test_chat():
     # 6. Alice checks history
     print(f"\n4. Alice checks history with Bob (ID {id_b})")
     r = requests.get(f"{BASE_URL}/api/v1/chat/history/{id_b}", headers=headers_a)
-    history = r.json()
+    history = r.json()["items"]
     print(f"Found {len(history)} messages.")
 
 if __name__ == "__main__":
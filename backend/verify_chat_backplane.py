@@ -0,0 +1,98 @@
+import asyncio
+import json
+import sys
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.api.endpoints.chat import ConnectionManager
+from app.services.chat_backplane import InMemoryBackplane, InMemoryHub, PostgresBackplane
+from app.services.chat_protocol import JsonCodec
+
+# Fan-out between workers without a database: two ConnectionManagers in
+# one process, standing in for two workers, share an in-memory hub. Checks
+# that direct and room messages reach users on the other "worker" (and a
+# user on both), in order, that nothing echoes back to the sender's
+# worker, and that nothing arrives once a user disconnects. Ends by
+# checking that the Postgres backplane drops split messages whose other
+# parts never arrived.
+
+MESSAGES = 100
+ROOM = 7
+
+class FakeSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.received.append(json.loads(message))
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def _rooms(user_id: int):
+    return [ROOM] if user_id in (2, 3) else []
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+async def check_fan_out() -> list:
+    hub = InMemoryHub()
+    a = ConnectionManager(InMemoryBackplane(hub), queue_size=MESSAGES * 4, queue_policy="drop_oldest", room_loader=_rooms)
+    b = ConnectionManager(InMemoryBackplane(hub), queue_size=MESSAGES * 4, queue_policy="drop_oldest", room_loader=_rooms)
+    await a.start()
+    await b.start()
+    alice, bob, carol_a, carol_b = FakeSocket(), FakeSocket(), FakeSocket(), FakeSocket()
+    await a.connect(alice, 1, JsonCodec())
+    await b.connect(bob, 2, JsonCodec())
+    await a.connect(carol_a, 3, JsonCodec())
+    await b.connect(carol_b, 3, JsonCodec())
+
+    failures = []
+    for n in range(MESSAGES):
+        await a.send_event({"type": "notice", "text": str(n)}, 2)
+    await a.send_events({"type": "notice", "text": "all"}, [1, 3])
+    # Only one sender's messages are ordered, so let these land first
+    await settle()
+    await b.send_room_event({"type": "notice", "text": "room"}, ROOM)
+    await settle()
+    if [event["text"] for event in bob.received][:MESSAGES] != [str(n) for n in range(MESSAGES)]:
+        failures.append("direct messages to the other worker missing or out of order")
+    if [event["text"] for event in alice.received] != ["all"]:
+        failures.append(f"sender's worker got echoes: {alice.received}")
+    for name, socket in (("carol on a", carol_a), ("carol on b", carol_b)):
+        if [event["text"] for event in socket.received] != ["all", "room"]:
+            failures.append(f"{name} got {socket.received}")
+    if not any(event["text"] == "room" for event in bob.received):
+        failures.append("room post missed the poster's own worker")
+
+    await b.disconnect(bob, 2)
+    before = len(bob.received)
+    await a.send_event({"type": "notice", "text": "late"}, 2)
+    await settle()
+    if len(bob.received) != before:
+        failures.append("delivered after disconnect")
+    await a.stop()
+    await b.stop()
+    if hub.subscribers:
+        failures.append(f"subscriptions left behind: {sorted(hub.subscribers)}")
+    return failures
+
+async def check_partials() -> list:
+    backplane = PostgresBackplane(create_async_engine("postgresql+asyncpg://chat@localhost/chat"))
+    backplane.PARTIAL_TTL_SECONDS = 0
+    backplane._on_notify(None, 0, "chat_user_1", "other:lost:0:2:" + json.dumps("first half")[:5])
+    await asyncio.sleep(0.01)
+    backplane._on_notify(None, 0, "chat_user_1", "other:next:0:2:" + json.dumps("x")[:1])
+    return [] if list(backplane._partials) == ["next"] else [f"stale partials kept: {list(backplane._partials)}"]
+
+async def main():
+    failures = await check_fan_out() + await check_partials()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    return not failures
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
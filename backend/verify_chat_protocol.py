@@ -0,0 +1,110 @@
+import asyncio
+import json
+import uuid
+
+import msgpack
+import requests
+import websockets
+from jose import jwt
+
+# Structured chat protocol against a running server: JSON and MessagePack
+# sends are acked with their seq, resending a client_id is acked with the
+# original seq without a second delivery, and reconnecting with last_seq
+# replays exactly the missed messages.
+
+BASE_URL = "http://127.0.0.1:8000"
+WS_URL = BASE_URL.replace("http", "ws", 1)
+
+def get_token(email, password, name):
+    login_data = {"username": email, "password": password}
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+
+    register_data = {"email": email, "password": password, "full_name": name, "role": "alumni"}
+    requests.post(f"{BASE_URL}/api/v1/auth/register", json=register_data)
+
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
+    if r.status_code == 200:
+        return r.json().get("access_token")
+    return None
+
+def user_id(token):
+    return int(jwt.get_unverified_claims(token)["sub"])
+
+def connect(token, protocol, last_seq=None):
+    url = f"{WS_URL}/api/v1/chat/ws/{user_id(token)}?token={token}&protocol={protocol}"
+    if last_seq is not None:
+        url += f"&last_seq={last_seq}"
+    return websockets.connect(url)
+
+async def exchange(socket, protocol, event):
+    if protocol == "msgpack":
+        await socket.send(msgpack.packb(event))
+        return msgpack.unpackb(await socket.recv())
+    await socket.send(json.dumps(event))
+    return json.loads(await socket.recv())
+
+async def receive(socket, protocol):
+    frame = await asyncio.wait_for(socket.recv(), timeout=2)
+    return msgpack.unpackb(frame) if protocol == "msgpack" else json.loads(frame)
+
+async def run(sender, recipient):
+    failures = 0
+    recipient_id = user_id(recipient)
+    last_seq = None
+
+    async with connect(recipient, "json") as inbox:
+        for protocol in ("json", "msgpack"):
+            async with connect(sender, protocol) as socket:
+                send = {"type": "send", "recipient_id": recipient_id, "content": f"via {protocol}",
+                        "client_id": f"verify-{uuid.uuid4()}"}
+                ack = await exchange(socket, protocol, send)
+                delivered = await receive(inbox, "json")
+                resent = await exchange(socket, protocol, send)
+                print(f"{protocol}: ack {ack}, delivered seq {delivered.get('seq')}, resend ack {resent}")
+                if ack.get("type") != "ack" or delivered.get("seq") != ack.get("seq") or resent != ack:
+                    print(f"FAIL: {protocol} send/ack/resend mismatch")
+                    failures += 1
+                last_seq = delivered["seq"] if last_seq is None else last_seq
+                bad = await exchange(socket, protocol, {"type": "send", "recipient_id": "nobody"})
+                if bad.get("type") != "error":
+                    print(f"FAIL: {protocol} accepted an invalid frame: {bad}")
+                    failures += 1
+        try:
+            duplicate = await receive(inbox, "json")
+            print(f"FAIL: resend was delivered twice: {duplicate}")
+            failures += 1
+        except asyncio.TimeoutError:
+            pass
+
+    # Offline: messages sent now must be replayed on reconnect
+    async with connect(sender, "json") as socket:
+        missed = []
+        for n in range(3):
+            ack = await exchange(socket, "json", {"type": "send", "recipient_id": recipient_id, "content": f"missed {n}"})
+            missed.append(ack["seq"])
+    async with connect(recipient, "json", last_seq=last_seq) as inbox:
+        replayed = []
+        while True:
+            event = await receive(inbox, "json")
+            if event["type"] == "resumed":
+                break
+            replayed.append(event["seq"])
+    print(f"resume from {last_seq}: replayed {replayed}")
+    if replayed[-3:] != missed or any(seq <= last_seq for seq in replayed):
+        print("FAIL: resume did not replay exactly the missed messages")
+        failures += 1
+    return failures
+
+def verify_chat_protocol():
+    sender = get_token("protocol_sender@example.com", "Password123!", "Protocol Sender")
+    recipient = get_token("protocol_recipient@example.com", "Password123!", "Protocol Recipient")
+    if not sender or not recipient:
+        print(f"Could not log in at {BASE_URL}. Is the server running?")
+        return
+    failures = asyncio.run(run(sender, recipient))
+    print("PASS" if not failures else f"{failures} check(s) failed")
+
+if __name__ == "__main__":
+    verify_chat_protocol()
@@ -9,7 +9,7 @@ def get_token(email, password, name):
     if r.status_code == 200:
         return r.json().get("access_token")
     
-    register_data = {"email": email, "password": password, "full_name": name, "role": "admin"}
+    register_data = {"email": email, "password": password, "full_name": name, "role": "alumni"}
     requests.post(f"{BASE_URL}/api/v1/auth/register", json=register_data)
     
     r = requests.post(f"{BASE_URL}/api/v1/auth/token", data=login_data)
@@ -0,0 +1,97 @@
+import json
+import sys
+from sqlalchemy import text
+from app.db.session import engine
+
+# Seeds a SCRATCH PostgreSQL database (DATABASE_URL, migrated with
+# `alembic upgrade head`) with ROWS (default 1M) rows per hot table and
+# checks that each hot endpoint query is planned with an index scan. Do
+# not point this at a database whose data you care about.
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+USERS = max(ROWS // 10, 1000)
+
+SEED = [
+    f"""INSERT INTO users (email, hashed_password, full_name, role, is_active)
+        SELECT 'seed' || i || '@example.com', 'x', 'Seed User ' || i, 'alumni', true
+        FROM generate_series(1, {USERS}) i""",
+    f"""INSERT INTO profiles (user_id, full_name, graduation_year, department, points)
+        SELECT id, full_name, 1990 + id % 35, (ARRAY['Computer Science','Mechanical','Electrical','Civil'])[1 + id % 4], id % 5000
+        FROM users""",
+    f"""INSERT INTO messages (sender_id, recipient_id, content, timestamp, is_read)
+        SELECT 1 + i % {USERS}, 1 + (i * 7) % {USERS}, 'message ' || i, now() - (i || ' seconds')::interval, false
+        FROM generate_series(1, {ROWS}) i""",
+    # Each user and the next few: one row per pair, as the table requires
+    f"""INSERT INTO connections (requester_id, recipient_id, status, created_at)
+        SELECT 1 + i % {USERS}, 1 + (i + 1 + i / {USERS}) % {USERS}, (ARRAY['pending','accepted','declined'])[1 + i % 3], now()
+        FROM generate_series(1, {ROWS}) i""",
+    f"""INSERT INTO donation_campaigns (created_by_id, title, goal_amount, current_amount, created_at)
+        VALUES (1, 'Seed Campaign', 1000000, 0, now())""",
+    f"""INSERT INTO donations (user_id, campaign_id, amount, created_at)
+        SELECT 1 + i % {USERS}, (SELECT min(id) FROM donation_campaigns), 10, now()
+        FROM generate_series(1, {ROWS}) i""",
+    f"""INSERT INTO events (organizer_id, title, event_type, start_time, created_at)
+        SELECT 1 + i % {USERS}, 'Event ' || i, 'virtual', now() + ((i - {ROWS} / 2) || ' minutes')::interval, now()
+        FROM generate_series(1, {ROWS}) i""",
+    f"""INSERT INTO jobs (posted_by_id, title, company, location, description, created_at)
+        SELECT 1 + i % {USERS}, 'Engineer ' || i, 'Company ' || (i % 1000), 'City ' || (i % 500), 'desc', now()
+        FROM generate_series(1, {ROWS}) i""",
+]
+
+# (endpoint, query, needs pg_trgm)
+HOT_QUERIES = [
+    ("chat.get_chat_history", """SELECT * FROM messages WHERE id IN (
+            (SELECT id FROM messages WHERE sender_id = 42 AND recipient_id = 294 ORDER BY id DESC LIMIT 51)
+            UNION
+            (SELECT id FROM messages WHERE sender_id = 294 AND recipient_id = 42 ORDER BY id DESC LIMIT 51))
+        ORDER BY id DESC LIMIT 51""", False),
+    ("networking.send_connection_request", """SELECT * FROM connections
+        WHERE (requester_id = 42 AND recipient_id = 546) OR (requester_id = 546 AND recipient_id = 42)
+        LIMIT 1""", False),
+    ("networking.list_received_requests", """SELECT * FROM connections
+        WHERE recipient_id = 42 AND status = 'pending' ORDER BY id DESC LIMIT 51""", False),
+    ("networking.list_connections", """SELECT * FROM (
+            (SELECT * FROM connections WHERE requester_id = 42 AND status = 'accepted' ORDER BY id DESC LIMIT 51)
+            UNION ALL
+            (SELECT * FROM connections WHERE recipient_id = 42 AND status = 'accepted' ORDER BY id DESC LIMIT 51)) sides
+        ORDER BY id DESC LIMIT 51""", False),
+    ("gamification.get_leaderboard", """SELECT * FROM profiles JOIN users ON users.id = profiles.user_id
+        ORDER BY profiles.points DESC LIMIT 10""", False),
+    ("donations.read_my_donations", "SELECT * FROM donations WHERE user_id = 42", False),
+    ("events (upcoming)", "SELECT * FROM events WHERE start_time >= now() ORDER BY start_time LIMIT 100", False),
+    ("jobs.read_jobs", "SELECT * FROM jobs WHERE title ILIKE '%Engineer 4242%' LIMIT 100", True),
+]
+
+def plan_nodes(plan):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+def verify_indexes():
+    print(f"\n--- Verifying index usage on {ROWS} seeded rows ---")
+    with engine.begin() as conn:
+        if conn.scalar(text("SELECT count(*) FROM users")) == 0:
+            for statement in SEED:
+                print("Seeding:", statement.split("(")[0].strip())
+                conn.execute(text(statement))
+            conn.execute(text("ANALYZE"))
+        has_trgm = conn.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")) is not None
+
+    failures = 0
+    with engine.connect() as conn:
+        for endpoint, query, needs_trgm in HOT_QUERIES:
+            if needs_trgm and not has_trgm:
+                print(f"SKIP {endpoint}: pg_trgm not installed")
+                continue
+            plan = conn.scalar(text(f"EXPLAIN (FORMAT JSON) {query}"))
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes = list(plan_nodes(plan[0]["Plan"]))
+            uses_index = any("Index" in node for node in nodes)
+            failures += not uses_index
+            print(f"{'PASS' if uses_index else 'FAIL'} {endpoint}: {' -> '.join(nodes)}")
+    print(f"\n{failures} query shape(s) without an index scan")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if verify_indexes() else 0)
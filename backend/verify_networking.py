@@ -47,10 +47,10 @@ def test_networking():
     r = requests.get(f"{BASE_URL}/api/v1/networking/search?q=Bob", headers=headers_a)
     print(f"Status: {r.status_code}")
     results = r.json()
-    print(f"Found: {len(results)}")
+    print(f"Found: {results['total']}")
     
     bob_id = None
-    for p in results:
+    for p in results['items']:
         if "Bob" in p['full_name']:
             bob_id = p['user_id']
             break
@@ -73,8 +73,8 @@ def test_networking():
     print("\n3. Bob checks received requests")
     r = requests.get(f"{BASE_URL}/api/v1/networking/requests/received", headers=headers_b)
     print(f"Status: {r.status_code}")
-    requests_list = r.json()
-    print(f"Pending Requests: {len(requests_list)}")
+    requests_list = r.json()["items"]
+    print(f"Pending Requests: {r.json()['total']}")
     
     if len(requests_list) == 0:
         print("No requests found. Maybe already connected?")
@@ -0,0 +1,88 @@
+import asyncio
+import statistics
+import sys
+import time
+from app.api.endpoints.chat import ConnectionManager
+from app.services.chat_backplane import InMemoryBackplane
+
+# A slow client must only delay its own messages. Runs the chat
+# ConnectionManager in-process with fake sockets: one user whose phone
+# takes SLOW_SEND_SECONDS per frame (their laptop is fast), plus FAST_USERS
+# ordinary users, while messages fan out to all of them. Fails if the
+# ordinary users' p99 delivery latency moves, or if either full-queue
+# policy misbehaves.
+
+FAST_USERS = 20
+MESSAGES = 200
+SLOW_SEND_SECONDS = 0.02
+SLOW_USER = 0
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.latencies = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - float(message))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+async def fan_out(manager, user_ids):
+    for _ in range(MESSAGES):
+        for user_id in user_ids:
+            await manager.send_event({"type": "notice", "text": repr(time.perf_counter())}, user_id)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.05)
+
+def p99_ms(sockets):
+    latencies = sorted(l for s in sockets for l in s.latencies)
+    return latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+async def scenario(with_slow_client: bool, queue_size=256, policy="drop_oldest"):
+    manager = ConnectionManager(InMemoryBackplane(), queue_size=queue_size, queue_policy=policy)
+    await manager.start()
+    fast = {user_id: FakeSocket() for user_id in range(1, FAST_USERS + 1)}
+    for user_id, socket in fast.items():
+        await manager.connect(socket, user_id)
+    phone, laptop = FakeSocket(SLOW_SEND_SECONDS), FakeSocket()
+    if with_slow_client:
+        await manager.connect(phone, SLOW_USER)
+        await manager.connect(laptop, SLOW_USER)
+    await fan_out(manager, [SLOW_USER] + list(fast))
+    result = (p99_ms(fast.values()), p99_ms([laptop]) if laptop.latencies else None, phone, manager)
+    await manager.stop()
+    return result
+
+async def run():
+    failures = 0
+    baseline, _, _, _ = await scenario(with_slow_client=False)
+    loaded, laptop, phone, manager = await scenario(with_slow_client=True, queue_size=64)
+    print(f"p99 delivery to other users: {baseline:.2f}ms without the slow client, {loaded:.2f}ms with it")
+    print(f"p99 delivery to the slow user's other device: {laptop:.2f}ms")
+    print(f"slow device received {len(phone.latencies)} of {MESSAGES}; {manager.dropped_messages} dropped from its queue")
+    if loaded > max(baseline * 2, baseline + 5) or laptop > max(baseline * 2, baseline + 5):
+        print("FAIL: a slow client delayed deliveries to others")
+        failures += 1
+
+    _, _, phone, manager = await scenario(with_slow_client=True, queue_size=16, policy="disconnect")
+    print(f"disconnect policy: slow device closed with {phone.close_code}, "
+          f"{manager.slow_consumer_disconnects} slow consumer disconnect(s)")
+    if phone.close_code != 1013 or manager.slow_consumer_disconnects != 1:
+        print("FAIL: the disconnect policy did not evict the slow client")
+        failures += 1
+    print("PASS" if not failures else f"{failures} check(s) failed")
+    return failures
+
+def verify_slow_consumer():
+    print("\n--- Verifying slow consumer isolation ---")
+    return asyncio.run(run())
+
+if __name__ == "__main__":
+    sys.exit(1 if verify_slow_consumer() else 0)
@@ -0,0 +1,42 @@
+import { useEffect, useState } from 'react';
+import axios from 'axios';
+import api from './api';
+
+export interface Suggestion {
+    kind: string;
+    text: string;
+    count: number;
+}
+
+// Keystrokes closer together than this send one request
+const DEBOUNCE_MS = 150;
+
+// Completions for a search box, fetched once typing pauses. A newer
+// keystroke cancels the pending request, and any response that still
+// arrives for an older query is dropped.
+export function useTypeahead(query: string, kinds: string[]) {
+    const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+
+    useEffect(() => {
+        const q = query.trim();
+        if (!q) {
+            setSuggestions([]);
+            return;
+        }
+        let current = true;
+        const controller = new AbortController();
+        const params = new URLSearchParams([['q', q], ...kinds.map((kind) => ['kind', kind])]);
+        const timer = setTimeout(() => {
+            api.get('/typeahead/', { params, signal: controller.signal })
+                .then((response) => { if (current) setSuggestions(response.data); })
+                .catch((error) => { if (!axios.isCancel(error)) console.error("Typeahead failed", error); });
+        }, DEBOUNCE_MS);
+        return () => {
+            current = false;
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [query, kinds.join(',')]);
+
+    return suggestions;
+}
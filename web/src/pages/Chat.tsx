@@ -5,12 +5,14 @@ import { Send, MessageSquare, User } from 'lucide-react';
 
 interface Connection {
     id: number;
-    requester_id: number;
-    recipient_id: number;
-    status: string;
-    // Assuming we can get user details, or we fetch them. 
-    // We'll need a way to get the *other* user's ID and Name.
-    // For now, let's assume we fetch connections and then fetch profiles or make a helper.
+    user_id: number; // the other person
+    full_name: string | null;
+}
+
+interface ConnectionPage {
+    items: Connection[];
+    total: number;
+    next_cursor: string | null;
 }
 
 interface Message {
@@ -21,11 +23,19 @@ interface Message {
     timestamp: string;
 }
 
+interface MessagePage {
+    items: Message[]; // newest first
+    next_cursor: string | null;
+    prev_cursor: string | null;
+}
+
 export default function Chat() {
     const { user } = useAuth();
-    const [connections, setConnections] = useState<any[]>([]); // Using any to store enriched connection data
+    const [connections, setConnections] = useState<Connection[]>([]);
+    const [connectionsCursor, setConnectionsCursor] = useState<string | null>(null);
     const [selectedUser, setSelectedUser] = useState<number | null>(null);
     const [messages, setMessages] = useState<Message[]>([]);
+    const [olderCursor, setOlderCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(false);
     const [inputMessage, setInputMessage] = useState('');
     const [ws, setWs] = useState<WebSocket | null>(null);
@@ -93,34 +103,15 @@ export default function Chat() {
         }
     }, [user, selectedUser]); // Re-connect if user changes? No, WS is per logged-in user.
 
-    // Fetch connections and enrich with user info
-    const fetchConnections = async () => {
+    // Contacts come with names, a page at a time
+    const fetchConnections = async (cursor?: string) => {
         setLoading(true);
         try {
-            const response = await api.get('/networking/connections');
-            const rawConnections = response.data;
-
-            // We need to resolve who the "other" person is
-            const enriched = await Promise.all(rawConnections.map(async (conn: Connection) => {
-                const otherUserId = conn.requester_id === user?.id ? conn.recipient_id : conn.requester_id;
-                // Ideally we have an endpoint to get basic user info by ID, or we use search.
-                // Using /profiles/{id} if it exists or search?
-                // Let's use search with q="" or assuming we can implement get_profile call.
-                // Wait, Profile endpoint `GET /:id` was implemented.
-                try {
-                    // Endpoint might be /profiles/{id}
-                    // Let's assume we can fetch it. If not, we fall back to ID.
-                    // Actually there was no explicit GET /profiles/{id} in my `view_file` of gamification? 
-                    // Ah, `task.md` says "Implement Profile Endpoints ... GET /:id".
-                    // Let's assume it works.
-                    const profileRes = await api.get(`/profiles/${otherUserId}`);
-                    return { ...conn, otherUser: profileRes.data, otherUserId };
-                } catch (e) {
-                    return { ...conn, otherUserId, otherUser: { full_name: `User ${otherUserId}` } };
-                }
-            }));
-
-            setConnections(enriched);
+            const response = await api.get<ConnectionPage>('/networking/connections', {
+                params: { sort: 'name', limit: 100, ...(cursor ? { cursor } : {}) }
+            });
+            setConnections(prev => cursor ? [...prev, ...response.data.items] : response.data.items);
+            setConnectionsCursor(response.data.next_cursor);
         } catch (error) {
             console.error("Failed to fetch connections", error);
         } finally {
@@ -131,13 +122,28 @@ export default function Chat() {
     const selectUser = async (userId: number) => {
         setSelectedUser(userId);
         try {
-            const response = await api.get(`/chat/history/${userId}`);
-            setMessages(response.data);
+            const response = await api.get<MessagePage>(`/chat/history/${userId}`);
+            // Pages come newest first; the thread renders oldest at the top
+            setMessages([...response.data.items].reverse());
+            setOlderCursor(response.data.next_cursor);
         } catch (error) {
             console.error("Failed to fetch history", error);
         }
     }
 
+    const loadOlderMessages = async () => {
+        if (!selectedUser || !olderCursor) return;
+        try {
+            const response = await api.get<MessagePage>(`/chat/history/${selectedUser}`, {
+                params: { before: olderCursor }
+            });
+            setMessages(prev => [...[...response.data.items].reverse(), ...prev]);
+            setOlderCursor(response.data.next_cursor);
+        } catch (error) {
+            console.error("Failed to fetch older messages", error);
+        }
+    }
+
     const handleSendMessage = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!inputMessage.trim() || !selectedUser) return;
@@ -185,18 +191,26 @@ export default function Chat() {
                     {connections.map((conn) => (
                         <button
                             key={conn.id}
-                            onClick={() => selectUser(conn.otherUserId)}
-                            className={`w-full text-left px-4 py-3 flex items-center space-x-3 hover:bg-gray-50 focus:outline-none ${selectedUser === conn.otherUserId ? 'bg-indigo-50 border-l-4 border-indigo-500' : ''}`}
+                            onClick={() => selectUser(conn.user_id)}
+                            className={`w-full text-left px-4 py-3 flex items-center space-x-3 hover:bg-gray-50 focus:outline-none ${selectedUser === conn.user_id ? 'bg-indigo-50 border-l-4 border-indigo-500' : ''}`}
                         >
                             <div className="flex-shrink-0 h-10 w-10 rounded-full bg-indigo-100 flex items-center justify-center">
                                 <User className="h-6 w-6 text-indigo-500" />
                             </div>
                             <div className="flex-1 min-w-0">
-                                <p className="text-sm font-medium text-gray-900 truncate">{conn.otherUser?.full_name}</p>
+                                <p className="text-sm font-medium text-gray-900 truncate">{conn.full_name || `User ${conn.user_id}`}</p>
                                 <p className="text-xs text-gray-500 truncate">Click to chat</p>
                             </div>
                         </button>
                     ))}
+                    {connectionsCursor && !loading && (
+                        <button
+                            onClick={() => fetchConnections(connectionsCursor)}
+                            className="w-full py-3 text-sm text-indigo-600 hover:text-indigo-800 focus:outline-none"
+                        >
+                            Load more contacts
+                        </button>
+                    )}
                 </div>
             </div>
 
@@ -209,6 +223,16 @@ export default function Chat() {
                         </div>
 
                         <div className="flex-1 p-4 overflow-y-auto space-y-4 bg-gray-50">
+                            {olderCursor && (
+                                <div className="text-center">
+                                    <button
+                                        onClick={loadOlderMessages}
+                                        className="text-sm text-indigo-600 hover:text-indigo-800 focus:outline-none"
+                                    >
+                                        Load earlier messages
+                                    </button>
+                                </div>
+                            )}
                             {messages.map((msg) => {
                                 const isMe = msg.sender_id === user?.id;
                                 return (
@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import api from '../lib/api';
+import { useTypeahead } from '../lib/typeahead';
 import { Search, Plus, MapPin, Briefcase, Building } from 'lucide-react';
 
 interface Job {
@@ -15,6 +16,8 @@ interface Job {
     poster_id: number;
 }
 
+const JOB_SUGGESTIONS = ['title', 'company'];
+
 export default function Jobs() {
     const [jobs, setJobs] = useState<Job[]>([]);
     const [loading, setLoading] = useState(false);
@@ -23,6 +26,7 @@ export default function Jobs() {
     // Search State
     const [searchQuery, setSearchQuery] = useState('');
     const [locationQuery, setLocationQuery] = useState('');
+    const suggestions = useTypeahead(searchQuery, JOB_SUGGESTIONS);
 
     // Form State
     const [formData, setFormData] = useState({
@@ -100,7 +104,13 @@ export default function Jobs() {
                         placeholder="Search titles (e.g. Engineer)"
                         value={searchQuery}
                         onChange={(e) => setSearchQuery(e.target.value)}
+                        list="job-suggestions"
                     />
+                    <datalist id="job-suggestions">
+                        {suggestions.map((suggestion) => (
+                            <option key={`${suggestion.kind}:${suggestion.text}`} value={suggestion.text}>{suggestion.kind}</option>
+                        ))}
+                    </datalist>
                 </div>
                 <div className="flex-1 relative rounded-md shadow-sm">
                     <div className="absolute inset-y-0 left-0 pl-3 flex items-center pointer-events-none">
@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react';
 import api from '../lib/api';
 import { useAuth } from '../lib/auth';
+import { useTypeahead } from '../lib/typeahead';
 import { Loader2, Search, UserPlus, Check, X, UserCheck } from 'lucide-react';
 
 interface Profile {
@@ -15,12 +16,26 @@ interface Profile {
 
 interface Connection {
     id: number;
-    requester_id: number;
-    recipient_id: number;
     status: string;
     created_at: string;
+    // The other person
+    user_id: number;
+    full_name: string | null;
+    department: string | null;
+    graduation_year: number | null;
+    profile_picture_url: string | null;
+}
+
+interface ConnectionPage {
+    items: Connection[];
+    total: number;
+    next_cursor: string | null;
 }
 
+type ConnectionSort = 'recent' | 'name';
+
+const PEOPLE_SUGGESTIONS = ['name', 'department', 'skill'];
+
 export default function Networking() {
     const { user } = useAuth();
     const [activeTab, setActiveTab] = useState<'find' | 'requests' | 'connections'>('find');
@@ -29,16 +44,18 @@ export default function Networking() {
     // Search State
     const [searchQuery, setSearchQuery] = useState('');
     const [searchResults, setSearchResults] = useState<Profile[]>([]);
+    const suggestions = useTypeahead(searchQuery, PEOPLE_SUGGESTIONS);
 
     // Connection State
-    const [requests, setRequests] = useState<Connection[]>([]);
-    const [connections, setConnections] = useState<Connection[]>([]);
+    const [requests, setRequests] = useState<ConnectionPage>({ items: [], total: 0, next_cursor: null });
+    const [connections, setConnections] = useState<ConnectionPage>({ items: [], total: 0, next_cursor: null });
+    const [connectionSort, setConnectionSort] = useState<ConnectionSort>('recent');
 
     useEffect(() => {
         if (activeTab === 'requests') fetchRequests();
         if (activeTab === 'connections') fetchConnections();
         if (activeTab === 'find') handleSearch(); // Initial load
-    }, [activeTab]);
+    }, [activeTab, connectionSort]);
 
     const handleSearch = async (e?: React.FormEvent) => {
         if (e) e.preventDefault();
@@ -46,7 +63,7 @@ export default function Networking() {
         try {
             const params = searchQuery ? { q: searchQuery } : {};
             const response = await api.get('/networking/search', { params });
-            setSearchResults(response.data);
+            setSearchResults(response.data.items);
         } catch (error) {
             console.error("Search failed", error);
         } finally {
@@ -54,11 +71,20 @@ export default function Networking() {
         }
     }
 
-    const fetchRequests = async () => {
+    // Both lists arrive a page at a time with the other person's profile
+    // summary; a cursor appends the next page
+    const fetchPage = async (path: string, sort: ConnectionSort, cursor?: string) => {
+        const response = await api.get<ConnectionPage>(path, {
+            params: { sort, ...(cursor ? { cursor } : {}) }
+        });
+        return response.data;
+    }
+
+    const fetchRequests = async (cursor?: string) => {
         setLoading(true);
         try {
-            const response = await api.get('/networking/requests/received');
-            setRequests(response.data);
+            const page = await fetchPage('/networking/requests/received', 'recent', cursor);
+            setRequests(prev => cursor ? { ...page, items: [...prev.items, ...page.items] } : page);
         } catch (error) {
             console.error("Failed to fetch requests", error);
         } finally {
@@ -66,11 +92,11 @@ export default function Networking() {
         }
     }
 
-    const fetchConnections = async () => {
+    const fetchConnections = async (cursor?: string) => {
         setLoading(true);
         try {
-            const response = await api.get('/networking/connections');
-            setConnections(response.data);
+            const page = await fetchPage('/networking/connections', connectionSort, cursor);
+            setConnections(prev => cursor ? { ...page, items: [...prev.items, ...page.items] } : page);
         } catch (error) {
             console.error("Failed to fetch connections", error);
         } finally {
@@ -88,7 +114,7 @@ export default function Networking() {
         }
     }
 
-    const respondToRequest = async (requestId: number, status: 'ACCEPTED' | 'DECLINED') => {
+    const respondToRequest = async (requestId: number, status: 'accepted' | 'declined') => {
         try {
             await api.put(`/networking/connect/${requestId}`, { status });
             fetchRequests(); // Refresh list
@@ -97,6 +123,16 @@ export default function Networking() {
         }
     }
 
+    const acceptAllRequests = async () => {
+        try {
+            // One call for everything listed, however many that is
+            await api.put('/networking/connect', { status: 'accepted', request_ids: requests.items.map(req => req.id) });
+            fetchRequests();
+        } catch (error) {
+            console.error("Failed to respond", error);
+        }
+    }
+
     return (
         <div className="space-y-6">
             <div className="bg-white shadow px-4 py-5 sm:rounded-lg sm:p-6">
@@ -112,7 +148,7 @@ export default function Networking() {
                             onClick={() => setActiveTab('requests')}
                             className={`${activeTab === 'requests' ? 'border-indigo-500 text-indigo-600' : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'} whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm`}
                         >
-                            Pending Requests ({requests.length})
+                            Pending Requests ({requests.total})
                         </button>
                         <button
                             onClick={() => setActiveTab('connections')}
@@ -138,7 +174,13 @@ export default function Networking() {
                                         placeholder="Search by name, department, or year..."
                                         value={searchQuery}
                                         onChange={(e) => setSearchQuery(e.target.value)}
+                                        list="people-suggestions"
                                     />
+                                    <datalist id="people-suggestions">
+                                        {suggestions.map((suggestion) => (
+                                            <option key={`${suggestion.kind}:${suggestion.text}`} value={suggestion.text}>{suggestion.kind}</option>
+                                        ))}
+                                    </datalist>
                                 </div>
                                 <button type="submit" className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md shadow-sm text-white bg-indigo-600 hover:bg-indigo-700 focus:outline-none">
                                     {loading ? <Loader2 className="animate-spin h-5 w-5" /> : 'Search'}
@@ -181,23 +223,33 @@ export default function Networking() {
                     {activeTab === 'requests' && (
                         <div className="space-y-4">
                             {loading && <p>Loading requests...</p>}
-                            {!loading && requests.length === 0 && <p className="text-gray-500">No pending requests.</p>}
-                            {requests.map((req) => (
+                            {!loading && requests.total === 0 && <p className="text-gray-500">No pending requests.</p>}
+                            {requests.items.length > 1 && (
+                                <button
+                                    onClick={acceptAllRequests}
+                                    className="text-sm text-indigo-600 hover:text-indigo-800 focus:outline-none"
+                                >
+                                    Accept all {requests.items.length} shown
+                                </button>
+                            )}
+                            {requests.items.map((req) => (
                                 <div key={req.id} className="bg-white border rounded-lg p-4 flex justify-between items-center">
                                     <div>
-                                        <p className="font-medium text-gray-900">Request #{req.id}</p>
-                                        <p className="text-sm text-gray-500">From User ID: {req.requester_id}</p>
+                                        <p className="font-medium text-gray-900">{req.full_name || `User ${req.user_id}`}</p>
+                                        <p className="text-sm text-gray-500">
+                                            {[req.department, req.graduation_year].filter(Boolean).join(' • ') || 'Member'}
+                                        </p>
                                     </div>
                                     <div className="flex space-x-2">
                                         <button
-                                            onClick={() => respondToRequest(req.id, 'ACCEPTED')}
+                                            onClick={() => respondToRequest(req.id, 'accepted')}
                                             className="p-2 bg-green-100 text-green-600 rounded-full hover:bg-green-200"
                                         >
                                             <Check className="h-5 w-5" />
                                             Accept
                                         </button>
                                         <button
-                                            onClick={() => respondToRequest(req.id, 'DECLINED')}
+                                            onClick={() => respondToRequest(req.id, 'declined')}
                                             className="p-2 bg-red-100 text-red-600 rounded-full hover:bg-red-200"
                                         >
                                             <X className="h-5 w-5" />
@@ -206,6 +258,14 @@ export default function Networking() {
                                     </div>
                                 </div>
                             ))}
+                            {requests.next_cursor && !loading && (
+                                <button
+                                    onClick={() => fetchRequests(requests.next_cursor!)}
+                                    className="text-sm text-indigo-600 hover:text-indigo-800 focus:outline-none"
+                                >
+                                    Show more requests
+                                </button>
+                            )}
                         </div>
                     )}
 
@@ -213,18 +273,41 @@ export default function Networking() {
                     {activeTab === 'connections' && (
                         <div className="space-y-4">
                             {loading && <p>Loading connections...</p>}
-                            {!loading && connections.length === 0 && <p className="text-gray-500">No connections yet.</p>}
-                            {connections.map((conn) => (
+                            <div className="flex justify-between items-center">
+                                <p className="text-sm text-gray-500">{connections.total} connections</p>
+                                <select
+                                    value={connectionSort}
+                                    onChange={(e) => setConnectionSort(e.target.value as ConnectionSort)}
+                                    className="text-sm border-gray-300 rounded-md border py-1 px-2"
+                                >
+                                    <option value="recent">Most recent</option>
+                                    <option value="name">Name</option>
+                                </select>
+                            </div>
+                            {!loading && connections.total === 0 && <p className="text-gray-500">No connections yet.</p>}
+                            {connections.items.map((conn) => (
                                 <div key={conn.id} className="bg-white border rounded-lg p-4 flex items-center space-x-4">
                                     <div className="h-10 w-10 rounded-full bg-indigo-100 flex items-center justify-center text-indigo-600">
                                         <UserCheck className="h-6 w-6" />
                                     </div>
                                     <div>
-                                        <p className="font-medium text-gray-900">Connection #{conn.id}</p>
-                                        <p className="text-sm text-gray-500">Connected since {new Date(conn.created_at).toLocaleDateString()}</p>
+                                        <p className="font-medium text-gray-900">{conn.full_name || `User ${conn.user_id}`}</p>
+                                        <p className="text-sm text-gray-500">
+                                            {[conn.department, conn.graduation_year].filter(Boolean).join(' • ')}
+                                            {conn.department || conn.graduation_year ? ' • ' : ''}
+                                            Connected since {new Date(conn.created_at).toLocaleDateString()}
+                                        </p>
                                     </div>
                                 </div>
                             ))}
+                            {connections.next_cursor && !loading && (
+                                <button
+                                    onClick={() => fetchConnections(connections.next_cursor!)}
+                                    className="text-sm text-indigo-600 hover:text-indigo-800 focus:outline-none"
+                                >
+                                    Show more connections
+                                </button>
+                            )}
                         </div>
                     )}
                 </div>